@@ -1,11 +1,15 @@
 # Copyright Sierra
 
+import copy
 import random
-from hashlib import sha256
+import marshal
+import weakref
 from tau_bench.envs.tool import Tool
-from typing import Any, Callable, Dict, List, Type, Optional, Set, Union, Tuple
+from typing import Any, Callable, Dict, List, Type, Optional, Union
 
 from tau_bench.envs.user import load_user, UserStrategy
+from tau_bench.envs.ground_truth_cache import actions_digest, cache_key, get_cache, tools_digest
+from tau_bench.envs.data_hash import DataTree, data_tree
 from tau_bench.types import (
     Action,
     Task,
@@ -18,30 +22,21 @@ from tau_bench.types import (
     RESPOND_ACTION_NAME,
 )
 
-ToHashable = Union[
-    str, int, float, Dict[str, "ToHashable"], List["ToHashable"], Set["ToHashable"]
-]
-Hashable = Union[str, int, float, Tuple["Hashable"], Tuple[Tuple[str, "Hashable"]]]
+# Bump when get_data_hash changes, so cached ground-truth hashes are not compared with new ones
+DATA_HASH_VERSION = 3
 
 
-def to_hashable(item: ToHashable) -> Hashable:
-    if isinstance(item, dict):
-        return tuple((key, to_hashable(value)) for key, value in sorted(item.items()))
-    elif isinstance(item, list):
-        return tuple(to_hashable(element) for element in item)
-    elif isinstance(item, set):
-        return tuple(sorted(to_hashable(element) for element in item))
-    else:
-        return item
-
-
-def consistent_hash(
-    value: Hashable,
-) -> str:
-    return sha256(str(value).encode("utf-8")).hexdigest()
+def copy_data(data: Dict[str, Any]) -> Dict[str, Any]:
+    try:
+        return marshal.loads(marshal.dumps(data))
+    except ValueError:
+        return copy.deepcopy(data)
 
 
 class Env(object):
+    # data_load_func -> pristine database, loaded once and shared by every Env using it
+    _pristine_data: "weakref.WeakKeyDictionary[Callable[[], Dict[str, Any]], Dict[str, Any]]" = weakref.WeakKeyDictionary()
+
     def __init__(
         self,
         data_load_func: Callable[[], Dict[str, Any]],
@@ -56,7 +51,7 @@ class Env(object):
     ) -> None:
         super().__init__()
         self.data_load_func = data_load_func
-        self.data = data_load_func()
+        self.data = self.load_fresh_data()
         self.tools_map: Dict[str, Type[Tool]] = {
             tool.get_info()["function"]["name"]: tool for tool in tools
         }
@@ -79,7 +74,7 @@ class Env(object):
         if task_index is None:
             task_index = random.randint(0, len(self.tasks))
         self.task_index = task_index
-        self.data = self.data_load_func()
+        self.data = self.load_fresh_data()
         self.task = self.tasks[task_index]
         self.actions = []
         initial_observation = self.user.reset(instruction=self.task.instruction)
@@ -87,6 +82,28 @@ class Env(object):
             observation=initial_observation, info=EnvInfo(task=self.task, source="user")
         )
 
+    def load_fresh_data(self) -> Dict[str, Any]:
+        """
+        Pristine database for an episode or a ground-truth replay. Databases
+        loaded from a data snapshot hand out copy-on-write overlays, which copy
+        a table out of the shared snapshot only when it is first accessed;
+        others are copied from the pristine database instead of being loaded again.
+        """
+        pristine = self._pristine_data.get(self.data_load_func)
+        if pristine is None:
+            pristine = self.data_load_func()
+            self._pristine_data[self.data_load_func] = pristine
+        overlay = getattr(pristine, "overlay", None)
+        if overlay is not None:
+            return overlay()
+        return copy_data(pristine)
+
+    def invoke_tool(self, data: Dict[str, Any], action: Action) -> str:
+        try:
+            return self.tools_map[action.name].invoke(data=data, **action.kwargs)
+        except Exception as e:
+            return f"Error: {e}"
+
     def step(self, action: Action) -> EnvResponse:
         self.actions.append(action)
 
@@ -98,12 +115,7 @@ class Env(object):
             info.source = "user"
             done = "###STOP###" in observation
         elif action.name in self.tools_map:
-            try:
-                observation = self.tools_map[action.name].invoke(
-                    data=self.data, **action.kwargs
-                )
-            except Exception as e:
-                observation = f"Error: {e}"
+            observation = self.invoke_tool(self.data, action)
             info.source = action.name
             if action.name in self.terminate_tools:
                 done = True
@@ -118,8 +130,54 @@ class Env(object):
             info.user_cost = self.user.get_total_cost()
         return EnvResponse(observation=observation, reward=reward, done=done, info=info)
 
+    def get_data_tree(self) -> DataTree:
+        # Merkle tree of the data: diff_trees() of two trees lists the tables and records that differ
+        return data_tree(self.data)
+
     def get_data_hash(self) -> str:
-        return consistent_hash(to_hashable(self.data))
+        return self.get_data_tree().hash
+
+    def ground_truth_key(self) -> Optional[str]:
+        """Key of the current task's ground-truth hash in the persistent cache, None when it cannot be cached"""
+        pristine = self._pristine_data.get(self.data_load_func)
+        data_digest = getattr(getattr(pristine, "snapshot", None), "digest", None)
+        if data_digest is None:
+            return None
+        tools, volatile_tools = tools_digest(self.tools_map.values())
+        replayed = [action for action in self.task.actions if action.name not in self.terminate_tools]
+        if any(action.name in volatile_tools for action in replayed):
+            return None
+        return cache_key(data_digest, tools, self.task_index, actions_digest(replayed), DATA_HASH_VERSION)
+
+    def replay_ground_truth(self) -> Dict[str, Any]:
+        """
+        Fresh database after the task's tool actions (terminate tools left
+        out). Runs on its own data: the Env's data, actions and user are left alone.
+        """
+        data = self.load_fresh_data()
+        for action in self.task.actions:
+            if action.name in self.tools_map and action.name not in self.terminate_tools:
+                self.invoke_tool(data, action)
+        return data
+
+    def get_ground_truth_hash(self) -> str:
+        """
+        Hash of the data after the task's actions, from the persistent cache
+        (see ground_truth_cache) or by replaying them on a fresh database.
+        The Env ends up in the same state either way: its data is untouched,
+        and the replayed actions are recorded, where the outputs check sees them.
+        """
+        self.actions.extend(action for action in self.task.actions if action.name not in self.terminate_tools)
+        cache = get_cache()
+        key = self.ground_truth_key() if cache is not None else None
+        gt_data_hash = cache.get(key) if key is not None else None
+        if gt_data_hash is not None:
+            return gt_data_hash
+        gt_data_hash = data_tree(self.replay_ground_truth()).hash
+        # Only a replay that reproduces is cached: this catches tools reaching the clock or random numbers the source scan missed
+        if key is not None and data_tree(self.replay_ground_truth()).hash == gt_data_hash:
+            cache.put(key, gt_data_hash)
+        return gt_data_hash
 
     def calculate_reward(self) -> RewardResult:
         data_hash = self.get_data_hash()
@@ -129,12 +187,7 @@ class Env(object):
         ]
 
         # Check if the database changes are correct. If they are not correct, then we set the reward to 0.
-        # TODO: cache gt_data_hash in tasks.py (low priority)
-        self.data = self.data_load_func()
-        for action in self.task.actions:
-            if action.name not in self.terminate_tools:
-                self.step(action)
-        gt_data_hash = self.get_data_hash()
+        gt_data_hash = self.get_ground_truth_hash()
         info = RewardActionInfo(
             r_actions=data_hash == gt_data_hash, gt_data_hash=gt_data_hash
         )
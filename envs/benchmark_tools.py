@@ -0,0 +1,261 @@
+"""
+Microbenchmarks of the tool invoke() implementations of every environment.
+
+Every tool file under envs/<env>/tools/interface_<N>/ is discovered and its
+invoke() is timed against the environment's real data, with the arguments of
+the recorded task actions calling it (interface_<N>_tasks.py) or, for tools
+no task calls, arguments derived from its get_info() schema and values found
+in the data. Each call runs on a fresh copy of the tables the tool reads,
+copied outside the timed section. A separate tracemalloc run measures the
+memory each call allocates.
+
+The report ranks the tools by p99 latency and summarizes each environment.
+Saved as JSON, two reports can be compared to spot regressions:
+
+    python -m tau_bench.envs.benchmark_tools --output before.json
+    python -m tau_bench.envs.benchmark_tools --output after.json --compare before.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import platform
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from tau_bench.envs.base import copy_data
+from tau_bench.envs.evaluate import action_error
+from tau_bench.envs.tool import Tool
+
+ENVS_PATH = os.path.dirname(os.path.abspath(__file__))
+# Argument sets timed per tool, and timed calls per argument set
+MAX_ARGUMENT_SETS = 5
+DEFAULT_REPEAT = 20
+# Records per table looked at when collecting sample values for the schema-derived arguments
+SAMPLE_RECORDS = 50
+
+
+def discover_tools(env_names: Optional[List[str]] = None) -> Iterator[Tuple[str, int, type]]:
+    """(environment, interface, tool class) of every tool file under envs/*/tools/interface_*"""
+    for env_name in sorted(env_names or os.listdir(ENVS_PATH)):
+        tools_path = os.path.join(ENVS_PATH, env_name, "tools")
+        if not env_name.isidentifier() or not os.path.isdir(tools_path):
+            continue
+        for folder in sorted(os.listdir(tools_path)):
+            if not folder.startswith("interface_") or not folder[len("interface_"):].isdigit():
+                continue
+            for file_name in sorted(os.listdir(os.path.join(tools_path, folder))):
+                if not file_name.endswith(".py") or file_name == "__init__.py" or not file_name[:-3].isidentifier():
+                    continue
+                module_name = f"tau_bench.envs.{env_name}.tools.{folder}.{file_name[:-3]}"
+                try:
+                    module = importlib.import_module(module_name)
+                except Exception as e:
+                    print(f"Skipping {module_name}: {e}", file=sys.stderr)
+                    continue
+                for value in vars(module).values():
+                    if isinstance(value, type) and issubclass(value, Tool) and value is not Tool and value.__module__ == module_name:
+                        yield env_name, int(folder[len("interface_"):]), value
+
+
+def recorded_arguments(env_name: str, interface: int) -> Dict[str, List[Dict[str, Any]]]:
+    """tool name -> distinct kwargs of the recorded task actions calling it"""
+    try:
+        module = importlib.import_module(f"tau_bench.envs.{env_name}.interface_{interface}_tasks")
+        tasks = getattr(module, f"INTERFACE_{interface}_TEST")
+    except Exception:
+        return {}
+    arguments: Dict[str, List[Dict[str, Any]]] = {}
+    seen = set()
+    for task in tasks:
+        for action in task.actions:
+            key = (action.name, json.dumps(action.kwargs, sort_keys=True, default=str))
+            if key not in seen:
+                seen.add(key)
+                arguments.setdefault(action.name, []).append(action.kwargs)
+    return arguments
+
+
+def sample_values(data: Dict[str, Any]) -> Dict[str, Any]:
+    """column name -> a value it has in the data, the record ids counting as the table's <singular>_id column"""
+    values: Dict[str, Any] = {}
+    for table_name, table in data.items():
+        if not isinstance(table, dict):
+            continue
+        for position, (record_id, record) in enumerate(table.items()):
+            if position == SAMPLE_RECORDS:
+                break
+            if position == 0:
+                values.setdefault(f"{table_name.rstrip('s')}_id", record_id)
+            if isinstance(record, dict):
+                for column, value in record.items():
+                    if value is not None:
+                        values.setdefault(column, value)
+    return values
+
+
+def schema_arguments(info: Dict[str, Any], samples: Dict[str, Any]) -> Dict[str, Any]:
+    """Arguments for the required parameters of a get_info() schema"""
+    parameters = info.get("function", {}).get("parameters", {})
+    properties = parameters.get("properties", {})
+    defaults = {"string": "1", "number": 1.0, "integer": 1, "boolean": True, "array": [], "object": {}}
+    arguments = {}
+    for name in parameters.get("required", []):
+        schema = properties.get(name, {})
+        if schema.get("enum"):
+            arguments[name] = schema["enum"][0]
+        elif name in samples:
+            arguments[name] = samples[name]
+        else:
+            types = schema.get("type")
+            # "type" may list several types, e.g. ["string", "null"]
+            types = [types] if not isinstance(types, list) else [kind for kind in types if kind != "null"]
+            arguments[name] = defaults.get(types[0] if types else None, "1")
+    return arguments
+
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+
+def _call(tool: type, data: Dict[str, Any], arguments: Dict[str, Any]) -> Tuple[float, Optional[str]]:
+    started = time.perf_counter()
+    try:
+        output = tool.invoke(data, **arguments)
+    except Exception as e:
+        return time.perf_counter() - started, f"{type(e).__name__}: {e}"
+    return time.perf_counter() - started, action_error(output)
+
+
+def _prepared_data(fresh_data: Callable[[], Dict[str, Any]], tables: Optional[Iterable[str]]) -> Dict[str, Any]:
+    """Fresh data with the tables the tool reads already copied, so copying them is not measured"""
+    data = fresh_data()
+    for table in tables if tables is not None else ():
+        data.get(table)
+    return data
+
+
+def benchmark_tool(tool: type, argument_sets: List[Dict[str, Any]], fresh_data: Callable[[], Dict[str, Any]], repeat: int) -> Dict[str, Any]:
+    timings = []
+    errors = 0
+    peak_bytes = 0
+    for arguments in argument_sets:
+        # A first call learns which tables the tool reads, and warms up caches
+        data = fresh_data()
+        _call(tool, data, arguments)
+        tables = getattr(data, "accessed_tables", None)
+        for _ in range(repeat):
+            seconds, error = _call(tool, _prepared_data(fresh_data, tables), arguments)
+            timings.append(seconds)
+            errors += error is not None
+        data = _prepared_data(fresh_data, tables)
+        tracemalloc.start()
+        try:
+            _call(tool, data, arguments)
+            peak_bytes = max(peak_bytes, tracemalloc.get_traced_memory()[1])
+        finally:
+            tracemalloc.stop()
+    return {
+        "calls": len(timings),
+        "errors": errors,
+        "p50_ms": percentile(timings, 0.5) * 1000,
+        "p99_ms": percentile(timings, 0.99) * 1000,
+        "mean_ms": sum(timings) / len(timings) * 1000,
+        "peak_kib": peak_bytes / 1024,
+    }
+
+
+def _data_loader(env_name: str) -> Callable[[], Dict[str, Any]]:
+    pristine = importlib.import_module(f"tau_bench.envs.{env_name}.data").load_data()
+    overlay = getattr(pristine, "overlay", None)
+    return overlay if overlay is not None else (lambda: copy_data(pristine))
+
+
+def run_benchmarks(env_names: Optional[List[str]] = None, repeat: int = DEFAULT_REPEAT) -> Dict[str, Any]:
+    tools = []
+    loaders: Dict[str, Callable[[], Dict[str, Any]]] = {}
+    samples: Dict[str, Dict[str, Any]] = {}
+    recorded: Dict[Tuple[str, int], Dict[str, List[Dict[str, Any]]]] = {}
+    for env_name, interface, tool in discover_tools(env_names):
+        if env_name not in loaders:
+            try:
+                loaders[env_name] = _data_loader(env_name)
+            except Exception as e:
+                print(f"Skipping {env_name}: {e}", file=sys.stderr)
+                loaders[env_name] = None
+            else:
+                samples[env_name] = sample_values(loaders[env_name]().copy())
+        if loaders[env_name] is None:
+            continue
+        if (env_name, interface) not in recorded:
+            recorded[(env_name, interface)] = recorded_arguments(env_name, interface)
+        info = tool.get_info()
+        name = info["function"]["name"]
+        argument_sets = recorded[(env_name, interface)].get(name, [])[:MAX_ARGUMENT_SETS]
+        source = "tasks" if argument_sets else "schema"
+        if not argument_sets:
+            argument_sets = [schema_arguments(info, samples[env_name])]
+        result = benchmark_tool(tool, argument_sets, loaders[env_name], repeat)
+        tools.append({"environment": env_name, "interface": interface, "tool": name, "arguments": source, **result})
+    tools.sort(key=lambda result: -result["p99_ms"])
+
+    environments: Dict[str, Dict[str, Any]] = {}
+    for result in tools:
+        summary = environments.setdefault(result["environment"], {"tools": 0, "errors": 0, "p50_ms": [], "p99_ms": []})
+        summary["tools"] += 1
+        summary["errors"] += result["errors"]
+        summary["p50_ms"].append(result["p50_ms"])
+        summary["p99_ms"].append(result["p99_ms"])
+    for summary in environments.values():
+        summary["median_p50_ms"] = percentile(summary.pop("p50_ms"), 0.5)
+        p99s = summary.pop("p99_ms")
+        summary["max_p99_ms"] = max(p99s)
+        summary["median_p99_ms"] = percentile(p99s, 0.5)
+    return {
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "environments": dict(sorted(environments.items())),
+        "tools": tools,
+    }
+
+
+def compare(before: Dict[str, Any], after: Dict[str, Any], threshold: float = 1.25) -> List[Dict[str, Any]]:
+    """Tools whose p50 grew by more than threshold between two reports, worst first"""
+    previous = {(result["environment"], result["interface"], result["tool"]): result for result in before["tools"]}
+    regressions = []
+    for result in after["tools"]:
+        old = previous.get((result["environment"], result["interface"], result["tool"]))
+        if old is not None and old["p50_ms"] > 0 and result["p50_ms"] / old["p50_ms"] > threshold:
+            regressions.append({
+                "environment": result["environment"],
+                "interface": result["interface"],
+                "tool": result["tool"],
+                "p50_ms_before": old["p50_ms"],
+                "p50_ms_after": result["p50_ms"],
+                "ratio": result["p50_ms"] / old["p50_ms"],
+            })
+    return sorted(regressions, key=lambda regression: -regression["ratio"])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the invoke() of every tool against its environment's data")
+    parser.add_argument("environments", nargs="*", help="environment packages under envs/ (default: all)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timed calls per argument set")
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="earlier JSON report to list regressions against")
+    args = parser.parse_args()
+    report = run_benchmarks(args.environments or None, args.repeat)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    for result in report["tools"][:20]:
+        print(f"{result['p99_ms']:9.3f} ms p99 {result['p50_ms']:9.3f} ms p50  {result['environment']}/interface_{result['interface']}/{result['tool']}")
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(json.load(file), report)
+        for regression in regressions:
+            print(f"Regression x{regression['ratio']:.2f}: {regression['environment']}/interface_{regression['interface']}/{regression['tool']}")
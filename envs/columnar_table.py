@@ -0,0 +1,244 @@
+"""
+Columnar representation of the large numeric time-series tables (trades,
+instrument_prices, nav_records, historical_energy_consumption, ...).
+
+A ColumnarTable holds one array per column instead of one dict per record,
+so filters and aggregations run vectorized. Only the finance NAV tools
+(compute_nav, calculate_nav, evaluate_nav) use it so far; each keeps its
+loop for touched tables, and tests check both give the same results. Homogeneous int, float, bool and str columns are NumPy
+arrays when NumPy is installed; it is optional, and without it the same API
+runs plain Python loops over lists. Records stay available through a
+read-only, dict-like row view: table[record_id] returns a dict equal to the
+source record.
+
+Sums add the values one after the other in record order, like a Python loop
+over the records, so they give exactly the loop's result. A summed value
+that is missing or not an int or float raises ValueError: the caller falls
+back to its loop, which decides what such values mean.
+
+Tools get the columns of a table with columnar_table(data, name), which
+returns None once the table was copied out of the data snapshot (it may have
+been modified) so they loop over data[name] instead.
+"""
+
+import threading
+import weakref
+from collections.abc import Mapping
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+__all__ = ["ColumnarTable", "columnar_table"]
+
+# Column value of the records that do not have the column
+_ABSENT = object()
+
+# DataSnapshot -> table name -> ColumnarTable of the table as compiled (None when not a dict of records)
+_snapshot_tables: "weakref.WeakKeyDictionary[Any, Dict[str, ColumnarTable]]" = weakref.WeakKeyDictionary()
+_snapshot_tables_lock = threading.Lock()
+
+
+def _column_array(values: List[Any]) -> Any:
+    """NumPy array of a homogeneous int, float, bool or str column, else the list itself"""
+    if np is None or not values:
+        return values
+    kinds = {type(value) for value in values}
+    if len(kinds) != 1:
+        # Mixed columns (int and float, or missing values) keep their exact Python values
+        return values
+    kind = kinds.pop()
+    try:
+        if kind is float:
+            return np.array(values, dtype=np.float64)
+        if kind is int:
+            return np.array(values, dtype=np.int64)
+        if kind is bool:
+            return np.array(values, dtype=bool)
+        if kind is str and not any(value.endswith("\0") for value in values):
+            # Fixed-width unicode (which drops trailing NULs), so where() compares ids, statuses and dates vectorized
+            return np.array(values, dtype=np.str_)
+    except OverflowError:
+        pass
+    return values
+
+
+class ColumnarTable(Mapping):
+    """Read-only, column-oriented copy of a dict-of-records table"""
+
+    def __init__(self, table: Dict[Hashable, Any]) -> None:
+        self.ids = list(table)
+        self._positions = {record_id: position for position, record_id in enumerate(self.ids)}
+        names: Dict[str, None] = {}
+        for record in table.values():
+            names.update(dict.fromkeys(record))
+        self.columns = {
+            name: _column_array([record.get(name, _ABSENT) for record in table.values()])
+            for name in names
+        }
+
+    # Row view
+
+    def __getitem__(self, record_id: Hashable) -> Dict[str, Any]:
+        position = self._positions[record_id]
+        row = {}
+        for name, values in self.columns.items():
+            value = values[position]
+            if value is not _ABSENT:
+                # NumPy scalars back to the Python int/float/bool they were built from
+                row[name] = value.item() if np is not None and isinstance(values, np.ndarray) else value
+        return row
+
+    def __iter__(self) -> Iterator[Hashable]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, record_id: object) -> bool:
+        return record_id in self._positions
+
+    # Vectorized queries
+
+    def column(self, name: str) -> Any:
+        """Values of a column in record order, None for the records without it"""
+        values = self.columns.get(name)
+        if values is None:
+            return [None] * len(self.ids)
+        if isinstance(values, list) and _ABSENT in values:
+            return [None if value is _ABSENT else value for value in values]
+        return values
+
+    def where(self, **equals: Any) -> Any:
+        """
+        Selection of the records whose record.get(column) == value for every
+        column=value given: a boolean mask with NumPy, else a list of positions
+        """
+        if np is not None:
+            mask = np.ones(len(self.ids), dtype=bool)
+            for name, value in equals.items():
+                values = self.column(name)
+                if isinstance(values, np.ndarray):
+                    # A str never equals a number: only compare values of the column's kind
+                    if (values.dtype.kind == "U") == isinstance(value, str) and isinstance(value, (str, int, float)):
+                        mask &= values == value
+                    else:
+                        mask[:] = False
+                else:
+                    mask &= np.fromiter((item == value for item in values), dtype=bool, count=len(values))
+            return mask
+        selection = range(len(self.ids))
+        for name, value in equals.items():
+            values = self.column(name)
+            selection = [position for position in selection if values[position] == value]
+        return list(selection)
+
+    def _positions_of(self, selection: Any) -> Any:
+        if selection is None:
+            return range(len(self.ids))
+        return np.flatnonzero(selection) if np is not None else selection
+
+    def complement(self, selection: Any) -> Any:
+        """Selection of the records that are not in the given one"""
+        if np is not None:
+            return ~selection
+        selected = set(selection)
+        return [position for position in range(len(self.ids)) if position not in selected]
+
+    def selected_ids(self, selection: Any) -> List[Hashable]:
+        return [self.ids[position] for position in self._positions_of(selection)]
+
+    def _numbers(self, name: str, selection: Any) -> Any:
+        """Values of a numeric column over the selection; ValueError when one is missing or not an int or float"""
+        values = self.column(name)
+        if np is not None and isinstance(values, np.ndarray):
+            if values.dtype.kind not in "iuf":
+                raise ValueError(f"Column {name} is not numeric")
+            return values if selection is None else values[selection]
+        selected = [values[position] for position in self._positions_of(selection)]
+        for value in selected:
+            if type(value) is not int and type(value) is not float:
+                raise ValueError(f"Column {name} has a non-numeric value: {value!r}")
+        return np.array(selected, dtype=np.float64) if np is not None else selected
+
+    @staticmethod
+    def _total(values: Any) -> Any:
+        # cumsum adds in order (a NumPy sum is pairwise), so the total is the Python loop's
+        if np is not None:
+            return 0 + np.cumsum(values)[-1].item() if len(values) else 0
+        total = 0
+        for value in values:
+            total += value
+        return total
+
+    def sum(self, name: str, selection: Any = None) -> Any:
+        """Sum of a numeric column over the selection (every record by default)"""
+        return self._total(self._numbers(name, selection))
+
+    def dot(self, first: str, second: str, selection: Any = None, negate: Any = None) -> Any:
+        """
+        Sum of first * second over the selection, e.g. quantity * price; the
+        products of the records in the `negate` selection are subtracted instead
+        """
+        first_values = self._numbers(first, selection)
+        second_values = self._numbers(second, selection)
+        if np is not None:
+            products = first_values * second_values
+            if negate is not None:
+                products = np.where(negate if selection is None else negate[selection], -products, products)
+            return self._total(products)
+        negated = set(self._positions_of(negate)) if negate is not None else set()
+        positions = self._positions_of(selection)
+        return self._total(
+            -(a * b) if position in negated else a * b
+            for position, a, b in zip(positions, first_values, second_values)
+        )
+
+    def sum_by(self, name: str, by: str, selection: Any = None, key: Optional[Callable[[Any], Hashable]] = None) -> Dict[Hashable, Any]:
+        """
+        {group: sum of the column over its records}, the group of a record being
+        its `by` value, or key(value) (e.g. lambda date: date[:7] for months).
+        Groups are in order of first appearance.
+        """
+        groups = self.column(by)
+        group_values = [groups[position] for position in self._positions_of(selection)]
+        if key is not None:
+            group_values = [key(value) for value in group_values]
+        values = self._numbers(name, selection)
+        if np is not None:
+            # bincount adds the weights of each group in order, like the loop below
+            labels = {}
+            for value in group_values:
+                labels.setdefault(value, len(labels))
+            inverse = np.fromiter((labels[value] for value in group_values), dtype=np.intp, count=len(group_values))
+            totals = np.bincount(inverse, weights=values, minlength=len(labels))
+            return {label: total.item() for label, total in zip(labels, totals)}
+        totals: Dict[Hashable, Any] = {}
+        for group, value in zip(group_values, values):
+            totals[group] = totals.get(group, 0) + value
+        return totals
+
+
+def columnar_table(data: Dict[str, Any], name: str) -> Optional[ColumnarTable]:
+    """
+    ColumnarTable of data[name] when data is a database loaded from a snapshot
+    (data_snapshot.LazyData) and the table has not been copied out of it yet:
+    the columns are built once per snapshot and shared by every caller,
+    without unmarshalling the table again. None otherwise, building the
+    columns of a table that may have changed would cost more than a loop.
+    """
+    snapshot = getattr(data, "snapshot", None)
+    if snapshot is None or name not in snapshot.tables or name in data.touched_tables or not dict.__contains__(data, name):
+        return None
+    tables = _snapshot_tables.get(snapshot)
+    if tables is None or name not in tables:
+        with _snapshot_tables_lock:
+            tables = _snapshot_tables.setdefault(snapshot, {})
+            if name not in tables:
+                table = snapshot.table(name)
+                records = isinstance(table, dict) and all(isinstance(record, dict) for record in table.values())
+                # Tables that are not dicts of records have no columns
+                tables[name] = ColumnarTable(table) if records else None
+    return tables[name]
@@ -0,0 +1,339 @@
+"""
+Compiled binary snapshots of the environment data folders.
+
+Every JSON table of a data folder is stored marshalled in one snapshot file
+next to the tables, behind an index recording where each table is and which
+source files (mtime, size, sha256) it was compiled from. Loading a table is
+then a marshal.loads instead of a JSON parse. The snapshot is rebuilt, reusing
+the tables whose file content did not change, whenever a source file changes
+or it was written by another Python version.
+
+Build every snapshot ahead of time with `python envs/data_snapshot.py`.
+This module only depends on the standard library, so the task framework can
+load it by path without the tau_bench package.
+"""
+
+import os
+import sys
+import json
+import mmap
+import struct
+import marshal
+import threading
+from hashlib import sha256
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+try:
+    from tau_bench.envs.indexed_table import index_table
+except ImportError:
+    # Loaded by path (the task framework, `python envs/data_snapshot.py`): load the sibling module the same way
+    import importlib.util
+
+    _spec = importlib.util.spec_from_file_location("env_indexed_table", os.path.join(os.path.dirname(os.path.abspath(__file__)), "indexed_table.py"))
+    _indexed_table = importlib.util.module_from_spec(_spec)
+    sys.modules[_spec.name] = _indexed_table  # So its tables can be pickled
+    _spec.loader.exec_module(_indexed_table)
+    index_table = _indexed_table.index_table
+
+SNAPSHOT_FILE = ".snapshot.bin"
+# Root of replacement data folders, one per environment (see data_folder)
+DATA_ROOT_VARIABLE = "ENV_DATA_ROOT"
+SNAPSHOT_FORMAT = 1
+# The snapshot starts with the length of the marshalled index that follows it
+_INDEX_LENGTH = struct.Struct("<Q")
+
+# data folder -> DataSnapshot, shared by every load_data() of this process
+_snapshots: Dict[str, "DataSnapshot"] = {}
+_snapshots_lock = threading.Lock()
+
+SourceVersion = Tuple[Tuple[str, int, int], ...]
+
+
+def source_version(folder: str) -> SourceVersion:
+    """(file name, mtime, size) of every JSON table of the folder, sorted by name"""
+    version = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if entry.name.endswith(".json") and entry.is_file():
+                stat = entry.stat()
+                version.append((entry.name, stat.st_mtime_ns, stat.st_size))
+    return tuple(sorted(version))
+
+
+def _compatible(index: Any) -> bool:
+    return (
+        isinstance(index, dict)
+        and index.get("format") == SNAPSHOT_FORMAT
+        and index.get("python") == list(sys.version_info[:2])
+        and index.get("marshal") == marshal.version
+    )
+
+
+def read_snapshot(folder: str) -> Optional[Tuple[Dict[str, Any], memoryview]]:
+    """
+    (index, table blobs) of the folder's snapshot, None when missing, corrupt
+    or incompatible. The blobs are a read-only memory map of the file, so every
+    process using the snapshot shares the same pages of the OS page cache.
+    """
+    try:
+        with open(os.path.join(folder, SNAPSHOT_FILE), "rb") as file:
+            content = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        (index_length,) = _INDEX_LENGTH.unpack_from(content)
+        index = marshal.loads(content[_INDEX_LENGTH.size:_INDEX_LENGTH.size + index_length])
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+    if not _compatible(index):
+        return None
+    return index, memoryview(content)[_INDEX_LENGTH.size + index_length:]
+
+
+def is_current(index: Dict[str, Any], version: SourceVersion) -> bool:
+    """Whether the snapshot was compiled from exactly these source files"""
+    sources = index["sources"]
+    return len(sources) == len(version) and all(
+        sources.get(name, (None, None))[:2] == [mtime_ns, size] for name, mtime_ns, size in version
+    )
+
+
+def build_snapshot(folder: str, previous: Optional[Tuple[Dict[str, Any], memoryview]] = None) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """
+    Compile the folder's JSON tables and write its snapshot file. Tables whose
+    source content is unchanged since the previous snapshot are copied over
+    without being parsed again. Returns the index and the marshalled tables.
+    """
+    version = source_version(folder)
+    sources = {}
+    tables = {}
+    for file_name, mtime_ns, size in version:
+        with open(os.path.join(folder, file_name), "rb") as file:
+            content = file.read()
+        digest = sha256(content).hexdigest()
+        name = file_name[:-5]
+        if previous is not None and previous[0]["sources"].get(file_name, [None] * 3)[2] == digest:
+            offset, length = previous[0]["tables"][name]
+            tables[name] = bytes(previous[1][offset:offset + length])
+        else:
+            tables[name] = marshal.dumps(json.loads(content))
+        sources[file_name] = [mtime_ns, size, digest]
+
+    offsets = {}
+    position = 0
+    for name, blob in tables.items():
+        offsets[name] = [position, len(blob)]
+        position += len(blob)
+    index = {
+        "format": SNAPSHOT_FORMAT,
+        "python": list(sys.version_info[:2]),
+        "marshal": marshal.version,
+        "sources": sources,
+        "tables": offsets,
+    }
+    index_blob = marshal.dumps(index)
+
+    snapshot_path = os.path.join(folder, SNAPSHOT_FILE)
+    temp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as file:
+            file.write(_INDEX_LENGTH.pack(len(index_blob)))
+            file.write(index_blob)
+            for blob in tables.values():
+                file.write(blob)
+        os.replace(temp_path, snapshot_path)
+    except OSError as e:
+        # Read-only data folders still work, they just parse the JSON every time
+        print(f"Could not write {snapshot_path}: {e}")
+    return index, tables
+
+
+class DataSnapshot:
+    """
+    Marshalled tables of a data folder and the source version they were
+    compiled from. The tables are read-only views of the memory-mapped
+    snapshot file, or bytes when it could not be written.
+    """
+
+    def __init__(self, version: SourceVersion, tables: Dict[str, Union[bytes, memoryview]], digest: Optional[str] = None) -> None:
+        self.version = version
+        self.tables = tables
+        # sha256 of the source files' names and contents: equal for equal data, whatever their mtimes
+        self.digest = digest
+
+    def table(self, name: str) -> Any:
+        return marshal.loads(self.tables[name])
+
+    def load_all(self) -> Dict[str, Any]:
+        return {name: marshal.loads(blob) for name, blob in self.tables.items()}
+
+
+def _index_version(index: Dict[str, Any]) -> SourceVersion:
+    return tuple((name, mtime_ns, size) for name, (mtime_ns, size, _) in sorted(index["sources"].items()))
+
+
+def _index_digest(index: Dict[str, Any]) -> str:
+    return sha256(json.dumps([[name, digest] for name, (_, _, digest) in sorted(index["sources"].items())]).encode()).hexdigest()
+
+
+def open_snapshot(folder: str) -> DataSnapshot:
+    """Snapshot of the folder, rebuilt first when it is missing or stale"""
+    snapshot = read_snapshot(folder)
+    if snapshot is None or not is_current(snapshot[0], source_version(folder)):
+        index, tables = build_snapshot(folder, snapshot)
+        # Map the file just written rather than keeping a private copy of the tables
+        snapshot = read_snapshot(folder)
+        if snapshot is None or snapshot[0] != index:
+            return DataSnapshot(_index_version(index), tables, _index_digest(index))
+    index, blobs = snapshot
+    tables = {name: blobs[offset:offset + length] for name, (offset, length) in index["tables"].items()}
+    return DataSnapshot(_index_version(index), tables, _index_digest(index))
+
+
+def get_snapshot(folder: str) -> DataSnapshot:
+    """Snapshot of the folder cached in this process, reopened when a source file changed"""
+    version = source_version(folder)
+    snapshot = _snapshots.get(folder)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _snapshots_lock:
+        snapshot = _snapshots.get(folder)
+        if snapshot is None or snapshot.version != version:
+            snapshot = open_snapshot(folder)
+            _snapshots[folder] = snapshot
+    return snapshot
+
+
+# Placeholder stored for tables that have not been copied out of the snapshot yet
+PENDING = object()
+
+
+class LazyData(dict):
+    """
+    Private, dict-compatible database over a DataSnapshot. A table is copied
+    out of the snapshot the first time it is accessed, so a tool call only
+    pays for the tables it uses, and accessed_tables records which they were.
+
+    The table names are real keys holding a placeholder until then, so len(),
+    `in` and the C JSON encoder see every table; the methods that hand out
+    values materialize the tables first.
+    """
+
+    def __init__(self, snapshot: DataSnapshot, indexed: bool = False) -> None:
+        super().__init__(dict.fromkeys(snapshot.tables, PENDING))
+        self.snapshot = snapshot
+        # Hand out tables as IndexedTable (see indexed_table), indexed on their *_id columns
+        self.indexed = indexed
+        self.accessed_tables = set()
+
+    def overlay(self) -> "LazyData":
+        """Pristine database over the same snapshot, whatever was done to this one"""
+        return LazyData(self.snapshot, self.indexed)
+
+    @property
+    def touched_tables(self) -> set:
+        """Names of the tables that were copied out of the snapshot (and may have been modified)"""
+        return {key for key, value in dict.items(self) if value is not PENDING}
+
+    def _materialize(self, key: Any) -> None:
+        self.accessed_tables.add(key)
+        if dict.get(self, key) is PENDING:
+            table = self.snapshot.table(key)
+            dict.__setitem__(self, key, index_table(table) if self.indexed else table)
+
+    def _materialize_all(self) -> None:
+        for key in list(dict.keys(self)):
+            self._materialize(key)
+
+    def __setitem__(self, key, value):
+        self._materialize(key)
+        dict.__setitem__(self, key, value)
+
+    def __delitem__(self, key):
+        self._materialize(key)
+        dict.__delitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        for key, value in dict(*args, **kwargs).items():
+            self[key] = value
+
+    def clear(self):
+        self._materialize_all()
+        dict.clear(self)
+
+    def __getitem__(self, key):
+        self._materialize(key)
+        return dict.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        self._materialize(key)
+        return dict.get(self, key, default)
+
+    def setdefault(self, key, default=None):
+        self._materialize(key)
+        return dict.setdefault(self, key, default)
+
+    def pop(self, key, *default):
+        self._materialize(key)
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        self._materialize_all()
+        return dict.popitem(self)
+
+    def __iter__(self):
+        # Overridden so dict(view) and {**view} go through __getitem__
+        return dict.__iter__(self)
+
+    def values(self):
+        self._materialize_all()
+        return dict.values(self)
+
+    def items(self):
+        self._materialize_all()
+        return dict.items(self)
+
+    def copy(self):
+        self._materialize_all()
+        return dict(dict.items(self))
+
+    def __eq__(self, other):
+        self._materialize_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __repr__(self):
+        self._materialize_all()
+        return dict.__repr__(self)
+
+    def __reduce__(self):
+        return (dict, (self.copy(),))
+
+
+def data_folder(folder: str) -> str:
+    """
+    Folder to load for envs/<env>/data: <ENV_DATA_ROOT>/<env> when that
+    variable is set and the folder exists (e.g. data scaled by scale_data.py)
+    """
+    root = os.environ.get(DATA_ROOT_VARIABLE)
+    if root:
+        override = os.path.join(root, os.path.basename(os.path.dirname(os.path.abspath(folder))))
+        if os.path.isdir(override):
+            return override
+    return folder
+
+
+def load_data(folder: str, indexed: bool = False) -> Dict[str, Any]:
+    """Fresh database of a data folder, loading each table on first access (as an IndexedTable if indexed)"""
+    return LazyData(get_snapshot(data_folder(folder)), indexed)
+
+
+if __name__ == "__main__":
+    envs_path = os.path.dirname(os.path.abspath(__file__))
+    folders = sys.argv[1:] or sorted(
+        os.path.join(envs_path, name, "data")
+        for name in os.listdir(envs_path)
+        if os.path.isdir(os.path.join(envs_path, name, "data"))
+    )
+    for folder in folders:
+        snapshot = open_snapshot(folder)
+        print(f"{folder}: {len(snapshot.tables)} tables")
@@ -0,0 +1,164 @@
+"""
+Query engine of the generic discover_* tools.
+
+Those tools take an entity_type and a dict of filters and return the records
+of the table whose record.get(key) == value for every filter, each with its
+table key added under the entity's id field. query_entities() returns exactly
+those results, but plans the filters against the table's indexes when it is
+an IndexedTable (see indexed_table): the most selective indexed filter is
+looked up and only its matches are checked against the other filters. Plain
+dict tables are scanned as before.
+
+Migrate the tool files with `python envs/entity_query.py [paths ...]`, which
+rewrites the standard filter loop into a call to query_entities().
+Standard library only, like data_snapshot.
+"""
+
+import os
+import re
+import sys
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+try:
+    from tau_bench.envs.indexed_table import IndexedTable
+except ImportError:
+    # Loaded by path (the task framework): share the sibling module data_snapshot loaded, or load it the same way
+    _indexed_table = sys.modules.get("env_indexed_table")
+    if _indexed_table is None:
+        import importlib.util
+
+        _spec = importlib.util.spec_from_file_location("env_indexed_table", os.path.join(os.path.dirname(os.path.abspath(__file__)), "indexed_table.py"))
+        _indexed_table = importlib.util.module_from_spec(_spec)
+        sys.modules[_spec.name] = _indexed_table
+        _spec.loader.exec_module(_indexed_table)
+    IndexedTable = _indexed_table.IndexedTable
+
+__all__ = ["query_entities"]
+
+
+def _plan(table: Any, filters: Dict[str, Any]) -> Tuple[Optional[str], Dict[str, Any]]:
+    """(column to look up in the table's index or None to scan, filters left to check on each candidate)"""
+    if not isinstance(table, IndexedTable) or not filters:
+        return None, filters
+    lookup, fewest = None, None
+    for column, value in filters.items():
+        count = table.match_count(column, value)
+        if count is not None and (fewest is None or count < fewest):
+            lookup, fewest = column, count
+    if lookup is None:
+        # No filter column is indexed yet: index the first one, later queries reuse it
+        lookup = next(iter(filters))
+    return lookup, {column: value for column, value in filters.items() if column != lookup}
+
+
+def _candidates(table: Dict[Hashable, Any], filters: Dict[str, Any]) -> Iterable[Tuple[Hashable, Any]]:
+    lookup, remaining = _plan(table, filters)
+    pairs = table.items() if lookup is None else table.find(lookup, filters[lookup])
+    if not remaining:
+        return pairs
+    return (
+        (entity_id, entity_data) for entity_id, entity_data in pairs
+        if all(entity_data.get(key) == value for key, value in remaining.items())
+    )
+
+
+def query_entities(
+    table: Dict[Hashable, Any],
+    filters: Optional[Dict[str, Any]] = None,
+    id_field: Optional[str] = None,
+    id_format: Optional[Callable[[Hashable], Any]] = None,
+    fields: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Copies of the records matching every filter (record.get(key) == value), in
+    table order, each with its table key (passed through id_format, e.g. str)
+    under id_field. fields projects each result on those columns (id_field is
+    always kept) and limit caps the number of results.
+    """
+    results = []
+    if limit is not None and limit <= 0:
+        return results
+    for entity_id, entity_data in _candidates(table, filters or {}):
+        if fields is None:
+            result = {**entity_data}
+        else:
+            result = {field: entity_data[field] for field in fields if field in entity_data}
+        if id_field is not None:
+            result[id_field] = id_format(entity_id) if id_format is not None else entity_id
+        results.append(result)
+        if limit is not None and len(results) >= limit:
+            break
+    return results
+
+
+# Migration of the tool files' own filter loop
+
+IMPORT_LINE = "from tau_bench.envs.entity_query import query_entities"
+_TOOL_IMPORT = re.compile(r"^from tau_bench\.envs\.tool import Tool[ \t]*$", re.MULTILINE)
+_RESULTS_INIT = re.compile(r"^[ \t]*results = \[\][ \t]*\n", re.MULTILINE)
+_FILTER_LOOP = re.compile(
+    r'^(?P<indent>[ \t]*)for entity_id, entity_data in (?P<table>\w+)\.items\(\):\n'
+    r'(?P=indent)    if filters:\n'
+    r'(?P=indent)        match = True\n'
+    r'(?P=indent)        for filter_key, filter_value in filters\.items\(\):\n'
+    r'(?P=indent)            entity_value = entity_data\.get\(filter_key\)\n'
+    r'(?P=indent)            if entity_value != filter_value:\n'
+    r'(?P=indent)                match = False\n'
+    r'(?P=indent)                break\n'
+    r'(?P=indent)        if match:\n'
+    r'(?P=indent)            results\.append\(\{\*\*entity_data, (?P<field>\w+|"\w+"): (?P<id>entity_id|str\(entity_id\))\}\)\n'
+    r'(?P=indent)    else:\n'
+    r'(?P=indent)        results\.append\(\{\*\*entity_data, (?P=field): (?P=id)\}\)\n',
+    re.MULTILINE,
+)
+
+
+def _rewrite_filter_loop(match: "re.Match") -> str:
+    arguments = [match.group("table"), "filters", match.group("field")]
+    if match.group("id") != "entity_id":
+        arguments.append("str")
+    return f"{match.group('indent')}results = query_entities({', '.join(arguments)})\n"
+
+
+def migrate_source(source: str) -> str:
+    """Tool file source with its standard filter loop replaced by a query_entities() call"""
+    # Only files with a single loop, at the level of the results list it then builds by itself
+    loops = list(_FILTER_LOOP.finditer(source))
+    inits = list(_RESULTS_INIT.finditer(source))
+    if len(loops) != 1 or len(inits) != 1 or not inits[0].group(0).startswith(loops[0].group("indent") + "r"):
+        return source
+    migrated = _RESULTS_INIT.sub("", _FILTER_LOOP.sub(_rewrite_filter_loop, source))
+    if IMPORT_LINE in migrated:
+        return migrated
+    tool_import = _TOOL_IMPORT.search(migrated)
+    if tool_import is None:
+        return source
+    return migrated[:tool_import.end()] + "\n" + IMPORT_LINE + migrated[tool_import.end():]
+
+
+def migrate(paths: List[str]) -> int:
+    migrated_files = 0
+    for root_path in paths:
+        for folder, _, files in os.walk(root_path):
+            for file_name in sorted(files):
+                if not file_name.endswith(".py"):
+                    continue
+                path = os.path.join(folder, file_name)
+                with open(path, "r", newline="") as file:
+                    source = file.read()
+                # Keep the file's own line endings
+                crlf = "\r\n" in source
+                migrated = migrate_source(source.replace("\r\n", "\n") if crlf else source)
+                if crlf:
+                    migrated = migrated.replace("\n", "\r\n")
+                if migrated != source:
+                    with open(path, "w", newline="") as file:
+                        file.write(migrated)
+                    migrated_files += 1
+    return migrated_files
+
+
+if __name__ == "__main__":
+    envs_path = os.path.dirname(os.path.abspath(__file__))
+    print(f"Migrated {migrate(sys.argv[1:] or [envs_path])} tool files")
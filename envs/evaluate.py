@@ -0,0 +1,196 @@
+"""
+Offline evaluation of the recorded tasks of an environment interface.
+
+Every task of interface_<N>_tasks.py is replayed without any LLM: its
+recorded actions are run in order on a fresh database, then the Env computes
+the reward as in a real episode. Tasks are fanned out over a process pool;
+each worker builds the Env once and keeps its pristine data snapshot warm
+for all the tasks it runs. The report aggregates, for every task, the
+reward, the data and ground-truth hashes, the tables and records that differ
+when they do not match, and the error and duration of each action.
+
+    python -m tau_bench.envs.evaluate finance 1 --workers 8 --output report.json
+"""
+
+import os
+import sys
+import json
+import time
+import argparse
+import importlib
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+from tau_bench.envs.base import Env
+from tau_bench.envs.data_hash import data_tree, diff_trees
+from tau_bench.types import RESPOND_ACTION_NAME
+
+
+class ReplayUser:
+    """Stands in for the simulated user: recorded respond actions get an empty reply"""
+
+    def reset(self, instruction: Optional[str] = None) -> str:
+        return ""
+
+    def step(self, content: str) -> str:
+        return ""
+
+    def get_total_cost(self) -> float:
+        return 0.0
+
+
+def load_env(env_name: str, interface: int) -> Env:
+    """Env of an interface of envs/<env_name>, with its recorded tasks and no user model"""
+    module = importlib.import_module(f"tau_bench.envs.{env_name}.env")
+    env_classes = [
+        value for value in vars(module).values()
+        if isinstance(value, type) and issubclass(value, Env) and value is not Env and value.__module__ == module.__name__
+    ]
+    if len(env_classes) != 1:
+        raise ValueError(f"Expected one Env class in {module.__name__}, found {len(env_classes)}")
+    env = env_classes[0](
+        user_strategy="human",
+        task_split=f"test_interface_{interface}",
+        task_index=0,
+        interface_num=interface,
+    )
+    env.user = ReplayUser()
+    return env
+
+
+def action_error(observation: Any) -> Optional[str]:
+    """Error reported by a tool call, if any: an exception caught by Env.step or an error in the JSON output"""
+    if not isinstance(observation, str):
+        return None
+    if observation.startswith("Error:") or observation.startswith("Unknown action"):
+        return observation
+    try:
+        output = json.loads(observation)
+    except ValueError:
+        return None
+    if isinstance(output, dict) and (output.get("error") or output.get("success") is False):
+        return str(output.get("error") or output.get("message") or "success: false")
+    return None
+
+
+def evaluate_task(env: Env, task_index: int) -> Dict[str, Any]:
+    """Replay the recorded actions of a task and compute its reward"""
+    started = time.perf_counter()
+    env.reset(task_index)
+    result: Dict[str, Any] = {"task_index": task_index, "actions": []}
+    terminate_tools = env.terminate_tools
+    try:
+        # The terminate tools would compute the reward mid-trajectory: it is computed once all actions ran
+        env.terminate_tools = []
+        for action in env.task.actions:
+            action_started = time.perf_counter()
+            response = env.step(action)
+            result["actions"].append({
+                "name": action.name,
+                "seconds": time.perf_counter() - action_started,
+                "error": None if action.name == RESPOND_ACTION_NAME else action_error(response.observation),
+            })
+        env.terminate_tools = terminate_tools
+        tree = env.get_data_tree()
+        reward = env.calculate_reward()
+        gt_data_hash = getattr(reward.info, "gt_data_hash", None) or env.get_ground_truth_hash()
+        result.update(reward=reward.reward, data_hash=tree.hash, gt_data_hash=gt_data_hash)
+        if gt_data_hash != tree.hash:
+            # Replay the ground truth again (it may have come from the cache) to list the differences
+            result["differences"] = {
+                str(table): records for table, records in diff_trees(data_tree(env.replay_ground_truth()), tree).items()
+            }
+    except Exception:
+        result["error"] = traceback.format_exc()
+    finally:
+        env.terminate_tools = terminate_tools
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+# Env of this worker process, built once by _init_worker
+_worker_env: Optional[Env] = None
+
+
+def _init_worker(env_name: str, interface: int) -> None:
+    global _worker_env
+    _worker_env = load_env(env_name, interface)
+
+
+def _evaluate_in_worker(task_index: int) -> Dict[str, Any]:
+    return evaluate_task(_worker_env, task_index)
+
+
+def summarize(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    tools: Dict[str, Dict[str, Any]] = {}
+    for result in results:
+        for action in result["actions"]:
+            stats = tools.setdefault(action["name"], {"calls": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+            stats["calls"] += 1
+            stats["errors"] += action["error"] is not None
+            stats["total_seconds"] += action["seconds"]
+            stats["max_seconds"] = max(stats["max_seconds"], action["seconds"])
+    rewards = [result["reward"] for result in results if "reward" in result]
+    return {
+        "tasks": len(results),
+        "mean_reward": sum(rewards) / len(rewards) if rewards else None,
+        "passed": sum(reward == 1 for reward in rewards),
+        "failed": [result["task_index"] for result in results if result.get("reward", 1) != 1],
+        "crashed": [result["task_index"] for result in results if "error" in result],
+        "action_errors": sum(action["error"] is not None for result in results for action in result["actions"]),
+        "tools": dict(sorted(tools.items(), key=lambda item: -item[1]["total_seconds"])),
+    }
+
+
+def evaluate(env_name: str, interface: int, task_indexes: Optional[List[int]] = None, workers: Optional[int] = None) -> Dict[str, Any]:
+    """Report of the recorded tasks of an interface (all of them by default), over `workers` processes"""
+    started = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        env = load_env(env_name, interface)
+        task_indexes = range(len(env.tasks)) if task_indexes is None else task_indexes
+        results = [evaluate_task(env, task_index) for task_index in task_indexes]
+    else:
+        if task_indexes is None:
+            task_indexes = range(len(load_env(env_name, interface).tasks))
+        task_indexes = list(task_indexes)
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(env_name, interface)) as executor:
+            chunksize = max(1, len(task_indexes) // (workers * 4))
+            results = list(executor.map(_evaluate_in_worker, task_indexes, chunksize=chunksize))
+    return {
+        "environment": env_name,
+        "interface": interface,
+        "workers": workers,
+        "seconds": time.perf_counter() - started,
+        **summarize(results),
+        "results": results,
+    }
+
+
+def parse_task_indexes(text: str) -> List[int]:
+    """"0-9,12" -> [0, 1, ..., 9, 12]"""
+    indexes = []
+    for part in text.split(","):
+        first, _, last = part.partition("-")
+        indexes.extend(range(int(first), int(last or first) + 1))
+    return indexes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay the recorded tasks of an environment interface and report their rewards")
+    parser.add_argument("env", help="environment package under envs/, e.g. finance")
+    parser.add_argument("interface", type=int)
+    parser.add_argument("--tasks", type=parse_task_indexes, help="task indexes, e.g. 0-9,12 (default: all)")
+    parser.add_argument("--workers", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--output", help="write the JSON report here instead of stdout")
+    args = parser.parse_args()
+    report = evaluate(args.env, args.interface, args.tasks, args.workers)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+        print(f"{report['passed']}/{report['tasks']} tasks passed in {report['seconds']:.1f}s, report written to {args.output}")
+    else:
+        print(text)
+    sys.exit(0 if not report["failed"] and not report["crashed"] else 1)
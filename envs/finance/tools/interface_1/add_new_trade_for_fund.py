@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AddNewTradeForFund(Tool):
     @staticmethod
@@ -31,9 +32,7 @@ class AddNewTradeForFund(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         def get_fund_investors_via_holdings(fund_id: str) -> List[Dict[str, Any]]:
             """Get all investors who have portfolio holdings in this fund"""
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ExecuteTrade(Tool):
     @staticmethod
@@ -9,9 +10,7 @@ class ExecuteTrade(Tool):
                fund_manager_approval: bool) -> str:
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         if not fund_manager_approval:
             return json.dumps({"error": "Fund Manager approval required. Process halted."})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AddPortfolioHolding(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class AddPortfolioHolding(Tool):
                quantity: float, cost_basis: float) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         portfolio_holdings = data.get("portfolio_holdings", {})
         portfolios = data.get("portfolios", {})
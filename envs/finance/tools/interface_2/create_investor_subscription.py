@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateInvestorSubscription(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class CreateInvestorSubscription(Tool):
                compliance_officer_approval: bool) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         # if not compliance_officer_approval:
         #     return json.dumps({"error": "Compliance Officer approval required. Process halted."})
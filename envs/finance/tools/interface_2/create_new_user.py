@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateNewUser(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class CreateNewUser(Tool):
                email: str, role: str, timezone: str, status: str = "active") -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         users = data.get("users", {})
         
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class SwitchInvestorFunds(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class SwitchInvestorFunds(Tool):
                fund_id: str, switch_amount: float) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         funds = data.get("funds", {})
         investors = data.get("investors", {})
@@ -1,19 +1,18 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
+from tau_bench.envs.columnar_table import columnar_table
 
 class CalculateNav(Tool):
     @staticmethod
     def invoke(data: Dict[str, Any], fund_id: str, calculation_date: str) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         funds = data.get("funds", {})
         nav_records = data.get("nav_records", {})
-        trades = data.get("trades", {})
         instrument_prices = data.get("instrument_prices", {})
         
         # Validate fund exists
@@ -26,14 +25,24 @@ class CalculateNav(Tool):
         base_nav = float(fund.get("size", 1000000))  # Use fund size as base
         
         # Adjust based on recent trades for this fund
-        trade_adjustments = 0
-        for trade in trades.values():
-            if trade.get("fund_id") == fund_id and trade.get("status") == "executed":
-                trade_value = float(trade.get("quantity", 0)) * float(trade.get("price", 0))
-                if trade.get("side") == "buy":
-                    trade_adjustments += trade_value
-                else:
-                    trade_adjustments -= trade_value
+        trade_adjustments = None
+        trade_columns = columnar_table(data, "trades")
+        if trade_columns is not None:
+            # Vectorized over the unmodified trades table: buys add quantity * price, other sides subtract it
+            executed = trade_columns.where(fund_id=fund_id, status="executed")
+            try:
+                trade_adjustments = trade_columns.dot("quantity", "price", executed, negate=trade_columns.complement(trade_columns.where(side="buy")))
+            except ValueError:
+                pass  # Missing or non-numeric quantities and prices are converted by the loop
+        if trade_adjustments is None:
+            trade_adjustments = 0
+            for trade in data.get("trades", {}).values():
+                if trade.get("fund_id") == fund_id and trade.get("status") == "executed":
+                    trade_value = float(trade.get("quantity", 0)) * float(trade.get("price", 0))
+                    if trade.get("side") == "buy":
+                        trade_adjustments += trade_value
+                    else:
+                        trade_adjustments -= trade_value
         
         # Simple NAV calculation: base + 5% growth + trade adjustments
         nav_value = round(base_nav * 1.05 + trade_adjustments, 4)
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateCommitment(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class CreateCommitment(Tool):
                amount: float, due_date: str, compliance_officer_approval: bool) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         investors = data.get("investors", {})
         funds = data.get("funds", {})
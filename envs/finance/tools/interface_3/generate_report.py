@@ -4,6 +4,7 @@ from datetime import datetime
 import calendar
 import re
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class GenerateReport(Tool):
@@ -54,9 +55,7 @@ class GenerateReport(Tool):
             raise ValueError(f"Unsupported period format: {period}")
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         reports = data.get("reports", {})
         funds = data.get("funds", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class RegisterPayment(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class RegisterPayment(Tool):
                amount: str, payment_method: str, status: str = "draft") -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         invoices = data.get("invoices", {})
         payments = data.get("payments", {})
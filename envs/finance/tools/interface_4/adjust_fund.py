@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional, Union
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AdjustFund(Tool):
     @staticmethod
@@ -60,9 +61,7 @@ class AdjustFund(Tool):
         audit_trails = data.get("audit_trails", {})
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         # Only create audit trail if value actually changed
         if original_value != field_value:
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ComposeDocument(Tool):
     @staticmethod
@@ -9,9 +10,7 @@ class ComposeDocument(Tool):
                 file_format: str, report_id: str = None) -> str:
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         users = data.get("users", {})
         documents = data.get("documents", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.entity_query import query_entities
 
 
 class DiscoverFundEntities(Tool):
@@ -24,21 +25,9 @@ class DiscoverFundEntities(Tool):
                 "error": f"Invalid data format for {entity_type}"
             })
         
-        results = []
         entities = data.get("funds", {})
         
-        for entity_id, entity_data in entities.items():
-            if filters:
-                match = True
-                for filter_key, filter_value in filters.items():
-                    entity_value = entity_data.get(filter_key)
-                    if entity_value != filter_value:
-                        match = False
-                        break
-                if match:
-                    results.append({**entity_data, "fund_id": str(entity_id)})
-            else:
-                results.append({**entity_data, "fund_id": str(entity_id)})
+        results = query_entities(entities, filters, "fund_id", str)
         
         return json.dumps({
             "success": True,
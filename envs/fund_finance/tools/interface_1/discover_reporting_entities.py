@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.entity_query import query_entities
 
 
 class DiscoverReportingEntities(Tool):
@@ -25,7 +26,6 @@ class DiscoverReportingEntities(Tool):
                 "error": f"Invalid data format for {entity_type}"
             })
         
-        results = []
         
         id_field = {
             "reports": "report_id",
@@ -34,18 +34,7 @@ class DiscoverReportingEntities(Tool):
         
         entities = data.get(entity_type, {})
         
-        for entity_id, entity_data in entities.items():
-            if filters:
-                match = True
-                for filter_key, filter_value in filters.items():
-                    entity_value = entity_data.get(filter_key)
-                    if entity_value != filter_value:
-                        match = False
-                        break
-                if match:
-                    results.append({**entity_data, id_field: entity_id})
-            else:
-                results.append({**entity_data, id_field: entity_id})
+        results = query_entities(entities, filters, id_field)
         
         return json.dumps({
             "success": True,
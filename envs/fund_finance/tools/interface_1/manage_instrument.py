@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class ManageInstrument(Tool):
@@ -31,9 +32,7 @@ class ManageInstrument(Tool):
             A json string of the created/updated instrument or an error.
         """
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         instruments = data.get("instruments", {})
 
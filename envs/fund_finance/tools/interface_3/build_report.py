@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class BuildReport(Tool):
@@ -27,9 +28,7 @@ class BuildReport(Tool):
             A json string of the new report record or an error.
         """
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         reports = data.get("reports", {})
         funds = data.get("funds", {})
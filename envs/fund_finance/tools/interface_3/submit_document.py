@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class SubmitDocument(Tool):
     @staticmethod
@@ -9,9 +10,7 @@ class SubmitDocument(Tool):
                confidentiality_level: str = "internal", status: str = "available") -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         documents = data.get("documents", {})
         users = data.get("users", {})
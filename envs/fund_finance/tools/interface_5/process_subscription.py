@@ -2,6 +2,7 @@ import json
 import re
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ProcessSubscription(Tool):
     @staticmethod
@@ -26,9 +27,7 @@ class ProcessSubscription(Tool):
                 })
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         def validate_date_format(date_str: str, field_name: str) -> Optional[str]:
             if date_str:
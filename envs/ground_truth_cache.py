@@ -0,0 +1,205 @@
+"""
+Persistent cache of the ground-truth data hashes computed by
+Env.calculate_reward.
+
+The ground-truth hash of a task only depends on the pristine data, the code of
+the interface's tools and the task's actions, so it is stored on disk under a
+key made of the data snapshot's content digest, a digest of the tool source
+files and of the envs package's own modules (base, tool and the helpers the
+tools import: id_allocator, entity_query, indexed_table, data_snapshot, ...),
+the task index and a digest of the action list. Any change to the data, a
+tool, a shared module or a task yields another key: stale entries are never
+read, there is nothing to invalidate by hand.
+
+Tools whose source, or the source of an envs module they import from, reads
+the clock or random numbers can return different data on every replay; tasks
+using them are never cached. Env.get_ground_truth_hash also replays a task
+twice before caching it, which catches the rest (say, a random ID drawn in
+code outside the envs package).
+
+The cache file is envs/.ground_truth_hashes.json, or the path in the
+GROUND_TRUTH_CACHE environment variable (an empty value disables the cache).
+Standard library only, like data_snapshot.
+"""
+
+import os
+import re
+import sys
+import json
+import inspect
+import threading
+from hashlib import sha256
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+CACHE_FILE = ".ground_truth_hashes.json"
+# The envs package: the .py files directly in it are the modules every environment shares
+PACKAGE_PATH = os.path.dirname(os.path.abspath(__file__))
+# Tool source reading anything that changes between replays
+_VOLATILE_SOURCE = re.compile(r"datetime\.now|utcnow|time\.time\(|date\.today|\brandom\.|uuid\d?\(")
+
+# tool classes -> ((source file, mtime, size) of their files, digest of their sources, names of the volatile tools)
+_tools_digests: Dict[Tuple[type, ...], Tuple[Tuple[Tuple[str, int, int], ...], str, frozenset]] = {}
+# package folder -> ((file name, mtime, size) of its modules, digest of their sources)
+_package_digests: Dict[str, Tuple[Tuple[Tuple[str, int, int], ...], str]] = {}
+
+
+def package_digest(folder: Optional[str] = None) -> str:
+    """sha256 of the sources of the package's own modules (not its subpackages), recomputed when one changes"""
+    folder = folder or PACKAGE_PATH
+    with os.scandir(folder) as entries:
+        version = tuple(sorted(
+            (entry.name, entry.stat().st_mtime_ns, entry.stat().st_size)
+            for entry in entries if entry.name.endswith(".py") and entry.is_file()
+        ))
+    cached = _package_digests.get(folder)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    digest = sha256()
+    for name, _, _ in version:
+        with open(os.path.join(folder, name), "rb") as file:
+            digest.update(json.dumps([name, sha256(file.read()).hexdigest()]).encode())
+    _package_digests[folder] = (version, digest.hexdigest())
+    return digest.hexdigest()
+
+
+def tools_digest(tools: Iterable[type]) -> Tuple[str, frozenset]:
+    """
+    (sha256 of the tools' names and source files, of the envs modules they
+    import from and of the shared modules of the package, names of the tools
+    whose output is not reproducible). Recomputed when one of the files changes.
+    """
+    tools = tuple(tools)
+    tool_files = {tool: _tool_files(tool) for tool in tools}
+    version = tuple(sorted({
+        (path, *_file_version(path)) for files in tool_files.values() if files for path in files
+    }))
+    cached = _tools_digests.get(tools)
+    if cached is None or cached[0] != version:
+        cached = (version, *_tool_sources_digest(tool_files))
+        _tools_digests[tools] = cached
+    _, tool_sources, volatile = cached
+    return sha256(f"{tool_sources}:{package_digest()}".encode()).hexdigest(), volatile
+
+
+def _file_version(path: str) -> Tuple[int, int]:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def _tool_files(tool: type) -> Optional[List[str]]:
+    """Source file of a tool, then those of the envs modules its module imports names from; None without a source file"""
+    try:
+        tool_file = inspect.getsourcefile(tool)
+    except TypeError:
+        return None
+    if tool_file is None:
+        return None
+    tool_file = os.path.abspath(tool_file)
+    helpers = set()
+    module = sys.modules.get(tool.__module__)
+    for value in vars(module).values() if module is not None else ():
+        helper = value if inspect.ismodule(value) else sys.modules.get(getattr(value, "__module__", None) or "")
+        helper_file = getattr(helper, "__file__", None)
+        if helper_file and os.path.abspath(helper_file).startswith(os.path.join(PACKAGE_PATH, "")):
+            helpers.add(os.path.abspath(helper_file))
+    helpers.discard(tool_file)
+    return [tool_file] + sorted(helpers)
+
+
+def _tool_sources_digest(tool_files: Dict[type, Optional[List[str]]]) -> Tuple[str, frozenset]:
+    digest = sha256()
+    volatile = set()
+    for tool in sorted(tool_files, key=lambda tool: tool.get_info()["function"]["name"]):
+        name = tool.get_info()["function"]["name"]
+        files = tool_files[tool]
+        if files is None:
+            volatile.add(name)
+            files = []
+        sources = []
+        for path in files:
+            try:
+                with open(path, "rb") as file:
+                    source = file.read()
+            except OSError:
+                source = b""
+                volatile.add(name)
+            if _VOLATILE_SOURCE.search(source.decode("utf-8", "replace")):
+                volatile.add(name)
+            sources.append(sha256(source).hexdigest())
+        digest.update(json.dumps([name, sources]).encode())
+    return digest.hexdigest(), frozenset(volatile)
+
+
+def actions_digest(actions: Iterable[Any]) -> str:
+    return sha256(
+        json.dumps([[action.name, action.kwargs] for action in actions], sort_keys=True, default=str).encode()
+    ).hexdigest()
+
+
+class GroundTruthCache:
+    """JSON file of ground-truth hashes, re-read when another process updated it"""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._entries: Dict[str, str] = {}
+        self._mtime_ns: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            mtime_ns = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime_ns == self._mtime_ns:
+            return
+        try:
+            with open(self.path, "r") as file:
+                entries = json.load(file)
+        except (OSError, ValueError):
+            return
+        if isinstance(entries, dict):
+            self._entries.update(entries)
+        self._mtime_ns = mtime_ns
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            if key not in self._entries:
+                self._refresh()
+            return self._entries.get(key)
+
+    def put(self, key: str, data_hash: str) -> None:
+        with self._lock:
+            self._refresh()
+            self._entries[key] = data_hash
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            try:
+                with open(temp_path, "w") as file:
+                    json.dump(self._entries, file)
+                os.replace(temp_path, self.path)
+            except OSError as e:
+                print(f"Could not write {self.path}: {e}")
+
+
+def cache_key(data_digest: str, tools: str, task_index: int, actions: str, hash_version: int) -> str:
+    return f"{hash_version}:{data_digest}:{tools}:{task_index}:{actions}"
+
+
+_cache: Optional[GroundTruthCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> Optional[GroundTruthCache]:
+    """Process-wide cache, None when disabled"""
+    global _cache
+    path = os.environ.get("GROUND_TRUTH_CACHE")
+    if path is None:
+        path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CACHE_FILE)
+    if not path:
+        return None
+    with _cache_lock:
+        if _cache is None or _cache.path != path:
+            _cache = GroundTruthCache(path)
+        return _cache
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManageEmployee(Tool):
     """
@@ -25,9 +26,7 @@ class ManageEmployee(Tool):
         """
         def generate_id(table: Dict[str, Any]) -> str:
             """Generates a new unique ID for a record."""
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         def validate_date_format(date_str: str, field_name: str) -> bool:
             """Validates date format YYYY-MM-DD"""
@@ -2,6 +2,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class HandlePerformanceReview(Tool):
     @staticmethod
@@ -15,9 +16,7 @@ class HandlePerformanceReview(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
             
         def is_valid_date_order(start_date: str, end_date: str) -> bool:
             """Check if start date is before end date - simplified for demo"""
@@ -2,6 +2,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AdministerJobApplication(Tool):
     @staticmethod
@@ -15,9 +16,7 @@ class AdministerJobApplication(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
             
         def is_future_date(date_str: str) -> bool:
             """Check if date is in future - simplified for demo"""
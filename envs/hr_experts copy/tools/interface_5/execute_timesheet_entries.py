@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ExecuteTimesheetEntries(Tool):
     @staticmethod
@@ -14,9 +15,7 @@ class ExecuteTimesheetEntries(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
             
         def is_valid_time_order(clock_in: str, clock_out: str) -> bool:
             """Check if clock_in time is before clock_out time - simplified for demo"""
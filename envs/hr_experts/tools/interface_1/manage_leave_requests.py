@@ -2,6 +2,7 @@ import json
 from typing import Any, Dict, Optional
 import datetime
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManageLeaveRequests(Tool):
     """
@@ -26,9 +27,7 @@ class ManageLeaveRequests(Tool):
         """
         def generate_id(table: Dict[str, Any]) -> str:
             """Generates a new unique ID for a record."""
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         timestamp = "2025-10-01T12:00:00"
         leave_requests = data.get("leave_requests", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ProcessJobPositionSkills(Tool):
     """
@@ -18,9 +19,7 @@ class ProcessJobPositionSkills(Tool):
         """
         def generate_id(table: Dict[str, Any]) -> str:
             """Generates a new unique ID for a record."""
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         job_positions = data.get("job_positions", {})
         job_position_skills = data.get("job_position_skills", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AdministerInterview(Tool):
     @staticmethod
@@ -14,9 +15,7 @@ class AdministerInterview(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
             
         def is_future_datetime(datetime_str: str) -> bool:
             """Check if datetime is in future - simplified for demo"""
@@ -1,15 +1,11 @@
-import json
 import os
 from typing import Any
 
+from tau_bench.envs.data_snapshot import load_data as load_snapshot_data
+
 FOLDER_PATH = os.path.dirname(__file__)
 
 
 def load_data() -> dict[str, Any]:
-    data = {}
-    for filename in os.listdir(FOLDER_PATH):
-        if filename.endswith(".json"):
-            key = filename[:-5]  # Remove .json extension
-            with open(os.path.join(FOLDER_PATH, filename)) as f:
-                data[key] = json.load(f)
-    return data
\ No newline at end of file
+    # Tables come from the folder's compiled snapshot, rebuilt from the JSON files when they change
+    return load_snapshot_data(FOLDER_PATH)
\ No newline at end of file
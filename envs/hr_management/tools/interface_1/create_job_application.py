@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateJobApplication(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class CreateJobApplication(Tool):
                application_date: str, recruiter_id: str, status: str = 'submitted') -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         candidates = data.get("candidates", {})
         job_positions = data.get("job_positions", {})
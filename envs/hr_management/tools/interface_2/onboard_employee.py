@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class OnboardEmployee(Tool):
     @staticmethod
@@ -44,9 +45,7 @@ class OnboardEmployee(Tool):
             raise ValueError(f"Invalid employment_type. Must be one of {valid_types}")
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         employee_id = generate_id(employees)
 
@@ -1,15 +1,14 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateExpenseReimbursement(Tool):
     @staticmethod
     def invoke(data: Dict[str, Any], employee_id: str, expense_date: str, 
                amount: float, expense_type: str, receipt_file_path: str = None) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         employees = data.get("employees", {})
         expense_reimbursements = data.setdefault("expense_reimbursements", {})
@@ -1,15 +1,14 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class InsertPayrollDeduction(Tool):
     @staticmethod
     def invoke(data: Dict[str, Any], payroll_id: str, deduction_type: str, 
                amount: float, created_by: str) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         payroll_records = data.get("payroll_records", {})
         users = data.get("users", {})
@@ -5,6 +5,7 @@ from datetime import datetime, date
 
 
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class ProcessPayrollRun(Tool):
@@ -35,9 +36,7 @@ class ProcessPayrollRun(Tool):
                     raise ValueError("Dates must be ISO format YYYY-MM-DD")
 
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         def to_decimal_str(val: float, places: int = 2) -> str:
             return f"{round(val, places):.{places}f}"
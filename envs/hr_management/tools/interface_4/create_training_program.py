@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateTrainingProgram(Tool):
     @staticmethod
@@ -9,9 +10,7 @@ class CreateTrainingProgram(Tool):
                mandatory: bool = False, status: str = 'active') -> str:
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         training_programs = data.get("training_programs", {})
         
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class EnrollEmployeeTraining(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class EnrollEmployeeTraining(Tool):
                enrollment_date: str, status: str = 'enrolled') -> str:
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         employees = data.get("employees", {})
         training_programs = data.get("training_programs", {})
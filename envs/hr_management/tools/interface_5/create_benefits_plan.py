@@ -4,6 +4,7 @@ from typing import Any, Dict, Optional
 from datetime import datetime, date
 
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class CreateBenefitsPlan(Tool):
@@ -27,9 +28,7 @@ class CreateBenefitsPlan(Tool):
 
         # ---------- helpers ----------
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         def parse_date(d: str) -> date:
             try:
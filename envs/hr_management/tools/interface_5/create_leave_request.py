@@ -2,15 +2,14 @@ import json
 from datetime import datetime
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateLeaveRequest(Tool):
     @staticmethod
     def invoke(data: Dict[str, Any], employee_id: str, leave_type: str, 
                start_date: str, end_date: str, days_requested: float) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         def parse_date(date_str: str) -> datetime:
             try:
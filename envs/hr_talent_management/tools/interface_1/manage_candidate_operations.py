@@ -2,6 +2,7 @@ import json
 import re
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class ManageCandidateOperations(Tool):
@@ -16,9 +17,7 @@ class ManageCandidateOperations(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         # Validate operation_type
         valid_operations = ["create_candidate", "update_candidate"]
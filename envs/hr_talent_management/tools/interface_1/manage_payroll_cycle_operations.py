@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManagePayrollCycleOperations(Tool):
     @staticmethod
@@ -13,9 +14,7 @@ class ManagePayrollCycleOperations(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
             
         def is_valid_date_order(start_date: str, end_date: str) -> bool:
             """Check if start date is before end date"""
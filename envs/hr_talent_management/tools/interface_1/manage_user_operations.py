@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManageUserOperations(Tool):
     @staticmethod
@@ -20,9 +21,7 @@ class ManageUserOperations(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         if operation_type not in ["create_user", "update_user", "deactivate_user"]:
             return json.dumps({
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AdministerPayrollInputOperations(Tool):
     @staticmethod
@@ -17,9 +18,7 @@ class AdministerPayrollInputOperations(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
             
         def is_valid_hours(hours: float) -> bool:
             """Check if hours are valid (positive and <= 24 per day)"""
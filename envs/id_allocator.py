@@ -0,0 +1,161 @@
+"""
+Shared allocator for the numeric record IDs of the environment tables.
+
+Tools used to define their own generate_id() computing
+max(int(k) for k in table.keys()) + 1, a scan of the whole table on every
+insert. next_id() returns exactly the same IDs, but remembers per table the
+largest key and where the table ended at the previous call. A call then only
+looks at the keys inserted since, and falls back to a full scan when keys
+were deleted (which may lower the maximum). Handing out an ID changes
+nothing: a tool that fails before inserting its record leaves the next ID
+as it was, like the scan did.
+
+Migrate the tool files with `python envs/id_allocator.py [paths ...]`, which
+rewrites the standard generate_id() bodies into calls to next_id().
+Standard library only, like data_snapshot.
+"""
+
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List
+
+__all__ = ["IdAllocator", "next_id"]
+
+# Tables whose allocation state is remembered. The state keeps its table alive
+# (so id() cannot be reused by another dict), hence the small bound
+TABLES_TRACKED = 16
+
+
+class _TableState:
+    __slots__ = ("table", "max_value", "max_key", "last_key", "size")
+
+    def __init__(self, table: Dict[Hashable, Any]) -> None:
+        self.table = table
+        self.max_key = max(table.keys(), key=int)
+        self.max_value = int(self.max_key)
+        self.last_key = next(reversed(table))
+        self.size = len(table)
+
+    def advance(self) -> bool:
+        """Account for the keys inserted since the previous call; False when the state cannot be trusted anymore"""
+        table = self.table
+        if self.max_key not in table:
+            return False
+        inserted = []
+        for key in reversed(table):
+            if key == self.last_key:
+                break
+            inserted.append(key)
+        else:
+            return False
+        # Any deletion shows as fewer keys than the ones seen plus the ones just inserted
+        if len(table) != self.size + len(inserted):
+            return False
+        for key in inserted:
+            value = int(key)
+            if value > self.max_value:
+                self.max_value, self.max_key = value, key
+        if inserted:
+            self.last_key = inserted[0]
+            self.size = len(table)
+        return True
+
+
+class IdAllocator:
+    """Per-table allocation state for next_id(), least recently used tables forgotten first"""
+
+    def __init__(self, capacity: int = TABLES_TRACKED) -> None:
+        self.capacity = capacity
+        self._states: "OrderedDict[int, _TableState]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def next_id(self, table: Dict[Hashable, Any]) -> int:
+        """max(int(k) for k in table.keys()) + 1, or 1 for an empty table"""
+        if not table:
+            return 1
+        with self._lock:
+            state = self._states.get(id(table))
+            if state is None or state.table is not table or not state.advance():
+                state = _TableState(table)
+                self._states[id(table)] = state
+            self._states.move_to_end(id(table))
+            while len(self._states) > self.capacity:
+                self._states.popitem(last=False)
+            return state.max_value + 1
+
+
+_allocator = IdAllocator()
+
+
+def next_id(table: Dict[Hashable, Any]) -> int:
+    """Next numeric ID of a table, exactly as max(int(k) for k in table.keys()) + 1 (1 when empty)"""
+    return _allocator.next_id(table)
+
+
+# Migration of the tool files' own generate_id()
+
+IMPORT_LINE = "from tau_bench.envs.id_allocator import next_id"
+_TOOL_IMPORT = re.compile(r"^from tau_bench\.envs\.tool import Tool[ \t]*$", re.MULTILINE)
+_GENERATE_ID = re.compile(
+    r'^(?P<indent>[ \t]*)def generate_id\(table: Dict\[str, Any\]\) -> (?P<type>int|str):\n'
+    r'(?P<doc>(?P=indent)[ \t]+"""[^\n]*"""\n)?'
+    r'(?P=indent)[ \t]+if not table:\n'
+    r'(?P=indent)[ \t]+return (?:1|"1")\n'
+    r'(?P<body>(?P=indent)[ \t]+)return (?:max\(int\(k\) for k in table\.keys\(\)\) \+ 1|str\(max\(int\(k\) for k in table\.keys\(\)\) \+ 1\))\n',
+    re.MULTILINE,
+)
+
+
+def _rewrite_generate_id(match: "re.Match") -> str:
+    empty_id, computed_id = ("1", "next_id(table)") if match.group("type") == "int" else ('"1"', "str(next_id(table))")
+    # Only the int/str pairs the original code returned are rewritten
+    if f"return {empty_id}\n" not in match.group(0):
+        return match.group(0)
+    if ("str(max(" in match.group(0)) != (match.group("type") == "str"):
+        return match.group(0)
+    return (
+        f"{match.group('indent')}def generate_id(table: Dict[str, Any]) -> {match.group('type')}:\n"
+        + (match.group("doc") or "")
+        + f"{match.group('body')}return {computed_id}\n"
+    )
+
+
+def migrate_source(source: str) -> str:
+    """Tool file source with its standard generate_id() bodies calling next_id()"""
+    migrated = _GENERATE_ID.sub(_rewrite_generate_id, source)
+    if migrated == source or IMPORT_LINE in migrated:
+        return migrated
+    tool_import = _TOOL_IMPORT.search(migrated)
+    if tool_import is None:
+        return source
+    return migrated[:tool_import.end()] + "\n" + IMPORT_LINE + migrated[tool_import.end():]
+
+
+def migrate(paths: List[str]) -> int:
+    migrated_files = 0
+    for root_path in paths:
+        for folder, _, files in os.walk(root_path):
+            for file_name in sorted(files):
+                if not file_name.endswith(".py"):
+                    continue
+                path = os.path.join(folder, file_name)
+                with open(path, "r", newline="") as file:
+                    source = file.read()
+                # Keep the file's own line endings
+                crlf = "\r\n" in source
+                migrated = migrate_source(source.replace("\r\n", "\n") if crlf else source)
+                if crlf:
+                    migrated = migrated.replace("\n", "\r\n")
+                if migrated != source:
+                    with open(path, "w", newline="") as file:
+                        file.write(migrated)
+                    migrated_files += 1
+    return migrated_files
+
+
+if __name__ == "__main__":
+    envs_path = os.path.dirname(os.path.abspath(__file__))
+    print(f"Migrated {migrate(sys.argv[1:] or [envs_path])} tool files")
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateIncident(Tool):
     @staticmethod
@@ -66,9 +67,7 @@ class CreateIncident(Tool):
         assigned_manager_id: str = None
     ) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         try:
             incidents = data.setdefault("incidents", {})
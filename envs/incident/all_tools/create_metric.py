@@ -2,6 +2,7 @@ import json
 from typing import Any, Dict, Optional
 from datetime import datetime
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateMetric(Tool):
     @staticmethod
@@ -20,9 +21,7 @@ class CreateMetric(Tool):
         target_minutes: int = None
     ) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         try:
             metrics = data.setdefault("metrics", {})
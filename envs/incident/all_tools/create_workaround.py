@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateWorkaround(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class CreateWorkaround(Tool):
         if not note:
             return
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         update_id = generate_id(updates_table)
         timestamp = "2025-10-01T00:00:00"
         updates_table[update_id] = {
@@ -34,9 +33,7 @@ class CreateWorkaround(Tool):
         note: str = None
     ) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         try:
             workarounds = data.setdefault("workarounds", {})
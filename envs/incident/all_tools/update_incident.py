@@ -1,14 +1,13 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class UpdateIncident(Tool):
     @staticmethod
     def _record_update(updates_table: Dict[str, Any], incident_id: str, update_type: str, field_name: str, old_value: Any, new_value: Any):
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         update_id = generate_id(updates_table)
         timestamp = "2025-10-01T00:00:00"
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class RecordIncident(Tool):
     @staticmethod
@@ -42,9 +43,7 @@ class RecordIncident(Tool):
             return "P4"
 
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         try:
             incidents = data.setdefault("incidents", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class RecordRollbackRequest(Tool):
     @staticmethod
@@ -12,9 +13,7 @@ class RecordRollbackRequest(Tool):
         status: str = "requested"
     ) -> str:
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         try:
             rollbacks = data.setdefault("rollback_requests", {})
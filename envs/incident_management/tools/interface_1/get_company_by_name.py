@@ -1,12 +1,11 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 # Utility function to generate IDs
 def generate_id(table: Dict[str, Any]) -> int:
-    if not table:
-        return 1
-    return max(int(k) for k in table.keys()) + 1
+    return next_id(table)
 
 
 class GetCompanyByName(Tool):
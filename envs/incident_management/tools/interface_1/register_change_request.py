@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class RegisterChangeRequest(Tool):
     @staticmethod
@@ -10,9 +11,7 @@ class RegisterChangeRequest(Tool):
                scheduled_start: Optional[str] = None, scheduled_end: Optional[str] = None) -> str:
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         change_requests = data.get("change_requests", {})
         users = data.get("users", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class AddIncidentComment(Tool):
@@ -9,9 +10,7 @@ class AddIncidentComment(Tool):
                comment_text: str, is_public: bool = True) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         incidents = data.get("incidents", {})
         users = data.get("users", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class CreateIncident(Tool):
@@ -11,9 +12,7 @@ class CreateIncident(Tool):
                department_id: Optional[str] = None, priority: str = "medium",
                status: str = "open") -> str:
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         users = data.get("users", {})
         companies = data.get("companies", {})
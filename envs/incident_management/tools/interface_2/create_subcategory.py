@@ -1,15 +1,14 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class CreateSubcategory(Tool):
     @staticmethod
     def invoke(data: Dict[str, Any], category_id: str, name: str) -> str:
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         categories = data.get("categories", {})
         subcategories = data.get("subcategories", {})
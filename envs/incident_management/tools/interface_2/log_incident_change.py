@@ -1,15 +1,14 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class LogIncidentChange(Tool):
     @staticmethod
     def invoke(data: Dict[str, Any], incident_id: str, changed_by: str,
                incident_values: Optional[Dict] = None, task_values: Optional[Dict] = None) -> str:
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         incidents = data.get("incidents", {})
         users = data.get("users", {})
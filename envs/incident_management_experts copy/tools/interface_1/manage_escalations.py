@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManageEscalations(Tool):
     @staticmethod
@@ -13,9 +14,7 @@ class ManageEscalations(Tool):
         - update: Update existing escalation (requires escalation_id and escalation_data with fields to change)
         """
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         def generate_code(prefix: str, table: Dict[str, Any]) -> str:
             max_num = 0
@@ -2,6 +2,7 @@ import json
 from typing import Any, Dict
 from datetime import datetime
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManagePostIncidentReviews(Tool):
     @staticmethod
@@ -22,9 +23,7 @@ class ManagePostIncidentReviews(Tool):
         """
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         if action not in ["create", "update"]:
             return json.dumps({
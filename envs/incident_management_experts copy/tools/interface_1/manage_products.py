@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManageProducts(Tool):
     @staticmethod
@@ -21,9 +22,7 @@ class ManageProducts(Tool):
         vendors = data.get("vendors", {})
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         valid_types = [
             "payment_processing", "banking_system", "api_gateway",
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.entity_query import query_entities
 
 
 class FindIncidentEntities(Tool):
@@ -26,7 +27,6 @@ class FindIncidentEntities(Tool):
                 "error": f"Invalid data format for {entity_type}"
             })
         
-        results = []
         entities = data.get(entity_type, {})
         
         # Determine the ID field based on entity type
@@ -37,18 +37,7 @@ class FindIncidentEntities(Tool):
         }
         id_field = id_field_map[entity_type]
         
-        for entity_id, entity_data in entities.items():
-            if filters:
-                match = True
-                for filter_key, filter_value in filters.items():
-                    entity_value = entity_data.get(filter_key)
-                    if entity_value != filter_value:
-                        match = False
-                        break
-                if match:
-                    results.append({**entity_data, id_field: str(entity_id)})
-            else:
-                results.append({**entity_data, id_field: str(entity_id)})
+        results = query_entities(entities, filters, id_field, str)
         
         return json.dumps({
             "success": True,
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.entity_query import query_entities
 
 
 class FindSubscriptionAgreements(Tool):
@@ -25,24 +26,12 @@ class FindSubscriptionAgreements(Tool):
                 "error": f"Invalid data format for {entity_type}"
             })
         
-        results = []
         entities = data.get(entity_type, {})
         
         # Determine the ID field based on entity type
         id_field = "subscription_id" if entity_type == "client_subscriptions" else "sla_id"
         
-        for entity_id, entity_data in entities.items():
-            if filters:
-                match = True
-                for filter_key, filter_value in filters.items():
-                    entity_value = entity_data.get(filter_key)
-                    if entity_value != filter_value:
-                        match = False
-                        break
-                if match:
-                    results.append({**entity_data, id_field: str(entity_id)})
-            else:
-                results.append({**entity_data, id_field: str(entity_id)})
+        results = query_entities(entities, filters, id_field, str)
         
         return json.dumps({
             "success": True,
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 
 class HandleClients(Tool):
@@ -14,9 +15,7 @@ class HandleClients(Tool):
         - update: Update existing client (requires client_id and client_data with fields to change)
         """
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         if action not in ["create", "update"]:
             return json.dumps({
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class HandleMetrics(Tool):
     @staticmethod
@@ -17,9 +18,7 @@ class HandleMetrics(Tool):
         """
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         # def check_approval(data: Dict[str, Any], required_roles: list) -> bool:
         #     approvals = data.get("approvals", {})
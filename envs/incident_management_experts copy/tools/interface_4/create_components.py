@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreateComponents(Tool):
     @staticmethod
@@ -23,9 +24,7 @@ class CreateComponents(Tool):
         products = data.get("products", {})
 
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
 
         valid_types = [
             "sftp_server", "api_endpoint", "database", "load_balancer",
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.entity_query import query_entities
 
 
 class SearchAudit(Tool):
@@ -25,21 +26,9 @@ class SearchAudit(Tool):
                 "error": f"Invalid data format for {entity_type}"
             })
         
-        results = []
         entities = data.get(entity_type, {})
         
-        for entity_id, entity_data in entities.items():
-            if filters:
-                match = True
-                for filter_key, filter_value in filters.items():
-                    entity_value = entity_data.get(filter_key)
-                    if entity_value != filter_value:
-                        match = False
-                        break
-                if match:
-                    results.append({**entity_data, "audit_id": entity_id})
-            else:
-                results.append({**entity_data, "audit_id": entity_id})
+        results = query_entities(entities, filters, "audit_id")
         
         return json.dumps({
             "success": True,
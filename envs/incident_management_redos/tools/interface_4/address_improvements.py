@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AddressImprovements(Tool):
     @staticmethod
@@ -18,9 +19,7 @@ class AddressImprovements(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         def generate_rca_number(rca_id: int) -> str:
             return f"RCA{str(rca_id).zfill(7)}"
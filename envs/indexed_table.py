@@ -0,0 +1,265 @@
+"""
+Tables with secondary indexes that keep themselves up to date.
+
+An IndexedTable is a dict of records, like every table of the environment
+data, that can answer "which records have column == value" without scanning
+the table. The index of a column is built the first time it is queried (the
+*_id columns can be built up front) and is then maintained by every insert,
+update and delete made through normal dict operations, on the table or on one
+of its records.
+
+The records a table is built from are stored as IndexedRecord, a dict
+subclass that reports changes of indexed columns to its table. A plain dict
+assigned into the table later is stored as is, since the caller may keep
+changing it (rec = {...}; table[key] = rec; rec["status"] = ...): such records
+are left out of the indexes and checked directly by every lookup.
+
+Standard library only, like data_snapshot.
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+# Columns named like this are indexed as soon as the table is built by index_table()
+FOREIGN_KEY_SUFFIX = "_id"
+
+
+class IndexedRecord(dict):
+    """Record of an IndexedTable; changes to indexed columns update the table's indexes"""
+
+    __slots__ = ("_table", "_key")
+
+    def __init__(self, table: "IndexedTable", key: Hashable, record: Dict[str, Any]) -> None:
+        super().__init__(record)
+        self._table = table
+        self._key = key
+
+    def _indexed(self, column: Any) -> bool:
+        table = self._table
+        return table is not None and column in table._indexes
+
+    def __setitem__(self, column, value):
+        if self._indexed(column):
+            self._table._unindex_value(column, dict.get(self, column), self._key)
+            dict.__setitem__(self, column, value)
+            self._table._index_value(column, value, self._key)
+        else:
+            dict.__setitem__(self, column, value)
+
+    def __delitem__(self, column):
+        if self._indexed(column):
+            self._table._unindex_value(column, dict.get(self, column), self._key)
+            dict.__delitem__(self, column)
+            self._table._index_value(column, None, self._key)
+        else:
+            dict.__delitem__(self, column)
+
+    def update(self, *args, **kwargs):
+        for column, value in dict(*args, **kwargs).items():
+            self[column] = value
+
+    def setdefault(self, column, default=None):
+        if column not in self:
+            self[column] = default
+        return dict.__getitem__(self, column)
+
+    def pop(self, column, *default):
+        if column in self:
+            value = dict.__getitem__(self, column)
+            del self[column]
+            return value
+        return dict.pop(self, column, *default)
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        column = next(reversed(self))
+        return column, self.pop(column)
+
+    def clear(self):
+        for column in list(self):
+            del self[column]
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (dict, (dict(self),))
+
+
+class IndexedTable(dict):
+    """
+    dict of records (id -> record) with secondary indexes: find(column, value)
+    returns the (id, record) pairs whose record.get(column) == value, in table
+    order, in time proportional to the number of matches.
+    """
+
+    def __init__(self, records: Optional[Dict[Hashable, Any]] = None, columns: Iterable[str] = ()) -> None:
+        super().__init__()
+        # column -> value -> {record id: None}; None when a value of the column is unhashable
+        self._indexes: Dict[str, Optional[Dict[Any, Dict[Hashable, None]]]] = {}
+        # record id -> insertion sequence number, to return matches in table order
+        self._positions: Dict[Hashable, int] = {}
+        self._next_position = 0
+        # ids of the plain dict records assigned into the table, which find() checks one by one
+        self._unindexed: Dict[Hashable, None] = {}
+        # The table owns the records it is built from
+        for key, record in (records or {}).items():
+            self[key] = IndexedRecord(self, key, record) if isinstance(record, dict) else record
+        for column in columns:
+            self._build_index(column)
+
+    @property
+    def indexed_columns(self) -> List[str]:
+        return [column for column, index in self._indexes.items() if index is not None]
+
+    def _build_index(self, column: str) -> None:
+        index: Dict[Any, Dict[Hashable, None]] = {}
+        try:
+            for key, record in dict.items(self):
+                if key not in self._unindexed and isinstance(record, dict):
+                    index.setdefault(record.get(column), {})[key] = None
+        except TypeError:
+            index = None
+        self._indexes[column] = index
+
+    def _index_value(self, column: str, value: Any, key: Hashable) -> None:
+        index = self._indexes[column]
+        if index is None:
+            return
+        try:
+            index.setdefault(value, {})[key] = None
+        except TypeError:
+            # An unhashable value makes the column unindexable; find() scans it from now on
+            self._indexes[column] = None
+
+    def _unindex_value(self, column: str, value: Any, key: Hashable) -> None:
+        index = self._indexes[column]
+        if index is None:
+            return
+        try:
+            keys = index.get(value)
+        except TypeError:
+            return
+        if keys is not None:
+            keys.pop(key, None)
+            if not keys:
+                del index[value]
+
+    def _owns(self, key: Hashable, record: Any) -> bool:
+        return isinstance(record, IndexedRecord) and record._table is self and record._key == key
+
+    def _index_record(self, key: Hashable, record: Any) -> None:
+        if self._owns(key, record):
+            for column in self._indexes:
+                self._index_value(column, record.get(column), key)
+        elif isinstance(record, dict):
+            self._unindexed[key] = None
+
+    def _unindex_record(self, key: Hashable, record: Any) -> None:
+        if key in self._unindexed:
+            del self._unindexed[key]
+        elif self._owns(key, record):
+            for column in self._indexes:
+                self._unindex_value(column, record.get(column), key)
+            record._table = None
+
+    def match_count(self, column: str, value: Any) -> Optional[int]:
+        """Upper bound of the number of records find(column, value) returns, None when the column has no index"""
+        index = self._indexes.get(column)
+        if index is None:
+            return None
+        try:
+            return len(index.get(value, ())) + len(self._unindexed)
+        except TypeError:
+            return len(self._unindexed)
+
+    def find(self, column: str, value: Any) -> List[Tuple[Hashable, Any]]:
+        """(id, record) pairs whose record.get(column) == value, in table order"""
+        if column not in self._indexes:
+            self._build_index(column)
+        index = self._indexes[column]
+        if index is None:
+            return [
+                (key, record) for key, record in dict.items(self)
+                if isinstance(record, dict) and record.get(column) == value
+            ]
+        try:
+            keys = list(index.get(value, ()))
+        except TypeError:
+            keys = []
+        keys.extend(key for key in self._unindexed if dict.__getitem__(self, key).get(column) == value)
+        positions = self._positions
+        return [(key, dict.__getitem__(self, key)) for key in sorted(keys, key=positions.__getitem__)]
+
+    def __setitem__(self, key, record):
+        if dict.__contains__(self, key):
+            self._unindex_record(key, dict.__getitem__(self, key))
+        else:
+            self._positions[key] = self._next_position
+            self._next_position += 1
+        if isinstance(record, IndexedRecord) and record._table is None:
+            # A record this table removed (or replaced) can report its changes again
+            record._table = self
+            record._key = key
+        dict.__setitem__(self, key, record)
+        self._index_record(key, record)
+
+    def __delitem__(self, key):
+        self._unindex_record(key, dict.__getitem__(self, key))
+        dict.__delitem__(self, key)
+        del self._positions[key]
+
+    def update(self, *args, **kwargs):
+        for key, record in dict(*args, **kwargs).items():
+            self[key] = record
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def pop(self, key, *default):
+        if key in self:
+            record = dict.__getitem__(self, key)
+            del self[key]
+            return record
+        return dict.pop(self, key, *default)
+
+    def popitem(self):
+        if not self:
+            raise KeyError("popitem(): dictionary is empty")
+        key = next(reversed(self))
+        return key, self.pop(key)
+
+    def clear(self):
+        for key in list(self):
+            del self[key]
+
+    def copy(self):
+        return dict(self)
+
+    def __reduce__(self):
+        return (IndexedTable, ({key: dict(record) if isinstance(record, dict) else record for key, record in dict.items(self)}, self.indexed_columns))
+
+
+def foreign_key_columns(table: Dict[Hashable, Any]) -> List[str]:
+    """*_id columns of the table's first record: the ones tools filter on"""
+    for record in table.values():
+        if isinstance(record, dict):
+            return [column for column in record if column.endswith(FOREIGN_KEY_SUFFIX)]
+        return []
+    return []
+
+
+def index_table(table: Any) -> Any:
+    """IndexedTable copy of a dict of records, with its foreign-key columns indexed; other values are returned as is"""
+    if not isinstance(table, dict) or isinstance(table, IndexedTable):
+        return table
+    return IndexedTable(table, foreign_key_columns(table))
+
+
+def find(table: Dict[Hashable, Any], column: str, value: Any) -> List[Tuple[Hashable, Any]]:
+    """(id, record) pairs of any table whose record.get(column) == value: an index lookup on an IndexedTable, else a scan"""
+    if isinstance(table, IndexedTable):
+        return table.find(column, value)
+    return [(key, record) for key, record in table.items() if isinstance(record, dict) and record.get(column) == value]
@@ -0,0 +1,264 @@
+"""
+Synthetic scaling of an environment's data folder for load testing.
+
+scale_data() writes a copy of every JSON table of a data folder with its
+records replicated `factor` times. Copy 0 is the original data; every other
+copy is an isomorphic replica of it: records get new ids, and the columns
+inferred as foreign keys point to the replica of the record they referenced,
+so every reference of the scaled data resolves. The schema is inferred from
+the records themselves:
+
+- the primary-key column of a table holds each record's own key;
+- a *_id or *_by column is a foreign key to the table whose keys contain all
+  its values, chosen by name (the referenced table's primary-key column, or
+  its name, or users for person columns) when several tables qualify, and
+  left as is when none is named like it; <x>_id columns with an <x>_type
+  sibling naming a table are references to that table;
+- text columns whose values are all distinct (emails, codes, names) stay
+  unique: "+<copy>" is added to the local part of emails, "-<copy>" to
+  other text. Dates and timestamps are left alone.
+
+Numeric string ids are shifted by `copy * (largest id)`, others get a
+"-<copy>" suffix. Tables that are not dicts of records are copied as they are.
+
+    python envs/scale_data.py finance --factor 10 --output /tmp/scaled
+
+writes /tmp/scaled/finance/*.json. Setting ENV_DATA_ROOT=/tmp/scaled makes
+data_snapshot.load_data() (and so the Envs, envs/evaluate.py and
+envs/benchmark_tools.py) use it instead of envs/finance/data.
+Standard library only, like data_snapshot.
+"""
+
+import os
+import re
+import json
+import argparse
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+ENVS_PATH = os.path.dirname(os.path.abspath(__file__))
+FOREIGN_KEY_SUFFIXES = ("_id", "_by")
+# <x>_id columns referencing the users table when its keys are not the only ones matching
+PERSON_COLUMNS = ("user", "manager", "approver", "owner", "assignee", "reviewer", "author", "creator", "requester", "reporter")
+# Text that must not be made unique: dates, timestamps and times
+_DATE_LIKE = re.compile(r"^\d{4}-\d{2}-\d{2}|^\d{2}:\d{2}")
+
+
+def load_tables(folder: str) -> Dict[str, Any]:
+    tables = {}
+    for file_name in sorted(os.listdir(folder)):
+        if file_name.endswith(".json"):
+            with open(os.path.join(folder, file_name), "r") as file:
+                tables[file_name[:-5]] = json.load(file)
+    return tables
+
+
+def _records(table: Any) -> Optional[Dict[Hashable, Dict[str, Any]]]:
+    if isinstance(table, dict) and table and all(isinstance(record, dict) for record in table.values()):
+        return table
+    return None
+
+
+def _numeric(key: Any) -> bool:
+    return isinstance(key, str) and key.isdigit() and (key == "0" or not key.startswith("0"))
+
+
+def _singular(name: str) -> str:
+    return name[:-1] if name.endswith("s") else name
+
+
+def primary_key_column(name: str, table: Dict[Hashable, Dict[str, Any]]) -> Optional[str]:
+    """Column holding each record's own key, if any; the one named after the table when several do"""
+    columns = None
+    for key, record in table.items():
+        matching = {column for column, value in record.items() if value is not None and str(value) == str(key)}
+        columns = matching if columns is None else columns & matching
+        if not columns:
+            return None
+    if not columns:
+        return None
+    return min(columns, key=lambda column: (
+        column != "id" and not (column.endswith("_id") and _singular(name).endswith(column[:-3])),
+        not column.endswith("_id"),
+        column,
+    ))
+
+
+class Schema:
+    """Primary keys, foreign keys and unique text columns inferred from the records"""
+
+    def __init__(self, tables: Dict[str, Any]) -> None:
+        self.tables = {name: records for name, table in tables.items() if (records := _records(table)) is not None}
+        self.primary_keys = {name: primary_key_column(name, table) for name, table in self.tables.items()}
+        self._keys = {name: {str(key) for key in table} for name, table in self.tables.items()}
+        # table -> column -> referenced table
+        self.foreign_keys: Dict[str, Dict[str, str]] = {}
+        # table -> column -> sibling column naming the referenced table
+        self.polymorphic_keys: Dict[str, Dict[str, str]] = {}
+        self.unique_columns: Dict[str, List[str]] = {}
+        for name, table in self.tables.items():
+            self._infer_columns(name, table)
+
+    def _infer_columns(self, name: str, table: Dict[Hashable, Dict[str, Any]]) -> None:
+        columns: Dict[str, List[Any]] = {}
+        for record in table.values():
+            for column, value in record.items():
+                columns.setdefault(column, []).append(value)
+        for column, values in columns.items():
+            if column == self.primary_keys[name]:
+                continue
+            present = [value for value in values if value is not None]
+            if not present:
+                continue
+            if column.endswith(FOREIGN_KEY_SUFFIXES):
+                type_column = column[:-len("_id")] + "_type"
+                if column.endswith("_id") and type_column in columns and all(
+                    record.get(type_column) in self.tables for record in table.values() if record.get(column) is not None
+                ):
+                    self.polymorphic_keys.setdefault(name, {})[column] = type_column
+                    continue
+                referenced = self._referenced_table(column, present)
+                if referenced is not None:
+                    self.foreign_keys.setdefault(name, {})[column] = referenced
+                    continue
+            if (
+                len(present) > 1
+                and all(isinstance(value, str) and not _DATE_LIKE.match(value) for value in present)
+                and len(set(present)) == len(present)
+            ):
+                self.unique_columns.setdefault(name, []).append(column)
+
+    def _referenced_table(self, column: str, values: List[Any]) -> Optional[str]:
+        if not all(isinstance(value, (str, int)) and not isinstance(value, bool) for value in values):
+            return None
+        needed = {str(value) for value in values}
+        candidates = [name for name, keys in self._keys.items() if needed <= keys]
+        if len(candidates) <= 1:
+            return candidates[0] if candidates else None
+        base = column[:-3]
+        for name in candidates:
+            if self.primary_keys[name] == column:
+                return name
+        for name in candidates:
+            if _singular(name) == base or name == base or _singular(name).endswith("_" + base):
+                return name
+        # Columns naming a person (manager_id, created_by, approved_by, ...) usually reference the users
+        if "users" in candidates and (column.endswith("_by") or base.endswith(PERSON_COLUMNS)):
+            return "users"
+        return None
+
+
+def scaled_key(key: Any, copy: int, span: int) -> Any:
+    """Id of the copy-th replica of a record (span: largest numeric id of its table)"""
+    if copy == 0:
+        return key
+    if isinstance(key, int) and not isinstance(key, bool):
+        return key + copy * span
+    if _numeric(key):
+        return str(int(key) + copy * span)
+    return f"{key}-{copy}"
+
+
+def _unique_text(value: str, copy: int) -> str:
+    if copy == 0:
+        return value
+    local, at, domain = value.partition("@")
+    if at and local and "." in domain:
+        return f"{local}+{copy}@{domain}"
+    return f"{value}-{copy}"
+
+
+def scale_tables(tables: Dict[str, Any], factor: int) -> Dict[str, Any]:
+    """Tables with every dict-of-records table replicated factor times, references preserved"""
+    if factor < 1:
+        raise ValueError("factor must be at least 1")
+    schema = Schema(tables)
+    spans = {
+        name: max((int(key) for key in table if _numeric(key)), default=0)
+        for name, table in schema.tables.items()
+    }
+
+    def reference(table_name: str, value: Any, copy: int) -> Any:
+        if value is None or table_name not in schema.tables or str(value) not in schema._keys[table_name]:
+            return value
+        return scaled_key(value, copy, spans[table_name])
+
+    scaled: Dict[str, Any] = {}
+    for name, table in tables.items():
+        if name not in schema.tables:
+            scaled[name] = table
+            continue
+        primary_key = schema.primary_keys[name]
+        foreign_keys = schema.foreign_keys.get(name, {})
+        polymorphic_keys = schema.polymorphic_keys.get(name, {})
+        unique_columns = schema.unique_columns.get(name, [])
+        replicas = {}
+        for copy in range(factor):
+            for key, record in table.items():
+                new_key = scaled_key(key, copy, spans[name])
+                if copy == 0:
+                    replicas[new_key] = record
+                    continue
+                replica = dict(record)
+                if primary_key is not None:
+                    replica[primary_key] = scaled_key(record[primary_key], copy, spans[name])
+                for column, referenced in foreign_keys.items():
+                    if column in replica:
+                        replica[column] = reference(referenced, replica[column], copy)
+                for column, type_column in polymorphic_keys.items():
+                    if column in replica:
+                        replica[column] = reference(replica.get(type_column), replica[column], copy)
+                for column in unique_columns:
+                    if isinstance(replica.get(column), str):
+                        replica[column] = _unique_text(replica[column], copy)
+                replicas[new_key] = replica
+        scaled[name] = replicas
+    return scaled
+
+
+def scale_data(folder: str, output_folder: str, factor: int) -> Dict[str, int]:
+    """Write the scaled tables of a data folder into output_folder; returns the row count of each table"""
+    scaled = scale_tables(load_tables(folder), factor)
+    os.makedirs(output_folder, exist_ok=True)
+    for name, table in scaled.items():
+        with open(os.path.join(output_folder, f"{name}.json"), "w") as file:
+            json.dump(table, file, indent=2)
+    return {name: len(table) if isinstance(table, (dict, list)) else 1 for name, table in scaled.items()}
+
+
+def check_references(tables: Dict[str, Any], schema: Optional[Schema] = None) -> List[Tuple[str, str, Any]]:
+    """(table, column, value) of every reference that does not resolve
+
+    The references are the ones inferred from the tables themselves unless a
+    schema is given: a column whose values stopped matching a table is not
+    inferred as a reference any more, so check scaled data against the Schema
+    of the original data.
+    """
+    schema = schema or Schema(tables)
+    records = {name: table for name, table in tables.items() if name in schema.tables and _records(table) is not None}
+    keys = {name: {str(key) for key in table} for name, table in records.items()}
+    broken = []
+    for name, columns in schema.foreign_keys.items():
+        for record in records.get(name, {}).values():
+            for column, referenced in columns.items():
+                value = record.get(column)
+                if value is not None and str(value) not in keys.get(referenced, ()):
+                    broken.append((name, column, value))
+    for name, columns in schema.polymorphic_keys.items():
+        for record in records.get(name, {}).values():
+            for column, type_column in columns.items():
+                value = record.get(column)
+                if value is not None and str(value) not in keys.get(record.get(type_column), ()):
+                    broken.append((name, column, value))
+    return broken
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a referentially consistent copy of an environment's data, scaled by a factor")
+    parser.add_argument("env", help="environment package under envs/ (or a data folder path)")
+    parser.add_argument("--factor", type=int, default=10)
+    parser.add_argument("--output", required=True, help="root folder: the tables go to <output>/<env>/")
+    args = parser.parse_args()
+    folder = args.env if os.path.isdir(args.env) and not os.path.isdir(os.path.join(args.env, "data")) else os.path.join(ENVS_PATH, args.env, "data")
+    env_name = os.path.basename(os.path.dirname(os.path.abspath(folder)))
+    rows = scale_data(folder, os.path.join(args.output, env_name), args.factor)
+    print(f"Wrote {sum(rows.values())} rows in {len(rows)} tables to {os.path.join(args.output, env_name)}")
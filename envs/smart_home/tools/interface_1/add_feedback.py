@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AddFeedback(Tool):
     @staticmethod
@@ -10,9 +11,7 @@ class AddFeedback(Tool):
                rating: int) -> str:
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
 
         timestamp = "2025-10-01T00:00:00"
         feedbacks = data.setdefault("user_feedbacks", {})
@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional, List
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class CreatePage(Tool):
     @staticmethod
@@ -9,9 +10,7 @@ class CreatePage(Tool):
                labels: Optional[List[str]] = None, template_id: Optional[str] = None) -> str:
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         pages = data.get("pages", {})
         spaces = data.get("spaces", {})
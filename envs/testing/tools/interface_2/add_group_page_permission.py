@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class AddGroupPagePermission(Tool):
     @staticmethod
@@ -8,9 +9,7 @@ class AddGroupPagePermission(Tool):
                page_id: str, permission_type: str) -> str:
         
         def generate_id(table: Dict[str, Any]) -> str:
-            if not table:
-                return "1"
-            return str(max(int(k) for k in table.keys()) + 1)
+            return str(next_id(table))
         
         users = data.get("users", {})
         groups = data.get("groups", {})
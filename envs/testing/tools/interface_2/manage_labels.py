@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, List, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class ManageLabels(Tool):
     @staticmethod
@@ -10,9 +11,7 @@ class ManageLabels(Tool):
                space_administrator_approval: Optional[bool] = None) -> str:
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         pages = data.get("pages", {})
         users = data.get("users", {})
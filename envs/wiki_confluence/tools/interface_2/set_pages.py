@@ -1,6 +1,7 @@
 import json
 from typing import Any, Dict, Optional
 from tau_bench.envs.tool import Tool
+from tau_bench.envs.id_allocator import next_id
 
 class SetPages(Tool):
     @staticmethod
@@ -22,9 +23,7 @@ class SetPages(Tool):
         """
         
         def generate_id(table: Dict[str, Any]) -> int:
-            if not table:
-                return 1
-            return max(int(k) for k in table.keys()) + 1
+            return next_id(table)
         
         valid_actions = ["create", "update", "publish", "unpublish", "delete", "restore"]
         if action not in valid_actions:
@@ -0,0 +1,170 @@
+############# SCHEMA-DRIVEN ARGUMENT COERCION ####################
+"""
+Converters compiled once per interface from the tools' get_info() parameter
+schemas and kept with the in-memory interface manifest, and float-field tries
+compiled once per argument_float_fields list, so preparing an action is a walk
+over the arguments that actually need converting instead of matching every
+float-field path at every key of the argument tree.
+
+The task framework page sends its typed inputs as strings and leaves their
+conversion to these converters, the single place where it happens.
+"""
+import re
+import json
+from functools import lru_cache
+from modules.interface_manifest import get_manifest, manifest_compiled, manifest_tools
+
+_NUMBER_PATTERN = re.compile(r"\s*[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?\s*")
+_INTEGER_PATTERN = re.compile(r"\s*[-+]?\d+\s*")
+_LIST_INDEX_PATTERN = re.compile(r"\[(\d+)\]")
+
+
+def _to_number(value):
+    if isinstance(value, str) and _NUMBER_PATTERN.fullmatch(value):
+        return int(value) if _INTEGER_PATTERN.fullmatch(value) else float(value)
+    return value
+
+
+def _to_boolean(value):
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    return value
+
+
+def _parse_json(value):
+    """ JSON typed in the page, which also accepts Python's True/False """
+    return json.loads(re.sub(r"\bTrue\b", "true", re.sub(r"\bFalse\b", "false", value)))
+
+
+def _to_array(value):
+    if not isinstance(value, str):
+        return value
+    try:
+        parsed = _parse_json(value)
+    except ValueError:
+        return value
+    return parsed if isinstance(parsed, list) else value
+
+
+def _object_converter(name, properties):
+    converters = compile_properties(properties)
+
+    def convert(value):
+        if isinstance(value, str):
+            try:
+                value = _parse_json(value)
+            except ValueError:
+                raise ValueError(
+                    f"Invalid JSON format for parameter: {name}. JSON keys and values must be enclosed by double quotes."
+                ) from None
+        if isinstance(value, dict):
+            for key, converter in converters.items():
+                if key in value:
+                    value[key] = converter(value[key])
+        return value
+    return convert
+
+
+_SCALAR_CONVERTERS = {
+    "number": _to_number,
+    "integer": _to_number,
+    "float": _to_number,
+    "boolean": _to_boolean,
+    "array": _to_array,
+}
+
+
+def compile_properties(properties):
+    """
+    {name: converter} for the properties of a parameter schema whose typed
+    (string) values are converted: numbers, booleans, arrays, and objects
+    parsed from JSON with their own properties converted. Strings are left
+    alone, so are types given as lists.
+    """
+    converters = {}
+    for name, schema in (properties or {}).items():
+        if not isinstance(schema, dict):
+            continue
+        schema_type = schema.get("type")
+        if schema_type == "object":
+            converter = _object_converter(name, schema.get("properties"))
+        elif isinstance(schema_type, str):
+            converter = _SCALAR_CONVERTERS.get(schema_type)
+        else:
+            converter = None
+        if converter is not None:
+            converters[name] = converter
+    return converters
+
+
+def compile_converters(manifest):
+    """ {api name: {parameter: converter}} for the tools of an interface manifest """
+    return {
+        entry["function_info"].get("name"): compile_properties(entry["function_info"].get("parameters"))
+        for entry in manifest_tools(manifest)
+    }
+
+
+def tool_converters(environment, interface):
+    """ Compiled converters of an interface, built once per version of its manifest """
+    return manifest_compiled(get_manifest(environment, interface), "converters", compile_converters)
+
+
+def coerce_arguments(arguments, converters):
+    """
+    Convert the typed string inputs of a form-built action in place with the
+    converters of its tool. Raises ValueError for an object input that is not JSON.
+    """
+    for name, converter in converters.items():
+        # Empty inputs are dropped later, unconverted
+        if arguments.get(name, '') != '':
+            arguments[name] = converter(arguments[name])
+    return arguments
+
+
+@lru_cache(maxsize=1024)
+def compile_float_fields(float_fields):
+    """
+    Trie of the float-field paths ('holding_data.quantity', 'items[0].price'):
+    each level maps a key to (list indices, next level), and a None value
+    marks the keys whose integer values become floats.
+    """
+    trie = {}
+    for float_field in float_fields:
+        node = trie
+        segments = float_field.split(".")
+        for depth, segment in enumerate(segments):
+            indices = tuple(int(index) for index in _LIST_INDEX_PATTERN.findall(segment))
+            key = _LIST_INDEX_PATTERN.sub("", segment) if indices else segment
+            # Only dicts directly inside a list are walked, and a path ending
+            # in a list index never names a dict value
+            if len(indices) > 1 or (indices and depth == len(segments) - 1):
+                break
+            if depth == len(segments) - 1:
+                node.setdefault(key, {})[None] = True
+                break
+            node = node.setdefault(key, {}).setdefault(indices, {})
+    return trie
+
+
+def apply_float_trie(obj, trie):
+    """ Convert to float the integers found at the paths of a compile_float_fields trie """
+    if not isinstance(obj, dict):
+        return obj
+    for key, branches in trie.items():
+        if key not in obj:
+            continue
+        value = obj[key]
+        for indices, node in branches.items():
+            if indices is None:
+                if isinstance(value, int) and not isinstance(value, bool):
+                    obj[key] = float(value)
+                continue
+            target = value
+            for index in indices:
+                if not isinstance(target, list) or index >= len(target):
+                    target = None
+                    break
+                target = target[index]
+            apply_float_trie(target, node)
+    return obj
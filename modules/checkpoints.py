@@ -0,0 +1,103 @@
+############# SESSION STATE CHECKPOINTS ####################
+import json
+import logging
+import marshal
+from hashlib import sha256
+from modules.env_snapshots import EnvironmentData, apply_changes
+from modules.server_store import store_get, store_set
+
+logger = logging.getLogger(__name__)
+
+# v2: checkpoints hold the changed records, no longer whole tables
+CHECKPOINT_PREFIX = "checkpoint:v2:"
+JOURNAL_PREFIX = "journal:"
+# Checkpoints outlive the 10 minute session so a resumed session still hits them
+CHECKPOINT_TTL_SECONDS = 60 * 60
+# A checkpoint is also taken every this many actions, so undoing back
+# through a long history applies at most that many journals
+CHECKPOINT_INTERVAL = 8
+
+
+def extend_fingerprint(fingerprint, action):
+    """ Fingerprint of the state reached by running one more action from the state `fingerprint` """
+    digest = sha256(fingerprint.encode("utf-8"))
+    digest.update(json.dumps(action, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def prefix_fingerprints(environment, snapshot_version, tools_hash, actions):
+    """
+    Identify the database states reached by running each prefix of `actions`
+    (from none to all of them) with the tools on the given version of the
+    environment data. Any change to one of them yields different fingerprints,
+    so a stale checkpoint or journal is simply never found.
+    """
+    digest = sha256()
+    digest.update(json.dumps([environment, snapshot_version]).encode("utf-8"))
+    digest.update(tools_hash.encode("utf-8"))
+    fingerprints = [digest.hexdigest()]
+    for action in actions:
+        fingerprints.append(extend_fingerprint(fingerprints[-1], action))
+    return fingerprints
+
+
+def state_fingerprint(environment, snapshot_version, tools_hash, actions):
+    """ Fingerprint of the state after all of `actions` """
+    return prefix_fingerprints(environment, snapshot_version, tools_hash, actions)[-1]
+
+
+def checkpoint_blob(data):
+    """
+    Serialize the records the session inserted, updated or deleted since the
+    snapshot (in the journal's format); everything else is still the snapshot's
+    """
+    try:
+        return marshal.dumps(data.snapshot_changes())
+    except ValueError as e:
+        # A tool stored a non-JSON value; the next request falls back to replaying the actions
+        logger.warning(f"Skipping checkpoint: {e}")
+        return None
+
+
+def checkpoint_data(blob, snapshot):
+    """ Rebuild a database from a checkpoint blob on top of the snapshot it was taken from """
+    data = EnvironmentData(snapshot)
+    apply_changes(data, marshal.loads(blob))
+    return data
+
+
+def save_checkpoint(fingerprint, blob):
+    store_set(CHECKPOINT_PREFIX + fingerprint, blob, ttl=CHECKPOINT_TTL_SECONDS)
+
+
+def load_checkpoint(fingerprint):
+    """ Checkpoint blob stored under the fingerprint, or None when there is no such checkpoint """
+    return store_get(CHECKPOINT_PREFIX + fingerprint)
+
+
+def save_journal(fingerprint, changes):
+    """ Store the changes of the action that led to the state with this fingerprint """
+    try:
+        store_set(JOURNAL_PREFIX + fingerprint, marshal.dumps(changes), ttl=CHECKPOINT_TTL_SECONDS)
+    except ValueError as e:
+        logger.warning(f"Skipping journal: {e}")
+
+
+def plan_restore(fingerprints, actions):
+    """
+    How to rebuild the state after `actions` (whose prefix fingerprints are
+    given): the nearest checkpoint blob at or before the end (None for the
+    pristine snapshot), then one step per later action, ("journal", changes)
+    when its journal is stored and ("replay", action) otherwise.
+    """
+    steps = []
+    for index in range(len(actions), 0, -1):
+        checkpoint = load_checkpoint(fingerprints[index])
+        if checkpoint is not None:
+            break
+        journal = store_get(JOURNAL_PREFIX + fingerprints[index])
+        steps.append(("journal", marshal.loads(journal)) if journal is not None else ("replay", actions[index - 1]))
+    else:
+        checkpoint = None
+    steps.reverse()
+    return checkpoint, steps
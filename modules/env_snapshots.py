@@ -0,0 +1,200 @@
+############# ENVIRONMENT SNAPSHOT CACHE ####################
+import os
+import sys
+import copy
+import marshal
+import importlib.util
+import threading
+
+ENVS_PATH = "envs"
+
+# environment name -> EnvironmentSnapshot, shared by every request of this worker
+_snapshots = {}
+_snapshots_lock = threading.Lock()
+
+
+def data_path(environment):
+    return os.path.join(ENVS_PATH, environment, "data")
+
+
+def load_envs_module(name):
+    """
+    Standard library only helper module of envs/ (envs/<name>.py), loaded by
+    path because envs/__init__.py needs tau_bench
+    """
+    module_name = f"env_{name}"
+    module = sys.modules.get(module_name)
+    if module is None:
+        spec = importlib.util.spec_from_file_location(module_name, os.path.join(ENVS_PATH, f"{name}.py"))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules[module_name] = module
+        spec.loader.exec_module(module)
+    return module
+
+
+data_snapshot = load_envs_module("data_snapshot")
+
+
+def data_version(environment):
+    """ Fingerprint of the environment data files: (file name, mtime, size) for every JSON table """
+    return data_snapshot.source_version(data_path(environment))
+
+
+class EnvironmentSnapshot:
+    """
+    Immutable parsed copy of an environment's data directory.
+    Every table is kept marshalled, so handing out a private copy is a single
+    marshal.loads instead of re-reading and re-parsing the JSON file. The
+    marshalled tables are views of the memory-mapped snapshot file, shared
+    through the page cache by every worker process on the machine.
+    """
+    def __init__(self, environment, version, tables):
+        self.environment = environment
+        self.version = version
+        self.tables = tables
+
+    @classmethod
+    def load(cls, environment):
+        """ Load from the compiled data snapshot (see envs/data_snapshot.py), rebuilding it when stale """
+        compiled = data_snapshot.get_snapshot(data_path(environment))
+        return cls(environment, compiled.version, compiled.tables)
+
+    def table(self, name):
+        return marshal.loads(self.tables[name])
+
+
+def get_snapshot(environment):
+    """ Return the cached snapshot of the environment, reloading it when any data file changed """
+    version = data_version(environment)
+    snapshot = _snapshots.get(environment)
+    if snapshot is not None and snapshot.version == version:
+        return snapshot
+    with _snapshots_lock:
+        snapshot = _snapshots.get(environment)
+        if snapshot is None or snapshot.version != version:
+            snapshot = EnvironmentSnapshot.load(environment)
+            _snapshots[environment] = snapshot
+    return snapshot
+
+
+_PENDING = data_snapshot.PENDING
+# Journal baseline of a table that did not exist
+_MISSING = object()
+
+
+def _freeze(value):
+    """ Independent copy of a JSON-like value (marshal is much faster than deepcopy for those) """
+    try:
+        return marshal.loads(marshal.dumps(value))
+    except ValueError:
+        return copy.deepcopy(value)
+
+
+def table_changes(before, after):
+    """ Inserted, updated and deleted records between two versions of a table, or None when equal """
+    if after is _MISSING:
+        return None if before is _MISSING else {"removed": True}
+    if before is _MISSING or not isinstance(before, dict) or not isinstance(after, dict):
+        return None if before == after else {"replaced": _freeze(after)}
+    inserted = {}
+    updated = {}
+    for record_id, record in after.items():
+        if record_id not in before:
+            inserted[record_id] = record
+        elif before[record_id] != record:
+            updated[record_id] = record
+    deleted = [record_id for record_id in before if record_id not in after]
+    if not (inserted or updated or deleted):
+        return None
+    changes = {}
+    if inserted:
+        changes["inserted"] = _freeze(inserted)
+    if updated:
+        changes["updated"] = _freeze(updated)
+    if deleted:
+        changes["deleted"] = deleted
+    return changes
+
+
+def apply_changes(data, changes):
+    """ Replay the journaled changes of one tool call (as returned by stop_journal) onto a database """
+    for key, table in changes.items():
+        if "removed" in table:
+            data.pop(key, None)
+        elif "replaced" in table:
+            data[key] = _freeze(table["replaced"])
+        else:
+            records = data[key]
+            for record_id in table.get("deleted", ()):
+                del records[record_id]
+            records.update(_freeze(table.get("inserted", {})))
+            records.update(_freeze(table.get("updated", {})))
+
+
+class EnvironmentData(data_snapshot.LazyData):
+    """
+    Request-private, dict-compatible view over an EnvironmentSnapshot (see
+    LazyData in envs/data_snapshot.py). A request only pays for the tables its
+    tools touch and never writes into the shared snapshot.
+
+    Between start_journal() and stop_journal() the view also records which
+    tables a tool call accessed and what they looked like before, so the
+    call's inserts, updates and deletes can be listed without copying the
+    tables it did not touch.
+    """
+    def __init__(self, snapshot):
+        super().__init__(snapshot)
+        # table name -> (marshalled) content before the journaled call, _MISSING if it did not exist
+        self._journal = None
+
+    def start_journal(self):
+        self._journal = {}
+
+    def stop_journal(self):
+        """ Changes made since start_journal(), as {table: {"inserted", "updated", "deleted"}} """
+        journal, self._journal = self._journal or {}, None
+        changes = {}
+        for key, baseline in journal.items():
+            after = dict.get(self, key, _MISSING)
+            if after is _PENDING:
+                continue
+            before = marshal.loads(baseline) if isinstance(baseline, (bytes, memoryview)) else baseline
+            table = table_changes(before, after)
+            if table:
+                changes[key] = table
+        return changes
+
+    def snapshot_changes(self):
+        """ Changes from the snapshot to this database, in the stop_journal() format """
+        changes = {}
+        for key in self.touched_tables:
+            before = self.snapshot.table(key) if key in self.snapshot.tables else _MISSING
+            table = table_changes(before, dict.__getitem__(self, key))
+            if table:
+                changes[key] = table
+        for key in self.snapshot.tables:
+            if not dict.__contains__(self, key):
+                changes[key] = {"removed": True}
+        return changes
+
+    def _record_baseline(self, key, value):
+        if value is _PENDING:
+            baseline = self.snapshot.tables[key]
+        elif value is _MISSING:
+            baseline = _MISSING
+        else:
+            try:
+                baseline = marshal.dumps(value)
+            except ValueError:
+                baseline = copy.deepcopy(value)
+        self._journal[key] = baseline
+
+    def _materialize(self, key):
+        if self._journal is not None and key not in self._journal:
+            self._record_baseline(key, dict.get(self, key, _MISSING))
+        super()._materialize(key)
+
+
+def get_environment_data(environment):
+    """ Fresh, isolated database for one request, backed by the cached snapshot """
+    return EnvironmentData(get_snapshot(environment))
@@ -0,0 +1,272 @@
+############# INTERFACE MANIFEST ####################
+"""
+Index of every tool of an interface (function info, renamed invoke method and
+imports), stored as .manifest.json beside the tool files. Entries are
+refreshed only for files whose mtime/size changed and whose content hash no
+longer matches, so choosing an interface is a dictionary lookup.
+
+Prebuild all manifests at deploy time with:
+    python -m modules.interface_manifest [environment ...]
+"""
+import os
+import ast
+import re
+import json
+import argparse
+import threading
+from hashlib import sha256
+from typing import Dict, Any
+
+ENVS_PATH = "envs"
+MANIFEST_FILE = ".manifest.json"
+# Bump when the extraction below changes so older manifests are rebuilt
+MANIFEST_VERSION = 3
+# Shared envs helper modules imported by tool files: import path -> envs/<name>.py.
+# Their imports are left out of the Tools class code, the task framework
+# provides their names instead (tau_bench is not installed here)
+SHARED_TOOL_HELPERS = {
+    "tau_bench.envs.id_allocator": "id_allocator",
+    "tau_bench.envs.entity_query": "entity_query",
+    "tau_bench.envs.columnar_table": "columnar_table",
+}
+
+# interface path -> manifest dict, shared by every request of this worker
+_manifests = {}
+_manifests_lock = threading.Lock()
+
+
+######################## UTILITY FUNCTIONS ##################################
+def ast_to_python_value(node):
+    """Convert AST node to Python value."""
+    if isinstance(node, ast.Constant):  # Python 3.8+
+        return node.value
+    elif isinstance(node, ast.Str):  # Python < 3.8
+        return node.s
+    elif isinstance(node, ast.Num):  # Python < 3.8
+        return node.n
+    elif isinstance(node, ast.List):
+        return [ast_to_python_value(item) for item in node.elts]
+    elif isinstance(node, ast.Dict):
+        result = {}
+        for key, value in zip(node.keys, node.values):
+            result[ast_to_python_value(key)] = ast_to_python_value(value)
+        return result
+    elif isinstance(node, ast.Name):
+        # For variable names, we can't resolve them without execution
+        # Return the name as a string for now
+        return f"<variable: {node.id}>"
+    else:
+        # For other node types, return a string representation
+        return f"<{type(node).__name__}>"
+
+
+def extract_method_from_ast(source_code: str, method_name: str) -> str:
+    tree = ast.parse(source_code)
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef) and node.name == method_name:
+            start = node.lineno - 1
+            end = node.end_lineno
+            return '\n'.join(source_code.splitlines()[start:end])
+    return None
+
+
+def extract_file_info(file_path: str) -> Dict[str, Any]:
+    """
+    Extract function information from a Python file containing a Tool class with get_info method.
+    """
+    try:
+        # Read the file content
+        with open(file_path, "r") as file:
+            content = file.read()
+        
+        imports = []
+        import_pattern = re.compile(r'^\s*import\s+(\w+)', re.MULTILINE)
+        from_import_pattern =  re.compile(r'^\s*from\s+([\w\.]+)\s+import\s+((?:\w+\s*,\s*)*\w+)', re.MULTILINE)
+        
+        for match in import_pattern.finditer(content):
+            imports.append(match.group(0).strip())
+        for match in from_import_pattern.finditer(content):
+            if match.group(1) == "tau_bench.envs.tool" or match.group(1) in SHARED_TOOL_HELPERS:
+                # Skip tau_bench.envs.tool and shared helper imports
+                continue
+            imports.append(match.group(0).strip())
+        
+        tree = ast.parse(content)
+        
+        tool_class = None
+        for node in ast.walk(tree):
+            if isinstance(node, ast.ClassDef):
+                for base in node.bases:
+                    if isinstance(base, ast.Name) and base.id == 'Tool':
+                        tool_class = node
+                        # break
+            if isinstance(node, ast.FunctionDef) and node.name == "invoke":
+                start = node.lineno - 1
+                end = node.end_lineno
+                invoke_method = '\n'.join(content.splitlines()[start:end])
+                # if tool_class:
+                #     break
+        
+        if not tool_class:
+            return {"error": "No Tool class found"}
+        
+        if not invoke_method:
+            return {"error": "No invoke method found in Tool class"}
+        
+        # Find the get_info method
+        get_info_method = None
+        for node in tool_class.body:
+            if isinstance(node, ast.FunctionDef) and node.name == 'get_info':
+                get_info_method = node
+                break
+        
+        if not get_info_method:
+            return {"error": "No get_info method found"}
+        
+        return_dict = None
+        for node in ast.walk(get_info_method):
+            if isinstance(node, ast.Return):
+                return_dict = node.value
+                break
+        
+        if not return_dict:
+            return {"error": "No return dictionary found in get_info method"}
+        
+        parsed_dict = ast_to_python_value(return_dict)
+        function_info = {}
+        
+        if isinstance(parsed_dict, dict) and 'function' in parsed_dict:
+            func_info = parsed_dict['function']
+            if isinstance(func_info, dict):
+                function_info = {
+                    'name': func_info.get('name', ''),
+                    'description': func_info.get('description', ''),
+                    'parameters': func_info.get('parameters', {}).get('properties', {}),
+                    'required': func_info.get('parameters', {}).get('required', [])
+                }
+
+        return function_info, invoke_method, imports
+        
+    except Exception as e:
+        return {"error": f"Failed to process file: {str(e)}"}
+######################## END UTILITY FUNCTIONS ##############################
+
+
+def interface_path(environment, interface):
+    return os.path.join(ENVS_PATH, environment, "tools", f"interface_{interface}")
+
+
+def build_entry(file_path, content_hash):
+    """ Manifest entry of one tool file: its function info, renamed invoke method and imports """
+    entry = {"sha256": content_hash}
+    try:
+        function_info, invoke_method, imports = extract_file_info(file_path)
+        entry["function_info"] = function_info
+        entry["invoke_method"] = invoke_method.replace("invoke", function_info.get('name', 'invoke')+"_invoke")
+        entry["imports"] = sorted(imports)
+    except Exception as e:
+        # extract_file_info reports failures as a single {"error": ...} dict
+        print(f"Error processing {file_path}: {e}")
+        entry["error"] = str(e)
+    return entry
+
+
+def read_manifest(path):
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), "r") as file:
+            manifest = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest
+
+
+def write_manifest(path, manifest):
+    manifest_path = os.path.join(path, MANIFEST_FILE)
+    temp_path = f"{manifest_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as file:
+            json.dump(manifest, file)
+        os.replace(temp_path, manifest_path)
+    except OSError as e:
+        # Read-only deployments still work, the manifest just lives in memory
+        print(f"Could not write {manifest_path}: {e}")
+
+
+def refresh_manifest(path, manifest):
+    """ Bring the manifest up to date with the tool files; returns (manifest, changed) """
+    files = manifest["files"] if manifest else {}
+    refreshed = {}
+    changed = manifest is None
+    with os.scandir(path) as entries:
+        tool_files = sorted((entry for entry in entries if entry.name.endswith(".py") and not entry.name.startswith("__")), key=lambda entry: entry.name)
+    for entry in tool_files:
+        stat = entry.stat()
+        previous = files.get(entry.name)
+        if previous and previous["mtime_ns"] == stat.st_mtime_ns and previous["size"] == stat.st_size:
+            refreshed[entry.name] = previous
+            continue
+        with open(entry.path, "rb") as file:
+            content_hash = sha256(file.read()).hexdigest()
+        if previous and previous["sha256"] == content_hash:
+            tool_entry = previous
+        else:
+            tool_entry = build_entry(entry.path, content_hash)
+        tool_entry["mtime_ns"] = stat.st_mtime_ns
+        tool_entry["size"] = stat.st_size
+        refreshed[entry.name] = tool_entry
+        changed = True
+    changed = changed or refreshed.keys() != files.keys()
+    return {"version": MANIFEST_VERSION, "files": refreshed}, changed
+
+
+def get_manifest(environment, interface):
+    """
+    Up-to-date manifest of an interface, loaded from memory or disk and
+    refreshed incrementally. The in-memory manifest stays the same object
+    until a tool file changes, so what is compiled from it is kept with it.
+    """
+    path = interface_path(environment, interface)
+    with _manifests_lock:
+        manifest = _manifests.get(path)
+        refreshed, changed = refresh_manifest(path, manifest or read_manifest(path))
+        if changed:
+            write_manifest(path, refreshed)
+        if changed or manifest is None:
+            manifest = refreshed
+            _manifests[path] = manifest
+    return manifest
+
+
+def manifest_compiled(manifest, name, build):
+    """
+    build(manifest), computed once per in-memory manifest and dropped with it
+    when a tool file changes. Only kept in memory, never written to disk.
+    """
+    compiled = manifest.setdefault("compiled", {})
+    if name not in compiled:
+        compiled[name] = build(manifest)
+    return compiled[name]
+
+
+def manifest_tools(manifest):
+    """ Successfully extracted entries of the manifest, in file name order """
+    return [entry for _, entry in sorted(manifest["files"].items()) if "error" not in entry]
+
+
+def build_all(environments=None):
+    for environment in environments or sorted(os.listdir(ENVS_PATH)):
+        tools_path = os.path.join(ENVS_PATH, environment, "tools")
+        if not os.path.isdir(tools_path):
+            continue
+        for name in sorted(os.listdir(tools_path)):
+            if name.startswith("interface_") and os.path.isdir(os.path.join(tools_path, name)):
+                manifest = get_manifest(environment, name[len("interface_"):])
+                print(f"{environment}/{name}: {len(manifest_tools(manifest))} tools")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Prebuild the interface manifests of the environments")
+    parser.add_argument("environments", nargs="*", help="environments to index (default: all)")
+    build_all(parser.parse_args().environments)
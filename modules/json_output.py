@@ -0,0 +1,71 @@
+############# TOOL OUTPUT JSON ####################
+"""
+Tools return their output as JSON text. Instead of parsing it into Python
+objects and encoding it again for the response, the text is spliced verbatim
+into the response body. It is only parsed when it may contain floats (whose
+fields the page needs) or does not have the shape of a JSON document; orjson
+is used to parse when it is installed.
+"""
+import re
+import json
+from uuid import uuid4
+from flask import Response, current_app
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# A float literal (or NaN/Infinity) can only appear in JSON text where one of these matches
+_FLOAT_CANDIDATE = re.compile(r"\d[.eE]|NaN|Infinity")
+# Whole text of a JSON object, array or string, or of a float-free scalar
+_JSON_DOCUMENT = re.compile(r'\s*(\{.*\}|\[.*\]|".*"|-?\d+|true|false|null)\s*', re.DOTALL)
+
+
+class RawJSON:
+    """ Already-encoded JSON text, emitted as is by dumps() """
+    __slots__ = ("text",)
+
+    def __init__(self, text):
+        self.text = text
+
+
+def loads(text):
+    if orjson is not None:
+        try:
+            return orjson.loads(text)
+        except orjson.JSONDecodeError:
+            pass  # json also accepts NaN and Infinity, which orjson rejects
+    return json.loads(text)
+
+
+def may_contain_floats(text):
+    return _FLOAT_CANDIDATE.search(text) is not None
+
+
+def looks_like_json(text):
+    """ Cheap shape check standing in for a parse: catches the plain-text outputs of tools """
+    return _JSON_DOCUMENT.fullmatch(text) is not None
+
+
+def dumps(obj):
+    """ Encode obj with the app's JSON provider, RawJSON values included verbatim """
+    raw = []
+    marker = f"raw-json-{uuid4().hex}-"
+
+    def default(value):
+        if isinstance(value, RawJSON):
+            raw.append(value.text)
+            return f"{marker}{len(raw) - 1}"
+        # Dates, Decimal, UUID, dataclasses... are encoded as the provider would
+        return current_app.json.default(value)
+
+    text = current_app.json.dumps(obj, default=default)
+    if not raw:
+        return text
+    return re.sub(f'"{marker}(\\d+)"', lambda match: raw[int(match.group(1))], text)
+
+
+def json_response(obj, status=200):
+    """ jsonify() counterpart that understands RawJSON """
+    return Response(dumps(obj), status=status, mimetype=current_app.json.mimetype)
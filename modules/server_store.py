@@ -0,0 +1,84 @@
+############# SERVER-SIDE KEY/VALUE STORE ####################
+import time
+import logging
+import threading
+from collections import OrderedDict
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Upper bound on the bytes kept in this process' store
+LOCAL_STORE_BYTES = 256 * 1024 * 1024
+
+# key -> (value, monotonic expiry time or None)
+_local_store = OrderedDict()
+_local_store_bytes = 0
+_local_store_lock = threading.Lock()
+
+
+def _redis():
+    if not has_app_context():
+        return None
+    return current_app.config.get("SESSION_REDIS")
+
+
+def _local_get(key):
+    global _local_store_bytes
+    with _local_store_lock:
+        entry = _local_store.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and time.monotonic() >= expires_at:
+            del _local_store[key]
+            _local_store_bytes -= len(value)
+            return None
+        _local_store.move_to_end(key)
+        return value
+
+
+def _local_set(key, value, ttl=None):
+    global _local_store_bytes
+    expires_at = time.monotonic() + ttl if ttl is not None else None
+    with _local_store_lock:
+        previous = _local_store.pop(key, None)
+        if previous is not None:
+            _local_store_bytes -= len(previous[0])
+        _local_store[key] = (value, expires_at)
+        _local_store_bytes += len(value)
+        while _local_store_bytes > LOCAL_STORE_BYTES and len(_local_store) > 1:
+            _, (evicted, _) = _local_store.popitem(last=False)
+            _local_store_bytes -= len(evicted)
+
+
+def store_get(key):
+    """
+    Read bytes from the shared store: the app's Redis (the one backing the
+    sessions) when configured and reachable, else this process' LRU store.
+    Without an app context (tool worker processes) only the latter is read.
+    """
+    value = _local_get(key)
+    if value is not None:
+        return value
+    redis_client = _redis()
+    if redis_client is not None:
+        try:
+            # Keep the local copy no longer than Redis keeps the key (pttl: -1 without expiry)
+            value, ttl_ms = redis_client.pipeline().get(key).pttl(key).execute()
+        except Exception as e:
+            logger.warning(f"Server store read failed for {key}: {e}")
+            return None
+        if value is not None:
+            _local_set(key, value, ttl_ms / 1000 if ttl_ms >= 0 else None)
+    return value
+
+
+def store_set(key, value, ttl=None):
+    """ Write bytes to the shared store, optionally expiring after ttl seconds """
+    _local_set(key, value, ttl)
+    redis_client = _redis()
+    if redis_client is not None:
+        try:
+            redis_client.set(key, value, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Server store write failed for {key}: {e}")
@@ -1,133 +1,28 @@
 import os
 import json
 import ast
-import re
-from typing import Dict, Any
-from flask import Blueprint, render_template, request, jsonify, session, g, Response
+import time
+import threading
+from hashlib import sha256
+from collections import OrderedDict
+from flask import Blueprint, render_template, request, jsonify, session, g, Response, current_app, stream_with_context
+from flask.sessions import SecureCookieSessionInterface
+from modules.env_snapshots import EnvironmentData, get_snapshot, data_version, apply_changes, load_envs_module
+from modules.checkpoints import (
+    CHECKPOINT_INTERVAL, prefix_fingerprints, extend_fingerprint, plan_restore,
+    checkpoint_blob, checkpoint_data, save_checkpoint, save_journal
+)
+from modules.tool_workers import WORKER_POOL_SIZE, run_in_worker
+from modules.interface_manifest import SHARED_TOOL_HELPERS, get_manifest, manifest_tools
+from modules.server_store import store_get, store_set
+from modules.json_output import RawJSON, loads as json_loads, may_contain_floats, looks_like_json, dumps as json_dumps, json_response
+from modules.argument_coercion import tool_converters, coerce_arguments, compile_float_fields, apply_float_trie
 
 task_framework_bp = Blueprint('task_framework', __name__)
 
 
 
-######################## UTILITY FUNCTIONS ##################################
-def ast_to_python_value(node):
-    """Convert AST node to Python value."""
-    if isinstance(node, ast.Constant):  # Python 3.8+
-        return node.value
-    elif isinstance(node, ast.Str):  # Python < 3.8
-        return node.s
-    elif isinstance(node, ast.Num):  # Python < 3.8
-        return node.n
-    elif isinstance(node, ast.List):
-        return [ast_to_python_value(item) for item in node.elts]
-    elif isinstance(node, ast.Dict):
-        result = {}
-        for key, value in zip(node.keys, node.values):
-            result[ast_to_python_value(key)] = ast_to_python_value(value)
-        return result
-    elif isinstance(node, ast.Name):
-        # For variable names, we can't resolve them without execution
-        # Return the name as a string for now
-        return f"<variable: {node.id}>"
-    else:
-        # For other node types, return a string representation
-        return f"<{type(node).__name__}>"
-
-
-def extract_method_from_ast(source_code: str, method_name: str) -> str:
-    tree = ast.parse(source_code)
-    for node in ast.walk(tree):
-        if isinstance(node, ast.FunctionDef) and node.name == method_name:
-            start = node.lineno - 1
-            end = node.end_lineno
-            return '\n'.join(source_code.splitlines()[start:end])
-    return None
-
-
-def extract_file_info(file_path: str) -> Dict[str, Any]:
-    """
-    Extract function information from a Python file containing a Tool class with get_info method.
-    """
-    try:
-        # Read the file content
-        with open(file_path, "r") as file:
-            content = file.read()
-        
-        imports = []
-        import_pattern = re.compile(r'^\s*import\s+(\w+)', re.MULTILINE)
-        from_import_pattern =  re.compile(r'^\s*from\s+([\w\.]+)\s+import\s+((?:\w+\s*,\s*)*\w+)', re.MULTILINE)
-        
-        for match in import_pattern.finditer(content):
-            imports.append(match.group(0).strip())
-        for match in from_import_pattern.finditer(content):
-            if match.group(1) == "tau_bench.envs.tool":
-                # Skip tau_bench.envs.tool import
-                continue
-            imports.append(match.group(0).strip())
-        
-        tree = ast.parse(content)
-        
-        tool_class = None
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                for base in node.bases:
-                    if isinstance(base, ast.Name) and base.id == 'Tool':
-                        tool_class = node
-                        # break
-            if isinstance(node, ast.FunctionDef) and node.name == "invoke":
-                start = node.lineno - 1
-                end = node.end_lineno
-                invoke_method = '\n'.join(content.splitlines()[start:end])
-                # if tool_class:
-                #     break
-        
-        if not tool_class:
-            return {"error": "No Tool class found"}
-        
-        if not invoke_method:
-            return {"error": "No invoke method found in Tool class"}
-        
-        # Find the get_info method
-        get_info_method = None
-        for node in tool_class.body:
-            if isinstance(node, ast.FunctionDef) and node.name == 'get_info':
-                get_info_method = node
-                break
-        
-        if not get_info_method:
-            return {"error": "No get_info method found"}
-        
-        return_dict = None
-        for node in ast.walk(get_info_method):
-            if isinstance(node, ast.Return):
-                return_dict = node.value
-                break
-        
-        if not return_dict:
-            return {"error": "No return dictionary found in get_info method"}
-        
-        parsed_dict = ast_to_python_value(return_dict)
-        function_info = {}
-        
-        if isinstance(parsed_dict, dict) and 'function' in parsed_dict:
-            func_info = parsed_dict['function']
-            if isinstance(func_info, dict):
-                function_info = {
-                    'name': func_info.get('name', ''),
-                    'description': func_info.get('description', ''),
-                    'parameters': func_info.get('parameters', {}).get('properties', {}),
-                    'required': func_info.get('parameters', {}).get('required', [])
-                }
-
-        return function_info, invoke_method, imports
-        
-    except Exception as e:
-        return {"error": f"Failed to process file: {str(e)}"}
-######################## END UTILITY FUNCTIONS ##############################
-
-
-def create_tools_class(imports_set, invoke_methods):
-    # Create the class dynamically in memory
+def tools_class_code(imports_set, invoke_methods):
     imports_code = '\n'.join(sorted(imports_set))
     
     # Build the class definition as a string
@@ -138,13 +33,96 @@ class Tools:
 """
     for invoke_method in invoke_methods:
         class_code += ("    @staticmethod\n" + invoke_method + "\n\n")
-    # Execute the code and return the class
+    return class_code
+
+
+def tool_helpers():
+    """ Names the tool files import from the shared envs helper modules """
     namespace = {}
+    for name in SHARED_TOOL_HELPERS.values():
+        module = load_envs_module(name)
+        namespace.update({attribute: getattr(module, attribute) for attribute in module.__all__})
+    return namespace
+
+
+def create_tools_class(class_code):
+    # Execute the code and return the class
+    namespace = tool_helpers()
     exec(class_code, namespace)
     # return namespace['Tools']
     # session["tools_class_code"] = class_code 
     return namespace['Tools']
 
+
+def load_interface(environment, interface):
+    """ Functions info, imports and renamed invoke methods of every tool of an interface """
+    tools = manifest_tools(get_manifest(environment, interface))
+    functionsInfo = [tool["function_info"] for tool in tools]
+    importsSet = set()
+    for tool in tools:
+        importsSet.update(tool["imports"])
+    invoke_methods = [tool["invoke_method"] for tool in tools]
+    return functionsInfo, importsSet, invoke_methods
+
+
+# (environment, interface, source hash) -> compiled Tools class, least recently used first
+TOOLS_CACHE_SIZE = 32
+# Tools class sources in the server-side store, keyed by their sha256
+TOOLS_CODE_PREFIX = "tools_code:"
+TOOLS_CODE_TTL_SECONDS = 24 * 60 * 60
+_tools_classes = OrderedDict()
+_tools_classes_lock = threading.Lock()
+
+
+def _store_tools_class(key, tools_class):
+    with _tools_classes_lock:
+        _tools_classes[key] = tools_class
+        _tools_classes.move_to_end(key)
+        while len(_tools_classes) > TOOLS_CACHE_SIZE:
+            _tools_classes.popitem(last=False)
+
+
+def cache_tools_class(environment, interface, class_code):
+    """
+    Compile the Tools class once and return the key the session keeps instead
+    of the source. The source itself is stored once per content hash in the
+    server-side store, shared by every session and worker using it.
+    """
+    source_hash = sha256(class_code.encode("utf-8")).hexdigest()
+    tools_key = [environment, interface, source_hash]
+    store_set(TOOLS_CODE_PREFIX + source_hash, class_code.encode("utf-8"), ttl=TOOLS_CODE_TTL_SECONDS)
+    if tuple(tools_key) not in _tools_classes:
+        _store_tools_class(tuple(tools_key), create_tools_class(class_code))
+    return tools_key
+
+
+def get_tools_class(tools_key):
+    """
+    Compiled Tools class of the session. On a cache miss the source is fetched
+    by its hash from the server-side store, or rebuilt from the interface files
+    when the store no longer has it.
+    """
+    if not tools_key:
+        raise ValueError("Click on GO to reload the session")
+    key = tuple(tools_key)
+    with _tools_classes_lock:
+        tools_class = _tools_classes.get(key)
+        if tools_class is not None:
+            _tools_classes.move_to_end(key)
+            return tools_class
+    environment, interface, source_hash = key
+    stored_code = store_get(TOOLS_CODE_PREFIX + source_hash)
+    if stored_code is not None:
+        class_code = stored_code.decode("utf-8")
+    else:
+        _, imports_set, invoke_methods = load_interface(environment, interface)
+        class_code = tools_class_code(imports_set, invoke_methods)
+        if sha256(class_code.encode("utf-8")).hexdigest() != source_hash:
+            raise ValueError("The interface files changed, click on GO to reload the session")
+    tools_class = create_tools_class(class_code)
+    _store_tools_class(key, tools_class)
+    return tools_class
+
 def arguments_processing(arguments):
     cleaned_arguments = {}
     for argument, argument_value in arguments.items():
@@ -213,31 +191,7 @@ def env_interface():
             if environment and interface:
                 # last_interface = interface
                 # last_environment = environment
-                ENVS_PATH = "envs"
-                TOOLS_PATH = f"{ENVS_PATH}/{environment}/tools"
-                INTERFACE_PATH = f"{TOOLS_PATH}/interface_{interface}"
-                API_files = os.listdir(INTERFACE_PATH)
-                invoke_methods = []
-                functionsInfo = []
-                importsSet = set()
-                for api_file in API_files:
-                    if api_file.endswith(".py") and not api_file.startswith("__"):
-                        file_path = os.path.join(INTERFACE_PATH, api_file)
-                        try:
-                            function_info, invoke_method, imports = extract_file_info(file_path)
-                            # print(f"Extracted function info: {function_info}")
-                            # if not function_info:
-                            #     print(f"No function info found in {api_file}, skipping.")
-                            #     continue
-                            importsSet.update(imports)
-                            invoke_method = invoke_method.replace("invoke", function_info.get('name', 'invoke')+"_invoke")
-                            invoke_methods.append(invoke_method)
-                            functionsInfo.append(function_info)
-
-                        except SyntaxError as e:
-                            print(f"Syntax error in {api_file}: {e}")
-                        except Exception as e:
-                            print(f"Error processing {api_file}: {e}")
+                functionsInfo, importsSet, invoke_methods = load_interface(environment, interface)
                 
                 # temp_dir = "/tmp"
                 # tools_file_path = os.path.join(temp_dir, "tools.py")
@@ -246,10 +200,10 @@ def env_interface():
                 #     new_file.write("class Tools:\n")
                 #     for invoke_method in invoke_methods:
                 #         new_file.write("    @staticmethod\n" + invoke_method + "\n\n")
-                session["imports_set"] = (importsSet)
-                session["invoke_methods"] = invoke_methods
+                session["interface"] = interface
+                session["tools_key"] = cache_tools_class(environment, interface, tools_class_code(importsSet, invoke_methods))
                 session["actions"] = []
-                # print("Imports set:", session["imports_set"])
+                session["undone_actions"] = []
                 return jsonify({
                     'status': 'success',
                     'message': 'Environment and interface selected successfully',
@@ -275,15 +229,14 @@ def env_interface():
             'message': 'Choose environment and interface endpoint is working'
         })
 
-def execute_api_utility(api_name, arguments):
-    tools_instance = create_tools_class(session.get("imports_set", []), session.get("invoke_methods", []))
+def execute_api_utility(api_name, arguments, tools_instance, data):
     # print('executing ...')
     arguments = arguments_processing(arguments)
     if hasattr(tools_instance, api_name):
         # try:
             # print(g.data)
             # Dynamically call the method with the provided arguments
-            result = getattr(tools_instance, api_name)(data=g.data, **arguments)
+            result = getattr(tools_instance, api_name)(data=data, **arguments)
             return result
             # print(f"Result from API {api_name}: {result}")
             # session["actions"].append({
@@ -361,56 +314,172 @@ def detect_float_fields(obj, parent_key='', float_fields=None):
     
     return float_fields
 
-def apply_float_fields(obj, float_fields, current_path=''):
+def restore_state(snapshot, tools_instance, checkpoint, steps):
+    """
+    Database reached from a checkpoint blob (or the pristine snapshot) by the
+    given steps: ("journal", changes) re-applies the recorded changes of an
+    action, ("replay", action) runs it again.
+    """
+    data = checkpoint_data(checkpoint, snapshot) if checkpoint is not None else EnvironmentData(snapshot)
+    for kind, step in steps:
+        if kind == "journal":
+            apply_changes(data, step)
+        else:
+            execute_api_utility(step.get('api_name'), step.get('arguments', {}), tools_instance, data)
+    return data
+
+
+def prepare_action(passed_action, converters):
+    """
+    Session action record (tool method name and arguments) for a posted action.
+    The page's form sends its inputs as typed, all strings, with 'form_input'
+    set; they are converted here by the tool's compiled schema converters (see
+    tool_converters). The arguments of other API callers are kept as they were
+    sent. Raises ValueError for an object input that is not JSON.
+    """
+    api_name = passed_action.get('api_name')
+    arguments = passed_action.get('parameters', {})
+    if passed_action.get('form_input'):
+        arguments = coerce_arguments(arguments, converters.get(api_name, {}))
+    argument_float_fields = passed_action.get('argument_float_fields', [])  # Get float fields from frontend
+    
+    # Convert integers to floats based on argument_float_fields
+    if argument_float_fields:
+        arguments = apply_float_trie(arguments, compile_float_fields(tuple(argument_float_fields)))
+    return {'api_name': api_name + "_invoke", 'arguments': arguments}
+
+
+def parse_output(result):
     """
-    Recursively convert integers to floats for fields specified in float_fields.
+    Response value and float fields of a tool's output. JSON text is passed
+    through as RawJSON. It is only parsed (and walked for float fields) when
+    it contains something that can be a float literal, or to raise the parse
+    error when it does not even look like JSON.
+    """
+    if not isinstance(result, str):
+        return result, list(detect_float_fields(result))
+    if may_contain_floats(result):
+        return RawJSON(result), list(detect_float_fields(json_loads(result)))
+    if not looks_like_json(result):
+        json_loads(result)
+    return RawJSON(result), []
+
+
+def execution_error_message(e):
+    return_message = str(e)
+    if "expected an indented block" in return_message:
+        return_message = "Click on GO to reload the session"
+    return f'Failed to execute API: {return_message}'
+
+
+def run_action_list(environment, tools_key, checkpoint, steps, position, passed_actions):
+    """
+    Run posted actions after the session history, as if each had been posted
+    to /execute_api in turn. The history's state is restored from a checkpoint
+    blob and steps (see restore_state); `position` is its length. Yields one
+    result per action as soon as it is computed (with the 'action' to record
+    when the tool call succeeded, the inserts/updates/deletes it made under
+    'changes', and a 'checkpoint' blob every CHECKPOINT_INTERVAL actions),
+    then a final {'checkpoint'} item with the resulting state.
+    Needs no request context, so it also runs inside tool worker processes.
+    """
+    snapshot = get_snapshot(environment)
+    tools_instance = get_tools_class(tools_key)
+    converters = tool_converters(environment, tools_key[1])
+    # Steps to apply on top of the checkpoint to get back to the last good state
+    steps = list(steps)
+    data = restore_state(snapshot, tools_instance, checkpoint, steps)
     
-    Args:
-        obj: The object to process (dict or list)
-        float_fields: List of field paths like ['holding_data.quantity']
-        current_path: Current path in the object hierarchy (used internally)
+    for passed_action in passed_actions:
+        start = time.perf_counter()
+        if not passed_action.get('api_name'):
+            yield {'status': 'error', 'message': 'API name is required', 'elapsed_ms': 0.0}
+            continue
+        try:
+            action = prepare_action(passed_action, converters)
+        except ValueError as e:
+            yield {'status': 'error', 'message': str(e), 'elapsed_ms': (time.perf_counter() - start) * 1000}
+            continue
+        if not hasattr(tools_instance, action['api_name']):
+            yield {
+                'status': 'error',
+                'message': f"API {passed_action['api_name']} not found",
+                'elapsed_ms': (time.perf_counter() - start) * 1000
+            }
+            continue
+        data.start_journal()
+        try:
+            result = execute_api_utility(action['api_name'], action['arguments'], tools_instance, data)
+        except Exception as e:
+            # The failed call may have applied part of its changes; go back to the last good state
+            data.stop_journal()
+            data = restore_state(snapshot, tools_instance, checkpoint, steps)
+            yield {
+                'status': 'error',
+                'message': execution_error_message(e),
+                'elapsed_ms': (time.perf_counter() - start) * 1000
+            }
+            continue
+        changes = data.stop_journal()
+        steps.append(("journal", changes))
+        position += 1
+        try:
+            parsed_result, float_fields = parse_output(result)
+            item = {'status': 'success', 'output': parsed_result, 'float_fields': float_fields}
+        except Exception as e:
+            item = {'status': 'error', 'message': execution_error_message(e)}
+        item['action'] = action
+        item['changes'] = changes
+        if position % CHECKPOINT_INTERVAL == 0:
+            item['checkpoint'] = checkpoint_blob(data)
+        item['elapsed_ms'] = (time.perf_counter() - start) * 1000
+        yield item
     
-    Returns:
-        Modified object with integers converted to floats
+    yield {'checkpoint': checkpoint_blob(data)}
+
+
+def run_actions(environment, passed_actions, history=None):
     """
-    if isinstance(obj, dict):
-        for key, value in obj.items():
-            # Build the full path for this key
-            full_path = f"{current_path}.{key}" if current_path else key
-            
-            # Check if this field should be converted to float
-            should_be_float = False
-            for float_field in float_fields:
-                # Match full path or check if the field name matches at the end of path
-                if full_path == float_field:
-                    should_be_float = True
-                    break
-                # Also check if current path + key matches the float_field
-                elif float_field.endswith(f".{key}"):
-                    parent_path = '.'.join(float_field.split('.')[:-1])
-                    if current_path == parent_path:
-                        should_be_float = True
-                        break
-            
-            # Convert to float if needed
-            if should_be_float and isinstance(value, int):
-                obj[key] = float(value)
-                # print(f"  ✓ Converted {full_path}: {value} (int) -> {float(value)} (float)")
-            
-            # Recursively process nested structures
-            if isinstance(value, dict):
-                apply_float_fields(value, float_fields, full_path)
-            elif isinstance(value, list):
-                for i, item in enumerate(value):
-                    if isinstance(item, dict):
-                        apply_float_fields(item, float_fields, f"{full_path}[{i}]")
+    Run posted actions for the session, in a tool worker process when the pool
+    is enabled, after `history` (the session's recorded actions by default).
+    The actions that succeed replace the session's actions after the history.
+    Their changes are journaled and the resulting state checkpointed, so later
+    requests restore any prefix of the actions without replaying them. Yields
+    one result per action; the recorded ones carry their 'session_index'.
+    """
+    tools_key = session.get("tools_key")
+    tools_hash = tools_key[2] if tools_key else ""
+    if history is None:
+        history = session.get("actions", [])
     
-    elif isinstance(obj, list):
-        for i, item in enumerate(obj):
-            if isinstance(item, dict):
-                apply_float_fields(item, float_fields, f"{current_path}[{i}]")
+    fingerprints = prefix_fingerprints(environment, data_version(environment), tools_hash, history)
+    # Start from the nearest checkpoint; replay only the actions whose journal is missing or stale
+    checkpoint, steps = plan_restore(fingerprints, history)
+    job = (environment, tools_key, checkpoint, steps, len(history), passed_actions)
+    items = run_in_worker(run_action_list, *job) if WORKER_POOL_SIZE > 0 else run_action_list(*job)
     
-    return obj
+    recorded = list(history)
+    fingerprint = fingerprints[-1]
+    session["actions"] = recorded
+    for item in items:
+        action = item.pop('action', None)
+        blob = item.pop('checkpoint', None)
+        if action is not None:
+            recorded.append(action)
+            fingerprint = extend_fingerprint(fingerprint, action)
+            save_journal(fingerprint, item['changes'])
+            # New actions start a new branch of the history
+            session["undone_actions"] = []
+            item['session_index'] = len(recorded) - 1
+        if blob is not None:
+            save_checkpoint(fingerprint, blob)
+        if 'status' in item:
+            yield item
+
+
+def action_to_request(action):
+    """ Inverse of prepare_action: the posted form of a recorded session action """
+    return {'api_name': action['api_name'].removesuffix("_invoke"), 'parameters': action['arguments']}
 
 
 @task_framework_bp.route('/execute_api', strict_slashes=False, methods=["GET", "POST"])
@@ -426,77 +495,148 @@ def execute_api():
     # print(passed_data)
     # print(passed_data.get('environment'))
     environment = passed_data.get('environment', session.get("environment"))
-    ENVS_PATH = "envs"
-    DATA_PATH = f"{ENVS_PATH}/{environment}/data"
-    data_files = os.listdir(DATA_PATH)
-    # print("Loaded data:")
-    for data_file in data_files:
-        if data_file.endswith(".json"):
-            data_file_path = os.path.join(DATA_PATH, data_file)
-            with open(data_file_path, "r") as file:
-                g.data[data_file.split('.')[0]] = json.load(file)
     
-    for action in session.get("actions", []):
-        # print('session:', session.get("actions"))
-        api_name = action.get('api_name')
-        execute_api_utility(api_name, action.get('arguments', {}))
-    
-    api_name = passed_data.get('api_name')
-    api_name = api_name + "_invoke" if api_name else None
-    if not api_name:
+    if not passed_data.get('api_name'):
         return jsonify({
             'status': 'error',
             'message': 'API name is required'
         }), 400
+    
+    try:
+        result = list(run_actions(environment, [passed_data]))[0]
+    except Exception as e:
+        result = {'status': 'error', 'message': execution_error_message(e)}
+    if result['status'] != 'success':
+        # print(f"Error executing API {api_name}: {str(e)}")
+        return jsonify({
+            'status': 'error',
+            'message': result['message']
+        }), 500
+    # parsed_result = convert_floats_to_strings(parsed_result)
+    return json_response({
+        'output': result['output'],
+        'float_fields': result['float_fields'],
+        'changes': result['changes'],
+        'session_index': result['session_index']
+    }), 200
 
+
+@task_framework_bp.route('/execute_batch', strict_slashes=False, methods=["POST"])
+def execute_batch():
+    """ Run a whole action list in one request and return every output with its timing """
+    passed_data = request.get_json()
+    environment = passed_data.get('environment', session.get("environment"))
     
-    arguments = passed_data.get('parameters', {})
-    argument_float_fields = passed_data.get('argument_float_fields', [])  # Get float fields from frontend
-    cleaned_arguments = (arguments)
-    arguments = cleaned_arguments
+    batch_start = time.perf_counter()
+    try:
+        results = list(run_actions(environment, passed_data.get('actions', [])))
+    except Exception as e:
+        return jsonify({
+            'status': 'error',
+            'message': execution_error_message(e)
+        }), 500
+    return json_response({
+        'status': 'success',
+        'results': results,
+        'elapsed_ms': (time.perf_counter() - batch_start) * 1000
+    }), 200
+
+
+@task_framework_bp.route('/execute_stream', strict_slashes=False, methods=["POST"])
+def execute_stream():
+    """
+    Streaming variant of /execute_batch: one NDJSON line per action, sent as
+    soon as it is computed, then a final {"done": true} line.
+    The executed actions are recorded in the session after the response has
+    started, which needs server-side sessions (Flask-Session, see app.py).
+    With cookie sessions nothing is streamed: the actions are all run and the
+    whole NDJSON body buffered before the response (and its cookie) is sent.
+    """
+    passed_data = request.get_json()
+    environment = passed_data.get('environment', session.get("environment"))
+    app = current_app._get_current_object()
+    # Server-side sessions are written to their store; a cookie session only goes out with the headers
+    server_side_session = not isinstance(app.session_interface, SecureCookieSessionInterface)
     
-    # Convert integers to floats based on argument_float_fields
-    if argument_float_fields:
-        # print(f"Float fields to apply: {argument_float_fields}")
-        # print(f"Arguments BEFORE float conversion: {arguments}")
-        arguments = apply_float_fields(arguments, argument_float_fields)
-        # print(f"Arguments AFTER float conversion: {arguments}")
+    def generate():
+        batch_start = time.perf_counter()
+        try:
+            for index, result in enumerate(run_actions(environment, passed_data.get('actions', []))):
+                yield json_dumps({'index': index, **result}) + "\n"
+        except Exception as e:
+            yield app.json.dumps({'status': 'error', 'message': execution_error_message(e)}) + "\n"
+        if server_side_session:
+            # The session was saved when the response started; store the executed actions now
+            app.session_interface.save_session(app, session, Response())
+        yield app.json.dumps({'done': True, 'elapsed_ms': (time.perf_counter() - batch_start) * 1000}) + "\n"
     
+    if not server_side_session:
+        return Response(list(generate()), mimetype='application/x-ndjson')
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@task_framework_bp.route('/undo_action', strict_slashes=False, methods=["POST"])
+def undo_action():
+    """ Drop the last recorded action; its state stays journaled, so nothing is recomputed """
+    actions = session.get("actions", [])
+    if not actions:
+        return jsonify({'status': 'error', 'message': 'No action to undo'}), 400
+    session["undone_actions"] = session.get("undone_actions", []) + [actions[-1]]
+    session["actions"] = actions[:-1]
+    return jsonify({'status': 'success', 'session_index': len(actions) - 1}), 200
+
+
+@task_framework_bp.route('/redo_action', strict_slashes=False, methods=["POST"])
+def redo_action():
+    """ Record the last undone action again; its checkpoint or journal is still stored """
+    undone = session.get("undone_actions", [])
+    if not undone:
+        return jsonify({'status': 'error', 'message': 'No action to redo'}), 400
+    session["actions"] = session.get("actions", []) + [undone[-1]]
+    session["undone_actions"] = undone[:-1]
+    return jsonify({
+        'status': 'success',
+        'session_index': len(session["actions"]) - 1,
+        'action': action_to_request(undone[-1])
+    }), 200
+
+
+def rerun_from(index, edited_actions):
+    """
+    Replace the session action at `index` by `edited_actions` (none to remove
+    it) and run the actions that followed it again. The state before `index`
+    is restored from its checkpoint and journals.
+    """
+    passed_data = request.get_json()
+    environment = passed_data.get('environment', session.get("environment"))
+    actions = session.get("actions", [])
+    if not isinstance(index, int) or not 0 <= index < len(actions):
+        return jsonify({'status': 'error', 'message': 'Invalid action index'}), 400
     
-    # tools_instance = create_tools_class(session.get("imports_set", []), session.get("invoke_methods", []))
-    # if hasattr(tools_instance, api_name):
+    following = [action_to_request(action) for action in actions[index + 1:]]
     try:
-        result = execute_api_utility(api_name, arguments)
-        # print(g.data)
-        # Dynamically call the method with the provided arguments
-        # print("Executing API:", api_name, "with arguments:", arguments)
-        # result = getattr(tools_instance, api_name)(data=g.data, **arguments)
-        # print(f"Result from API {api_name}: {result}")
-        session["actions"].append({
-            'api_name': api_name,
-            'arguments': arguments
-        })
-        parsed_result = json.loads(result) if isinstance(result, str) else result
-        float_fields = list(detect_float_fields(parsed_result))
-        # parsed_result = convert_floats_to_strings(parsed_result)
-        # print("parsed_res:" , (parsed_result))
-        # print(type(result))
-        return jsonify({'output': parsed_result, 'float_fields': float_fields}), 200
-        
-        # return jsonify({
-        #     'output': json.loads(result) if isinstance(result, str) else result
-        # }), 200
+        results = list(run_actions(environment, edited_actions + following, history=actions[:index]))
     except Exception as e:
-        # print(f"Error executing API {api_name}: {str(e)}")
-        return_message = str(e)
-        if "expected an indented block" in return_message:
-            return_message = "Click on GO to reload the session"
         return jsonify({
             'status': 'error',
-            'message': f'Failed to execute API: {return_message}'
+            'message': execution_error_message(e)
         }), 500
-# else:
-#     return jsonify({
-#         'status': 'error',
-#         'message': f'API {api_name} not found'
-#     }), 404
\ No newline at end of file
+    return json_response({'status': 'success', 'results': results}), 200
+
+
+@task_framework_bp.route('/edit_action', strict_slashes=False, methods=["POST"])
+def edit_action():
+    """ Change the action at `index`; results are returned for it and every action after it """
+    passed_data = request.get_json()
+    if not passed_data.get('api_name'):
+        return jsonify({
+            'status': 'error',
+            'message': 'API name is required'
+        }), 400
+    return rerun_from(passed_data.get('index'), [passed_data])
+
+
+@task_framework_bp.route('/remove_action', strict_slashes=False, methods=["POST"])
+def remove_action():
+    """ Remove the action at `index`; results are returned for every action after it """
+    return rerun_from(request.get_json().get('index'), [])
@@ -0,0 +1,141 @@
+############# TOOL EXECUTION WORKER POOL ####################
+"""
+Optional pool of executor processes for tool invoke code, so a pathological
+call (huge filter, infinite loop, runaway memory) cannot block or take down
+a Flask worker. Each process keeps its own warm environment snapshots and
+compiled Tools classes between jobs.
+
+Configured through environment variables:
+    TOOL_WORKERS                number of executor processes (0, the default, runs tools inline)
+    TOOL_TIMEOUT_SECONDS        longest a worker may go without producing the next action result
+    TOOL_QUEUE_TIMEOUT_SECONDS  longest a request waits for a worker when all of them are busy
+    TOOL_MEMORY_LIMIT_MB        address space ceiling of each worker process (0 for no limit)
+
+Workers have no Flask app context, so the server_store Redis backend is out
+of their reach: store_get() there only sees the worker's own local store.
+Everything a job needs from the request side (session history, checkpoint
+blob, journals) is passed in the job itself, and a Tools class missing from
+the worker's cache is rebuilt from the interface files.
+"""
+import os
+import queue
+import threading
+import multiprocessing
+
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+
+WORKER_POOL_SIZE = int(os.environ.get("TOOL_WORKERS", "0"))
+TIMEOUT_SECONDS = float(os.environ.get("TOOL_TIMEOUT_SECONDS", "30"))
+QUEUE_TIMEOUT_SECONDS = float(os.environ.get("TOOL_QUEUE_TIMEOUT_SECONDS", "30"))
+MEMORY_LIMIT_MB = int(os.environ.get("TOOL_MEMORY_LIMIT_MB", "2048"))
+
+# spawn: forking a threaded web server process is unsafe. Note that spawn re-imports
+# the main module in every worker, which is the app itself under `python app.py`
+_context = multiprocessing.get_context("spawn")
+_idle_workers = queue.LifoQueue()
+_started_workers = 0
+_workers_lock = threading.Lock()
+
+
+def _worker_main(connection, memory_limit_mb):
+    if resource is not None and memory_limit_mb > 0:
+        limit = memory_limit_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    while True:
+        try:
+            function, args = connection.recv()
+        except EOFError:
+            return
+        try:
+            for item in function(*args):
+                connection.send(("item", item))
+        except Exception as e:
+            connection.send(("error", str(e)))
+            continue
+        connection.send(("done", None))
+
+
+class ToolWorker:
+    def __init__(self):
+        self.connection, child_connection = _context.Pipe()
+        self.process = _context.Process(target=_worker_main, args=(child_connection, MEMORY_LIMIT_MB), daemon=True)
+        self.process.start()
+        child_connection.close()
+
+    def stop(self):
+        self.process.kill()
+        self.process.join()
+        self.connection.close()
+
+
+def _acquire_worker():
+    global _started_workers
+    while True:
+        try:
+            worker = _idle_workers.get_nowait()
+        except queue.Empty:
+            with _workers_lock:
+                start_worker = _started_workers < WORKER_POOL_SIZE
+                if start_worker:
+                    _started_workers += 1
+            if start_worker:
+                try:
+                    return ToolWorker()
+                except Exception:
+                    with _workers_lock:
+                        _started_workers -= 1
+                    raise
+            try:
+                worker = _idle_workers.get(timeout=QUEUE_TIMEOUT_SECONDS)
+            except queue.Empty:
+                raise TimeoutError(
+                    f"All {WORKER_POOL_SIZE} tool workers stayed busy for {QUEUE_TIMEOUT_SECONDS:g} seconds, try again"
+                ) from None
+        if worker.process.is_alive():
+            return worker
+        # Died while idle (killed from outside): replace it
+        _discard_worker(worker)
+
+
+def _discard_worker(worker):
+    global _started_workers
+    worker.stop()
+    with _workers_lock:
+        _started_workers -= 1
+
+
+def run_in_worker(function, *args):
+    """
+    Run the generator function(*args) in a pool process and yield its items;
+    function and args are pickled, so function must be a module-level name.
+    A worker that times out or dies is killed and replaced; the caller gets
+    an exception and nothing after the last yielded item. So does a caller
+    that waited QUEUE_TIMEOUT_SECONDS without a worker becoming free.
+    """
+    worker = _acquire_worker()
+    reusable = False
+    try:
+        worker.connection.send((function, args))
+        while True:
+            if not worker.connection.poll(TIMEOUT_SECONDS):
+                raise TimeoutError(f"Tool execution timed out after {TIMEOUT_SECONDS:g} seconds")
+            try:
+                kind, payload = worker.connection.recv()
+            except (EOFError, ConnectionError):
+                raise RuntimeError("The tool worker crashed (memory limit exceeded?)") from None
+            if kind == "item":
+                yield payload
+            elif kind == "error":
+                reusable = True
+                raise RuntimeError(payload)
+            else:
+                reusable = True
+                return
+    finally:
+        if reusable:
+            _idle_workers.put(worker)
+        else:
+            _discard_worker(worker)
@@ -1,6 +1,8 @@
 
 const APIs = new Map();
 let actionCounter = 0;
+// Ids of the action divs whose actions were undone, most recent last
+const undoneActionIds = [];
 
 async function handleGo() {
     const environment = document.getElementById('environment').value.trim();
@@ -44,6 +46,11 @@ async function handleGo() {
             
             // Clear existing APIs
             APIs.clear();
+            // The session history starts over
+            document.querySelectorAll('.api-action[data-session-index]').forEach(actionEl => {
+                delete actionEl.dataset.sessionIndex;
+            });
+            undoneActionIds.length = 0;
             
             // Populate APIs from response
             for (const func of data.functions_info) {
@@ -65,6 +72,7 @@ async function handleGo() {
 }
 
 async function runAllActions() {
+    const environment = document.getElementById('environment').value.trim();
     const actionElements = document.querySelectorAll('.api-action');
     const runAllBtn = document.getElementById('run-all-btn');
     
@@ -87,6 +95,19 @@ async function runAllActions() {
         return;
     }
     
+    // Collect every action up front, they are executed in one pass on the server
+    const actionIds = [];
+    const actionRequests = [];
+    for (let i = 0; i < actionElements.length; i++) {
+        const actionRequest = collectActionRequest(actionElements[i].id);
+        if (!actionRequest) {
+            showWrongMessage(`Action ${i + 1} has invalid parameters, nothing was executed.`);
+            return;
+        }
+        actionIds.push(actionElements[i].id);
+        actionRequests.push(actionRequest);
+    }
+    
     // Disable the run all button
     runAllBtn.textContent = '⏳ Running All Actions...';
     runAllBtn.disabled = true;
@@ -95,25 +116,71 @@ async function runAllActions() {
     let errorCount = 0;
     
     try {
-        for (let i = 0; i < actionElements.length; i++) {
-            const actionEl = actionElements[i];
-            const actionId = actionEl.id;
-            
-            showCorrectMessage(`Executing Action ${i + 1} of ${actionElements.length}...`);
-            
-            try {
-                await executeAPI(actionId);
+        showCorrectMessage(`Executing ${actionRequests.length} actions...`);
+        actionIds.forEach(actionId => {
+            const responseDiv = document.getElementById(`${actionId}_response`);
+            responseDiv.innerHTML = '<div class="response-header">Waiting...</div>';
+            responseDiv.className = 'api-response show';
+        });
+        
+        // Results are streamed back as NDJSON, one line per action as soon as it is computed
+        const response = await fetch('/execute_stream', {
+            method: 'POST',
+            headers: {
+                'Content-Type': 'application/json'
+            },
+            body: JSON.stringify({
+                environment: environment,
+                actions: actionRequests
+            })
+        });
+        
+        if (!response.ok) {
+            console.error('Error details:', await response.text());
+            showWrongMessage('An error occurred while running actions.');
+            return;
+        }
+        
+        const handleLine = (line) => {
+            if (!line.trim()) {
+                return;
+            }
+            const result = JSON.parse(line);
+            if (result.done) {
+                console.log('Run all actions finished in (ms):', result.elapsed_ms);
+                return;
+            }
+            if (result.index === undefined) {
+                console.error('Error details:', result);
+                showWrongMessage(result.message || 'An error occurred while running actions.');
+                errorCount++;
+                return;
+            }
+            const succeeded = result.status === 'success';
+            renderActionResult(actionIds[result.index], succeeded, result, actionRequests[result.index].argument_float_fields);
+            setSessionIndex(actionIds[result.index], result.session_index);
+            if (succeeded) {
                 successCount++;
-            } catch (error) {
-                console.error(`Error executing action ${i + 1}:`, error);
+            } else {
                 errorCount++;
             }
-            
-            // Wait 1 seconds before next action (except for the last one)
-            if (i < actionElements.length - 1) {
-                await new Promise(resolve => setTimeout(resolve, 1000));
+            showCorrectMessage(`Executed Action ${result.index + 1} of ${actionRequests.length} (${result.elapsed_ms.toFixed(1)} ms)`);
+        };
+        
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        while (true) {
+            const { value, done } = await reader.read();
+            if (done) {
+                break;
             }
+            buffer += decoder.decode(value, { stream: true });
+            const lines = buffer.split('\n');
+            buffer = lines.pop();
+            lines.forEach(handleLine);
         }
+        handleLine(buffer + decoder.decode());
         
         // Show final summary
         if (errorCount === 0) {
@@ -197,11 +264,16 @@ function addAction() {
     return [actionId, actionDiv];
 }
 
-function removeAction(actionId) {
+async function removeAction(actionId) {
     const actionDiv = document.getElementById(actionId);
     actionCounter--;
     if (actionDiv) {
+        const sessionIndex = actionDiv.dataset.sessionIndex;
         actionDiv.remove();
+        if (sessionIndex !== undefined) {
+            // Drop it from the session history too; only the actions after it run again
+            await rerunActions('/remove_action', Number(sessionIndex), [], {});
+        }
     }
 }
 
@@ -332,15 +404,15 @@ function convertStringFloatsToNumbers(obj) {
 // }
 
 
-async function executeAPI(actionId) {
-    const environment = document.getElementById('environment').value.trim();
+// Collect the API and parameters of an action; returns null (after showing the problem) when they are invalid
+function collectActionRequest(actionId) {
     const actionDiv = document.getElementById(actionId);
     const selectedRadio = actionDiv.querySelector('input[type="radio"]:checked');
     const selectedAPI = selectedRadio ? selectedRadio.value : null;
                 
     if (!selectedAPI) {
         showWrongMessage('Please select an API first.');
-        return;
+        return null;
     }
     
     // Collect parameters
@@ -348,7 +420,6 @@ async function executeAPI(actionId) {
     const argumentFloatFields = []; // Track which arguments should preserve .0
     const paramInputs = actionDiv.querySelectorAll('.parameter-input');
     let hasError = false;
-    let hasJSONError = false;
     
     paramInputs.forEach(input => {
         const paramName = input.dataset.param;
@@ -379,115 +450,236 @@ async function executeAPI(actionId) {
             
             if (parameterInfo['type'] === 'object'){
                 // Detect float fields in the original JSON string BEFORE parsing
-                const floatFieldsInObject = [];
                 const floatRegex = /"(\w+)"\s*:\s*(\d+\.0)(?=[,}\s])/g;
                 let match;
                 while ((match = floatRegex.exec(value)) !== null) {
-                    floatFieldsInObject.push(match[1]);
                     // Track all float fields regardless of properties definition
                     argumentFloatFields.push(`${paramName}.${match[1]}`);
                 }
-                
-                let parsedValue;
-                try {
-                    parsedValue = JSON.parse(value.replace(/\bTrue\b/g, 'true').replace(/\bFalse\b/g, 'false'));
-                } catch (e) {
-                    // console.error('Failed to parse JSON for param:', paramName, e);
-                    showWrongMessage(`Invalid JSON format for parameter: ${paramName}. JSON keys and values must be enclosed by double quotes.`);
-                    hasJSONError = true;
-                    // return;
-                }
-                
-                value = parsedValue;
-                if (parameterInfo['properties'] !== undefined){
-                    // Handle object properties with type conversion
-                    const properties = parameterInfo['properties'];
-                    console.log('Parsing object for param:', paramName, typeof(value), value);
-                    
-                    for (const v_key in value){
-                        if (properties[v_key] !== undefined){
-                            if (properties[v_key]['type'] === 'string'){
-                                // Keep as string
-                            }
-                            else if (properties[v_key]['type'] === 'number'){
-                                if (!Number.isNaN(Number(value[v_key]))){
-                                    value[v_key] = Number(value[v_key]);
-                                }
-                            }
-                            else if (properties[v_key]['type'] === 'boolean'){
-                                const val = value[v_key];
-                                if (typeof val === 'string') {
-                                    const lower = val.toLowerCase();
-                                    if (lower === 'true' || lower === 'false') {
-                                        value[v_key] = lower === 'true';
-                                    }
-                                } else if (typeof val === 'boolean') {
-                                    // Already a boolean, do nothing
-                                } else {
-                                    // Optional: handle invalid type
-                                    console.warn(`Expected boolean or string, got: ${typeof val}`);
-                                }
-                            }
-                            else if (properties[v_key]['type'] === 'array'){
-                                try {
-                                    value[v_key] = JSON.parse(value[v_key].replace(/\bTrue\b/g, 'true').replace(/\bFalse\b/g, 'false'));
-                                    if (!Array.isArray(value[v_key])){
-                                        throw new Error('Not an array');
-                                    }
-                                } catch (e) {
-                                    // Invalid JSON, keep as string
-                                }
-                            }
-                        }
-                    }
-                }
-                // Note: No else needed - float fields already tracked above
-            }
-            else{
-                // Handle non-object types
-                if (parameterInfo['type'] === 'string'){
-                    // Keep as string
-                }
-                else if (parameterInfo['type'] === 'number' || parameterInfo['type'] === 'integer' || parameterInfo['type'] === 'float'){
-                    if (!Number.isNaN(Number(value))){
-                        value = Number(value);
-                    }
-                }
-                else if (parameterInfo['type'] === 'boolean'){
-                    const val = value;
-                    if (typeof val === 'string') {
-                        const lower = val.toLowerCase();
-                        if (lower === 'true' || lower === 'false') {
-                            value = lower === 'true';
-                        }
-                    } else if (typeof val === 'boolean') {
-                        // Already a boolean, do nothing
-                    } else {
-                        // Optional: handle invalid type
-                        console.warn(`Expected boolean or string, got: ${typeof val}`);
-                    }
-                }
-                else if (parameterInfo['type'] === 'array'){
-                    try {
-                        value = JSON.parse(value.replace(/\bTrue\b/g, 'true').replace(/\bFalse\b/g, 'false'));
-                        if (!Array.isArray(value)){
-                            throw new Error('Not an array');
-                        }
-                    } catch (e) {
-                        // Invalid JSON, keep as string
-                    }
-                }
             }
+            // The value is sent as typed; the server converts it with the tool's schema
             parameters[paramName] = value;
         }
     });
     // console.log(argumentFloatFields)
-    if (hasJSONError) {
+    if (hasError) {
+        showWrongMessage('Please fill in all required fields.');
+        return null;
+    }
+    
+    return {
+        api_name: selectedAPI,
+        parameters: parameters,
+        argument_float_fields: argumentFloatFields,
+        // Typed inputs are strings: the server converts them with the tool's schema
+        form_input: true
+    };
+}
+
+function fixNewlines(obj) {
+    if (typeof obj === 'string') {
+        return obj.replace(/\\n/g, '\n');
+    }
+    if (Array.isArray(obj)) {
+        return obj.map(fixNewlines);
+    }
+    if (obj && typeof obj === 'object') {
+        const fixed = {};
+        for (let key in obj) {
+            fixed[key] = fixNewlines(obj[key]);
+        }
+        return fixed;
+    }
+    return obj;
+}
+
+function sortKeys(value) {
+    if (Array.isArray(value)) {
+        return value.map(sortKeys);
+    }
+    if (value === null || typeof value !== 'object') {
+        return value;
+    }
+    const sorted = {};
+    Object.keys(value).sort().forEach(key => {
+        sorted[key] = sortKeys(value[key]);
+    });
+    return sorted;
+}
+
+// Render the server's answer for one action (from /execute_api or one entry of /execute_batch)
+function renderActionResult(actionId, succeeded, result, argumentFloatFields) {
+    const responseDiv = document.getElementById(`${actionId}_response`);
+    if (succeeded) {
+        responseDiv.className = 'api-response show success';
+        responseDiv.innerHTML = `
+            <div class="response-header">✅ Success</div>
+            <div class="response-content"><pre></pre><pre class="floatFields"></pre><pre class="argFloatFields" style="display:none;"></pre></div>
+        `;
+        // Set the JSON content as text to preserve literals
+        
+        // Process the data to convert literal \n to actual newlines
+        // console.log(result)
+        try {
+            result.output = JSON.parse(result.output)
+        } catch (e) {
+            // Not JSON, keep as is
+        }
+        // Outputs arrive in the tool's own key order, show them sorted as before
+        result.output = sortKeys(result.output);
+        // result.output = convertStringFloatsToNumbers(result.output)
+        if (result.float_fields && Array.isArray(result.float_fields)) {
+            result.output._floatFields = result.float_fields;
+        }
+        
+        const displayResult = {
+            output: result.output
+        };
+        const fixedResult = fixNewlines(displayResult);
+        // console.log('Fixed Result:', fixedResult);
+        responseDiv.querySelector('pre').textContent =  formatJSONWithFloats(fixedResult, 2, true);
+        responseDiv.querySelector('.floatFields').textContent = result.float_fields ? `Float Fields: ${result.float_fields.join(', ')}` : '';
+        // Store argument float fields for later export
+        responseDiv.querySelector('.argFloatFields').textContent = argumentFloatFields.length > 0 ? argumentFloatFields.join(',') : '';
+        renderChanges(responseDiv, result.changes);
+    } else {
+        responseDiv.className = 'api-response show error';
+        responseDiv.innerHTML = `
+            <div class="response-header">❌ Error</div>
+            <div class="response-content">${JSON.stringify(result, null, 2)}</div>
+        `;
+    }
+}
+
+// "What changed" panel: the records the action inserted, updated or deleted, per table
+function renderChanges(responseDiv, changes) {
+    if (!changes || Object.keys(changes).length === 0) {
         return;
     }
+    const summaries = Object.entries(changes).map(([table, tableChanges]) => {
+        if (tableChanges.removed !== undefined) {
+            return `${table}: removed`;
+        }
+        if (tableChanges.replaced !== undefined) {
+            return `${table}: replaced`;
+        }
+        const parts = [];
+        if (tableChanges.inserted) {
+            parts.push(`+${Object.keys(tableChanges.inserted).length} inserted`);
+        }
+        if (tableChanges.updated) {
+            parts.push(`~${Object.keys(tableChanges.updated).length} updated`);
+        }
+        if (tableChanges.deleted) {
+            parts.push(`-${tableChanges.deleted.length} deleted`);
+        }
+        return `${table}: ${parts.join(', ')}`;
+    });
+    const changesPanel = document.createElement('details');
+    changesPanel.className = 'changes-panel';
+    const summary = document.createElement('summary');
+    summary.textContent = `Changes: ${summaries.join('; ')}`;
+    const details = document.createElement('pre');
+    details.textContent = JSON.stringify(changes, null, 2);
+    changesPanel.appendChild(summary);
+    changesPanel.appendChild(details);
+    responseDiv.appendChild(changesPanel);
+}
 
-    if (hasError) {
-        showWrongMessage('Please fill in all required fields.');
+// Position of the div's action in the session history (undefined when it is not recorded)
+function setSessionIndex(actionId, sessionIndex) {
+    const actionDiv = document.getElementById(actionId);
+    if (!actionDiv) {
+        return;
+    }
+    if (sessionIndex === undefined || sessionIndex === null) {
+        delete actionDiv.dataset.sessionIndex;
+    } else {
+        actionDiv.dataset.sessionIndex = sessionIndex;
+        undoneActionIds.length = 0;
+    }
+}
+
+// Ids of the divs recorded at or after the given session index, in history order
+function recordedActionIds(fromIndex) {
+    return Array.from(document.querySelectorAll('.api-action[data-session-index]'))
+        .filter(actionEl => Number(actionEl.dataset.sessionIndex) >= fromIndex)
+        .sort((a, b) => Number(a.dataset.sessionIndex) - Number(b.dataset.sessionIndex))
+        .map(actionEl => actionEl.id);
+}
+
+// Edit or remove the session action at sessionIndex; the server re-runs only the actions after it
+async function rerunActions(endpoint, sessionIndex, actionIds, payload) {
+    const environment = document.getElementById('environment').value.trim();
+    actionIds = actionIds.concat(recordedActionIds(sessionIndex + 1));
+    const response = await fetch(endpoint, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({
+            ...payload,
+            index: sessionIndex,
+            environment: environment
+        })
+    });
+    const data = await response.json();
+    if (!response.ok) {
+        showWrongMessage(data.message || 'An error occurred while running actions.');
+        return false;
+    }
+    let succeeded = true;
+    data.results.forEach((result, i) => {
+        const actionRequest = collectActionRequest(actionIds[i]);
+        renderActionResult(actionIds[i], result.status === 'success', result, actionRequest ? actionRequest.argument_float_fields : []);
+        setSessionIndex(actionIds[i], result.session_index);
+        succeeded = succeeded && result.status === 'success';
+    });
+    if (succeeded) {
+        showCorrectMessage(`Re-executed ${data.results.length} actions successfully!`);
+    } else {
+        showWrongMessage('Some actions failed after the change. Check the responses for details.');
+    }
+    return succeeded;
+}
+
+async function undoAction() {
+    const response = await fetch('/undo_action', { method: 'POST' });
+    const data = await response.json();
+    if (!response.ok) {
+        showWrongMessage(data.message);
+        return;
+    }
+    const [actionId] = recordedActionIds(data.session_index);
+    if (actionId) {
+        delete document.getElementById(actionId).dataset.sessionIndex;
+        document.getElementById(`${actionId}_response`).classList.add('undone');
+    }
+    undoneActionIds.push(actionId);
+    showCorrectMessage('Undid the last action.');
+}
+
+async function redoAction() {
+    const response = await fetch('/redo_action', { method: 'POST' });
+    const data = await response.json();
+    if (!response.ok) {
+        showWrongMessage(data.message);
+        return;
+    }
+    const actionId = undoneActionIds.pop();
+    const actionDiv = actionId && document.getElementById(actionId);
+    if (actionDiv) {
+        actionDiv.dataset.sessionIndex = data.session_index;
+        document.getElementById(`${actionId}_response`).classList.remove('undone');
+    }
+    showCorrectMessage(`Redid ${data.action.api_name}.`);
+}
+
+async function executeAPI(actionId) {
+    const environment = document.getElementById('environment').value.trim();
+    const actionDiv = document.getElementById(actionId);
+    const actionRequest = collectActionRequest(actionId);
+    if (!actionRequest) {
         return;
     }
     
@@ -502,75 +694,28 @@ async function executeAPI(actionId) {
     responseDiv.className = 'api-response show';
     
     try {
-        function fixNewlines(obj) {
-            if (typeof obj === 'string') {
-                return obj.replace(/\\n/g, '\n');
-            }
-            if (Array.isArray(obj)) {
-                return obj.map(fixNewlines);
-            }
-            if (obj && typeof obj === 'object') {
-                const fixed = {};
-                for (let key in obj) {
-                    fixed[key] = fixNewlines(obj[key]);
-                }
-                return fixed;
-            }
-            return obj;
+        if (actionDiv.dataset.sessionIndex !== undefined) {
+            // Already recorded: edit it in place in the session history
+            await rerunActions('/edit_action', Number(actionDiv.dataset.sessionIndex), [actionId], actionRequest);
+            return;
         }
-
         const response = await fetch('/execute_api', {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json'
             },
             body: JSON.stringify({
-                api_name: selectedAPI,
-                parameters: parameters,
-                environment: environment,
-                argument_float_fields: argumentFloatFields
+                ...actionRequest,
+                environment: environment
             })
         });
         
         const result = await response.json();
-
-
+        renderActionResult(actionId, response.ok, result, actionRequest.argument_float_fields);
+        setSessionIndex(actionId, result.session_index);
         if (response.ok) {
-            responseDiv.className = 'api-response show success';
-            responseDiv.innerHTML = `
-                <div class="response-header">✅ Success</div>
-                <div class="response-content"><pre></pre><pre class="floatFields"></pre><pre class="argFloatFields" style="display:none;"></pre></div>
-            `;
-            // Set the JSON content as text to preserve literals
-            
-            // Process the data to convert literal \n to actual newlines
-            // console.log(result)
-            try {
-                result.output = JSON.parse(result.output)
-            } catch (e) {
-                // Not JSON, keep as is
-            }
-            // result.output = convertStringFloatsToNumbers(result.output)
-            if (result.float_fields && Array.isArray(result.float_fields)) {
-                result.output._floatFields = result.float_fields;
-            }
-            
-            const displayResult = {
-                output: result.output
-            };
-            const fixedResult = fixNewlines(displayResult);
-            // console.log('Fixed Result:', fixedResult);
-            responseDiv.querySelector('pre').textContent =  formatJSONWithFloats(fixedResult, 2, true);
-            responseDiv.querySelector('.floatFields').textContent = result.float_fields ? `Float Fields: ${result.float_fields.join(', ')}` : '';
-            // Store argument float fields for later export
-            responseDiv.querySelector('.argFloatFields').textContent = argumentFloatFields.length > 0 ? argumentFloatFields.join(',') : '';
             showCorrectMessage('API executed successfully!');
         } else {
-            responseDiv.className = 'api-response show error';
-            responseDiv.innerHTML = `
-                <div class="response-header">❌ Error</div>
-                <div class="response-content">${JSON.stringify(result, null, 2)}</div>
-            `;
             showWrongMessage('API execution failed. Check the response for details.');
         }
     } catch (error) {
@@ -0,0 +1,36 @@
+import os
+import sys
+
+# The modules and envs/ helpers are loaded relative to the repository root, as when app.py runs
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+import pytest
+from flask import Flask, g, session
+
+from modules.task_framework import task_framework_bp
+
+
+@pytest.fixture
+def app():
+    """ The task framework blueprint in an app with Flask's cookie sessions """
+    app = Flask(__name__)
+    app.secret_key = "test"
+    app.register_blueprint(task_framework_bp)
+
+    @app.before_request
+    def load_session_data():
+        g.data = session.get("data", {})
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def choose_interface(client, environment, interface):
+    response = client.post("/choose_env_interface", json={"environment": environment, "interface": interface})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()["functions_info"]
@@ -0,0 +1,104 @@
+import pytest
+
+from conftest import choose_interface
+
+
+def create_department(name, **parameters):
+    return {"api_name": "handle_department",
+            "parameters": {"action": "create", "department_name": name, "manager_id": "1", **parameters}}
+
+
+def post(client, url, **body):
+    return client.post(url, json={"environment": "hr_experts", **body})
+
+
+def execute(client, name, **parameters):
+    response = post(client, "/execute_api", **create_department(name, **parameters))
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()
+
+
+def recorded(client, key="actions"):
+    with client.session_transaction() as session:
+        return [action["arguments"]["department_name"] for action in session.get(key, [])]
+
+
+@pytest.fixture
+def history(client):
+    """Departments A, B and C created in that order, with ids 101, 102 and 103"""
+    choose_interface(client, "hr_experts", "2")
+    assert [execute(client, name)["output"]["department_id"] for name in "ABC"] == ["101", "102", "103"]
+    return client
+
+
+def test_undo_and_redo(history):
+    response = post(history, "/undo_action")
+    assert response.get_json() == {"status": "success", "session_index": 2}
+    assert post(history, "/undo_action").get_json()["session_index"] == 1
+    assert recorded(history) == ["A"]
+    assert recorded(history, "undone_actions") == ["C", "B"]
+
+    body = post(history, "/redo_action").get_json()
+    assert body["session_index"] == 1
+    assert body["action"] == create_department("B")
+    assert recorded(history) == ["A", "B"]
+    # The redone action's state is restored: the next department follows B
+    body = execute(history, "D")
+    assert body["output"]["department_id"] == "103"
+    assert body["session_index"] == 2
+    # A new action starts a new branch: C cannot be redone any more
+    response = post(history, "/redo_action")
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "No action to redo"
+
+
+def test_undo_and_redo_need_an_action(client):
+    choose_interface(client, "hr_experts", "2")
+    assert post(client, "/undo_action").status_code == 400
+    assert post(client, "/redo_action").status_code == 400
+
+
+def test_undone_action_is_not_in_the_state(history):
+    post(history, "/undo_action")
+    body = execute(history, "D")
+    assert body["output"]["department_id"] == "103"
+    assert body["session_index"] == 2
+    assert recorded(history) == ["A", "B", "D"]
+
+
+def test_edit_reruns_the_following_actions(history):
+    response = post(history, "/edit_action", index=0, **create_department("A2"))
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["output"]["department_id"] for result in results] == ["101", "102", "103"]
+    assert [result["session_index"] for result in results] == [0, 1, 2]
+    assert recorded(history) == ["A2", "B", "C"]
+
+
+def test_failed_edit_drops_the_action(history):
+    results = post(history, "/edit_action", index=1, **create_department("B2", floor=3)).get_json()["results"]
+    assert [result["status"] for result in results] == ["error", "success"]
+    assert results[1]["output"]["department_id"] == "102"
+    assert results[1]["session_index"] == 1
+    assert recorded(history) == ["A", "C"]
+
+
+def test_remove_reruns_the_following_actions(history):
+    response = post(history, "/remove_action", index=0)
+    assert response.status_code == 200
+    results = response.get_json()["results"]
+    assert [result["output"]["department_id"] for result in results] == ["101", "102"]
+    assert [result["session_index"] for result in results] == [0, 1]
+    assert recorded(history) == ["B", "C"]
+    # Removing the last action runs nothing again
+    assert post(history, "/remove_action", index=1).get_json()["results"] == []
+    assert recorded(history) == ["B"]
+
+
+@pytest.mark.parametrize("index", [3, -1, "0", None])
+def test_invalid_index(history, index):
+    response = post(history, "/remove_action", index=index)
+    assert response.status_code == 400
+    assert response.get_json()["message"] == "Invalid action index"
+    assert post(history, "/edit_action", index=index, **create_department("X")).status_code == 400
+    assert recorded(history) == ["A", "B", "C"]
@@ -0,0 +1,140 @@
+import os
+
+import pytest
+
+from modules import interface_manifest
+from modules.argument_coercion import (
+    apply_float_trie, coerce_arguments, compile_float_fields, compile_properties, tool_converters
+)
+
+SCHEMA = {
+    "name": {"type": "string"},
+    "amount": {"type": "number"},
+    "count": {"type": "integer"},
+    "active": {"type": "boolean"},
+    "tags": {"type": "array"},
+    "filters": {"type": "object", "properties": {"limit": {"type": "integer"}, "open": {"type": "boolean"}}},
+    "payload": {"type": "object"},
+}
+
+TOOL_SOURCE = '''
+import json
+from typing import Any, Dict
+from tau_bench.envs.tool import Tool
+
+class GetThing(Tool):
+    @staticmethod
+    def invoke(data: Dict[str, Any], thing_id: str, amount: float = 0) -> str:
+        return json.dumps({"thing_id": thing_id})
+
+    @staticmethod
+    def get_info() -> Dict[str, Any]:
+        return {
+            "type": "function",
+            "function": {
+                "name": "get_thing",
+                "description": "Get a thing",
+                "parameters": {
+                    "type": "object",
+                    "properties": {
+                        "thing_id": {"type": "string"},
+                        "amount": {"type": "%s"},
+                    },
+                    "required": ["thing_id"],
+                },
+            },
+        }
+'''
+
+
+def test_typed_inputs_are_converted_by_schema():
+    arguments = coerce_arguments({
+        "name": "12",
+        "amount": "12.5",
+        "count": "7",
+        "active": "False",
+        "tags": '["a", True]',
+        "filters": '{"limit": "5", "open": "true", "other": "1"}',
+        "payload": '{"x": 1.0}',
+        "unknown": "3",
+    }, compile_properties(SCHEMA))
+    assert arguments == {
+        "name": "12",
+        "amount": 12.5,
+        "count": 7,
+        "active": False,
+        "tags": ["a", True],
+        "filters": {"limit": 5, "open": True, "other": "1"},
+        "payload": {"x": 1.0},
+        "unknown": "3",
+    }
+    assert type(arguments["count"]) is int
+
+
+def test_inputs_that_do_not_fit_the_schema_are_kept():
+    arguments = coerce_arguments(
+        {"amount": "12 apples", "active": "yes", "tags": "a, b", "count": ""},
+        compile_properties(SCHEMA),
+    )
+    assert arguments == {"amount": "12 apples", "active": "yes", "tags": "a, b", "count": ""}
+
+
+def test_object_inputs_must_be_json():
+    with pytest.raises(ValueError, match="Invalid JSON format for parameter: filters"):
+        coerce_arguments({"filters": "{limit: 5}"}, compile_properties(SCHEMA))
+
+
+def test_float_trie_converts_only_listed_integers():
+    trie = compile_float_fields(("amount", "holding.quantity", "items[1].price", "flags"))
+    arguments = apply_float_trie({
+        "amount": 10,
+        "count": 3,
+        "holding": {"quantity": 4, "price": 2},
+        "items": [{"price": 1}, {"price": 2, "qty": 3}],
+        "flags": True,
+    }, trie)
+    assert arguments == {
+        "amount": 10.0,
+        "count": 3,
+        "holding": {"quantity": 4.0, "price": 2},
+        "items": [{"price": 1}, {"price": 2.0, "qty": 3}],
+        "flags": True,
+    }
+    assert type(arguments["amount"]) is float and type(arguments["items"][0]["price"]) is int
+    assert arguments["flags"] is True
+    assert compile_float_fields(("amount", "holding.quantity", "items[1].price", "flags")) is trie
+
+
+def test_converters_are_kept_with_the_manifest(tmp_path, monkeypatch):
+    monkeypatch.setattr(interface_manifest, "ENVS_PATH", str(tmp_path))
+    interface_folder = tmp_path / "things" / "tools" / "interface_1"
+    interface_folder.mkdir(parents=True)
+    tool_path = interface_folder / "get_thing.py"
+    tool_path.write_text(TOOL_SOURCE % "number")
+
+    converters = tool_converters("things", "1")
+    assert coerce_arguments({"thing_id": "4", "amount": "4"}, converters["get_thing"]) == {"thing_id": "4", "amount": 4}
+    assert tool_converters("things", "1") is converters
+    assert (interface_folder / interface_manifest.MANIFEST_FILE).read_text().find('"compiled"') == -1
+
+    # Editing the tool recompiles its converters
+    tool_path.write_text(TOOL_SOURCE % "string")
+    os.utime(tool_path, ns=(1, 1))
+    recompiled = tool_converters("things", "1")
+    assert recompiled is not converters
+    assert coerce_arguments({"amount": "4"}, recompiled["get_thing"]) == {"amount": "4"}
+
+
+def test_only_form_inputs_are_converted():
+    from modules.task_framework import prepare_action
+
+    converters = {"get_thing": compile_properties(SCHEMA)}
+    form_action = {"api_name": "get_thing", "parameters": {"amount": "10", "name": "7"}, "form_input": True,
+                   "argument_float_fields": ["amount"]}
+    api_action = {"api_name": "get_thing", "parameters": {"amount": "10", "name": "7"}}
+    assert prepare_action(form_action, converters) == {
+        "api_name": "get_thing_invoke", "arguments": {"amount": 10.0, "name": "7"}
+    }
+    assert prepare_action(api_action, converters) == {
+        "api_name": "get_thing_invoke", "arguments": {"amount": "10", "name": "7"}
+    }
@@ -0,0 +1,69 @@
+import pytest
+
+# benchmark_tools imports the Env and the Tool class as tau_bench.envs.*
+pytest.importorskip("tau_bench")
+
+from tau_bench.envs.benchmark_tools import _prepared_data, compare, percentile, schema_arguments  # noqa: E402
+
+
+def tool_info(properties, required):
+    return {"type": "function", "function": {"name": "tool", "parameters": {"type": "object", "properties": properties, "required": required}}}
+
+
+def test_schema_arguments():
+    info = tool_info(
+        {
+            "fund_id": {"type": "string"},
+            "status": {"type": "string", "enum": ["open", "closed"]},
+            "amount": {"type": "number"},
+            "count": {"type": ["integer", "null"]},
+            "tags": {"type": "array"},
+            "note": {"type": "null"},
+            "anything": {},
+            "optional": {"type": "string"},
+        },
+        ["fund_id", "status", "amount", "count", "tags", "note", "anything"],
+    )
+    samples = {"fund_id": "7", "status": "pending", "optional": "x"}
+    assert schema_arguments(info, samples) == {
+        "fund_id": "7", "status": "open", "amount": 1.0, "count": 1, "tags": [], "note": "1", "anything": "1",
+    }
+    assert schema_arguments({}, samples) == {}
+
+
+def test_percentile():
+    assert percentile([3.0], 0.99) == 3.0
+    values = [float(value) for value in range(100, 0, -1)]
+    assert percentile(values, 0.0) == 1.0
+    assert percentile(values, 0.5) == 51.0
+    assert percentile(values, 0.99) == 99.0
+    assert percentile(values, 1.0) == 100.0
+
+
+def report(**p50s):
+    return {"tools": [{"environment": "finance", "interface": 1, "tool": tool, "p50_ms": p50} for tool, p50 in p50s.items()]}
+
+
+def test_compare():
+    before = report(fast=1.0, slow=2.0, steady=1.0, zero=0.0, removed=1.0)
+    after = report(fast=1.2, slow=5.0, steady=2.0, zero=3.0, added=9.0)
+    regressions = compare(before, after)
+    assert [(regression["tool"], regression["ratio"]) for regression in regressions] == [("slow", 2.5), ("steady", 2.0)]
+    assert regressions[0]["p50_ms_before"] == 2.0 and regressions[0]["p50_ms_after"] == 5.0
+    assert [regression["tool"] for regression in compare(before, after, threshold=1.1)] == ["slow", "steady", "fast"]
+
+
+class Overlay(dict):
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.read = []
+
+    def get(self, key, default=None):
+        self.read.append(key)
+        return super().get(key, default)
+
+
+def test_prepared_data_copies_the_accessed_tables():
+    data = _prepared_data(lambda: Overlay({"trades": {}, "funds": {}}), {"trades"})
+    assert data.read == ["trades"]
+    assert _prepared_data(lambda: Overlay(), None).read == []
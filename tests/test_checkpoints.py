@@ -0,0 +1,103 @@
+import json
+import marshal
+
+import pytest
+
+from modules.checkpoints import checkpoint_blob
+from modules.env_snapshots import EnvironmentData, load_envs_module
+from modules.task_framework import restore_state
+
+data_snapshot = load_envs_module("data_snapshot")
+
+
+def write_tables(folder, tables):
+    for name, table in tables.items():
+        (folder / f"{name}.json").write_text(json.dumps(table))
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    write_tables(tmp_path, {
+        "funds": {str(i): {"fund_id": str(i), "name": f"Fund {i}", "size": 1000 * i, "status": "open"} for i in range(1, 21)},
+        "trades": {"1": {"trade_id": "1", "fund_id": "1", "quantity": 10}},
+        "settings": {"currency": "USD"},
+    })
+    return data_snapshot.open_snapshot(str(tmp_path))
+
+
+def create_fund(data):
+    data["funds"]["21"] = {"fund_id": "21", "name": "New", "size": 0, "status": "open"}
+
+
+def close_fund(data):
+    data["funds"]["3"]["status"] = "closed"
+
+
+def delete_trade(data):
+    del data["trades"]["1"]
+
+
+def read_funds(data):
+    return len(data["funds"])
+
+
+def drop_settings(data):
+    del data["settings"]
+
+
+def add_table(data):
+    data["audit"] = {"1": {"event": "created"}}
+
+
+def grow_fund(data):
+    data["funds"]["21"]["size"] += 500
+
+
+TOOL_CALLS = [create_fund, close_fund, read_funds, delete_trade, drop_settings, add_table, grow_fund]
+
+
+def journaled(data, tool_call):
+    data.start_journal()
+    tool_call(data)
+    return data.stop_journal()
+
+
+def contents(data):
+    return {name: data[name] for name in sorted(data)}
+
+
+@pytest.mark.parametrize("checkpoint_at", range(len(TOOL_CALLS) + 1))
+def test_checkpoint_and_journals_replay_the_sequential_run(snapshot, checkpoint_at):
+    sequential = EnvironmentData(snapshot)
+    for tool_call in TOOL_CALLS:
+        tool_call(sequential)
+
+    data = EnvironmentData(snapshot)
+    for tool_call in TOOL_CALLS[:checkpoint_at]:
+        journaled(data, tool_call)
+    checkpoint = checkpoint_blob(data)
+    steps = [("journal", journaled(data, tool_call)) for tool_call in TOOL_CALLS[checkpoint_at:]]
+
+    restored = restore_state(snapshot, None, checkpoint, steps)
+    assert contents(restored) == contents(sequential)
+
+
+def test_journals_alone_replay_the_sequential_run(snapshot):
+    sequential = EnvironmentData(snapshot)
+    data = EnvironmentData(snapshot)
+    steps = []
+    for tool_call in TOOL_CALLS:
+        tool_call(sequential)
+        steps.append(("journal", journaled(data, tool_call)))
+
+    assert contents(restore_state(snapshot, None, None, steps)) == contents(sequential)
+
+
+def test_checkpoint_holds_only_the_changed_records(snapshot):
+    data = EnvironmentData(snapshot)
+    close_fund(data)
+    read_funds(data)
+    data["trades"]
+
+    delta = marshal.loads(checkpoint_blob(data))
+    assert delta == {"funds": {"updated": {"3": {"fund_id": "3", "name": "Fund 3", "size": 3000, "status": "closed"}}}}
@@ -0,0 +1,90 @@
+import pytest
+
+from modules.env_snapshots import get_environment_data, load_envs_module
+from modules.task_framework import create_tools_class, load_interface, tools_class_code
+
+columnar_table = load_envs_module("columnar_table")
+data_snapshot = load_envs_module("data_snapshot")
+
+FINANCE_DATA = "envs/finance/data"
+
+
+def trade_adjustments(trades, fund_id):
+    """The NAV tools' loop over the trades"""
+    total = 0
+    for trade in trades.values():
+        if trade.get("fund_id") == fund_id and trade.get("status") == "executed":
+            value = float(trade.get("quantity", 0)) * float(trade.get("price", 0))
+            if trade.get("side") == "buy":
+                total += value
+            else:
+                total -= value
+    return total
+
+
+def columnar_adjustments(table, fund_id):
+    executed = table.where(fund_id=fund_id, status="executed")
+    return table.dot("quantity", "price", executed, negate=table.complement(table.where(side="buy")))
+
+
+@pytest.fixture(params=["numpy", "python"])
+def numpy_or_python(request, monkeypatch):
+    if request.param == "python":
+        monkeypatch.setattr(columnar_table, "np", None)
+    elif columnar_table.np is None:
+        pytest.skip("NumPy is not installed")
+    return request.param
+
+
+def test_aggregations_equal_the_dict_loops(numpy_or_python):
+    trades = data_snapshot.load_data(FINANCE_DATA)["trades"]
+    table = columnar_table.ColumnarTable(trades)
+    fund_ids = sorted({trade["fund_id"] for trade in trades.values()}) + ["missing"]
+    for fund_id in fund_ids:
+        assert columnar_adjustments(table, fund_id) == trade_adjustments(trades, fund_id)
+
+    quantities = {}
+    for trade in trades.values():
+        quantities[trade["fund_id"]] = quantities.get(trade["fund_id"], 0) + trade["quantity"]
+    assert table.sum_by("quantity", "fund_id") == quantities
+    assert table.sum("price") == sum(trade["price"] for trade in trades.values())
+
+
+def test_missing_and_non_numeric_values_raise(numpy_or_python):
+    table = columnar_table.ColumnarTable({
+        "1": {"fund_id": "1", "quantity": 2.0, "price": 3.0},
+        "2": {"fund_id": "1", "quantity": "4", "price": 1.0},
+        "3": {"fund_id": "2", "price": 5.0},
+    })
+    with pytest.raises(ValueError):
+        table.dot("quantity", "price")
+    with pytest.raises(ValueError):
+        table.sum("quantity", table.where(fund_id="2"))
+    assert table.sum("price") == 9.0
+
+
+def test_columns_only_for_tables_still_in_the_snapshot():
+    data = data_snapshot.load_data(FINANCE_DATA)
+    columns = columnar_table.columnar_table(data, "trades")
+    assert columns is not None and columns is columnar_table.columnar_table(data.overlay(), "trades")
+    assert dict(columns[next(iter(columns))]) == data.snapshot.table("trades")[next(iter(columns))]
+
+    data["trades"]["1"]["status"] = "executed"
+    assert columnar_table.columnar_table(data, "trades") is None
+    assert columnar_table.columnar_table({"trades": {}}, "trades") is None
+
+
+@pytest.mark.parametrize("interface, tool_name", [("1", "compute_nav"), ("3", "calculate_nav"), ("4", "evaluate_nav")])
+def test_nav_tools_give_the_loop_results(interface, tool_name):
+    functions_info, imports_set, invoke_methods = load_interface("finance", interface)
+    invoke = getattr(create_tools_class(tools_class_code(imports_set, invoke_methods)), tool_name + "_invoke")
+    fund_ids = sorted(get_environment_data("finance")["funds"], key=int) + ["missing"]
+    for fund_id in fund_ids:
+        columnar_data = get_environment_data("finance")
+        assert columnar_table.columnar_table(columnar_data, "trades") is not None
+        # Copying the trades out of the snapshot sends the tool down its loop
+        loop_data = get_environment_data("finance")
+        loop_data["trades"]
+        assert columnar_table.columnar_table(loop_data, "trades") is None
+        assert invoke(columnar_data, fund_id=fund_id, calculation_date="2025-10-01") == \
+            invoke(loop_data, fund_id=fund_id, calculation_date="2025-10-01")
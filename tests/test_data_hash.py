@@ -0,0 +1,25 @@
+from modules.env_snapshots import load_envs_module
+
+data_hash = load_envs_module("data_hash")
+value_hash = data_hash.value_hash
+
+
+def test_nested_keys_keep_their_type():
+    assert value_hash({"a": {1: "x"}}) != value_hash({"a": {"1": "x"}})
+    assert value_hash([{1: "x"}]) != value_hash([{"1": "x"}])
+    assert value_hash({"a": {True: "x"}}) != value_hash({"a": {1: "x"}})
+    assert value_hash({"a": {1: "x"}}) != value_hash({"a": {1.0: "x"}})
+    assert value_hash({"a": {"r:1": "x"}}) != value_hash({"a": {1: "x"}})
+    assert value_hash({1: "x", "1": "y"}) != value_hash({1: "y", "1": "x"})
+
+
+def test_equal_values_hash_equal_whatever_the_key_order():
+    assert value_hash({"a": 1, "b": {2: [1, 2], 1: None}}) == value_hash({"b": {1: None, 2: [1, 2]}, "a": 1})
+    assert value_hash({"a": {"x": 1, "y": 2}}) == value_hash({"a": {"y": 2, "x": 1}})
+
+
+def test_tables_with_int_and_str_record_ids_differ():
+    assert data_hash.data_hash({"users": {1: {"name": "a"}}}) != data_hash.data_hash({"users": {"1": {"name": "a"}}})
+    tree = data_hash.data_tree({"users": {"1": {"tags": {1: "x"}}}})
+    changed = data_hash.data_tree({"users": {"1": {"tags": {"1": "x"}}}})
+    assert data_hash.diff_trees(tree, changed) == {"users": {"changed": ["1"]}}
@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from modules.env_snapshots import load_envs_module
+
+data_snapshot = load_envs_module("data_snapshot")
+data_hash = load_envs_module("data_hash")
+
+
+@pytest.fixture(params=[False, True], ids=["plain", "indexed"])
+def load(request, tmp_path):
+    tables = {
+        "orders": {str(i): {"order_id": str(i), "user_id": str(i % 4), "items": [i]} for i in range(1, 30)},
+        "users": {str(i): {"user_id": str(i), "name": f"user {i}"} for i in range(4)},
+    }
+    for name, table in tables.items():
+        (tmp_path / f"{name}.json").write_text(json.dumps(table))
+    return lambda: data_snapshot.load_data(str(tmp_path), indexed=request.param)
+
+
+def episode(data):
+    data["orders"]["3"]["items"].append(99)
+    data["orders"]["30"] = {"order_id": "30", "user_id": "1", "items": []}
+    data["orders"]["30"]["items"].append(1)
+    del data["orders"]["4"]
+    data["users"]["0"]["name"] = "renamed"
+
+
+def contents(data):
+    return {name: {key: dict(record) for key, record in data[name].items()} for name in sorted(data)}
+
+
+def test_overlays_are_pristine_whatever_was_done_to_other_ones(load):
+    pristine = load()
+    expected = contents(load())
+    first = pristine.overlay()
+    episode(first)
+    episode(pristine)
+    assert contents(first.overlay()) == expected
+    assert contents(pristine.overlay()) == expected
+    assert first["orders"]["3"]["items"][-1] == 99
+
+
+def test_replay_on_an_overlay_equals_a_run_on_freshly_loaded_data(load):
+    used = load()
+    episode(used)
+    replay = used.overlay()
+    episode(replay)
+    fresh = load()
+    episode(fresh)
+    assert contents(replay) == contents(fresh) == contents(used)
+    assert data_hash.data_hash(replay) == data_hash.data_hash(fresh)
+    assert data_hash.data_hash(replay) != data_hash.data_hash(load())
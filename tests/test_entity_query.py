@@ -0,0 +1,56 @@
+import random
+
+from modules.env_snapshots import load_envs_module
+
+indexed_table = load_envs_module("indexed_table")
+entity_query = load_envs_module("entity_query")
+query_entities = entity_query.query_entities
+
+
+def filter_loop(table, filters, id_field):
+    """The discover_* tools' loop that query_entities replaced"""
+    results = []
+    for entity_id, entity_data in table.items():
+        if all(entity_data.get(key) == value for key, value in filters.items()):
+            results.append({**entity_data, id_field: str(entity_id)})
+    return results
+
+
+def test_queries_match_the_filter_loop_after_updates_and_deletes():
+    rng = random.Random(11)
+    records = {
+        str(i): {"project_id": str(rng.randrange(5)), "owner_id": str(rng.randrange(3)), "status": rng.choice(["open", "closed"])}
+        for i in range(1, 200)
+    }
+    table = indexed_table.index_table(records)
+    plain = {key: dict(record) for key, record in records.items()}
+    all_filters = [
+        {"project_id": "1"},
+        {"project_id": "2", "owner_id": "0"},
+        {"status": "open", "owner_id": "1"},
+        {"owner_id": "9"},
+        {},
+    ]
+    for step in range(500):
+        key = str(rng.randrange(1, 260))
+        operation = rng.randrange(3)
+        if operation == 0:
+            record = {"project_id": str(rng.randrange(5)), "owner_id": str(rng.randrange(3)), "status": "open"}
+            table[key] = record
+            plain[key] = dict(record)
+        elif operation == 1 and key in table:
+            column = rng.choice(["project_id", "owner_id", "status"])
+            value = str(rng.randrange(5)) if column != "status" else "closed"
+            table[key][column] = value
+            plain[key][column] = value
+        elif operation == 2 and key in table:
+            del table[key]
+            del plain[key]
+        if step % 25 == 0:
+            for filters in all_filters:
+                assert query_entities(table, filters, "task_id", str) == filter_loop(plain, filters, "task_id"), filters
+
+
+def test_fields_and_limit():
+    table = indexed_table.index_table({"1": {"user_id": "7", "name": "a"}, "2": {"user_id": "7", "name": "b"}})
+    assert query_entities(table, {"user_id": "7"}, "id", fields=["name"], limit=1) == [{"name": "a", "id": "1"}]
@@ -0,0 +1,93 @@
+import importlib
+import itertools
+
+import pytest
+
+# The Env and the environments import each other as tau_bench.envs.*
+pytest.importorskip("tau_bench")
+
+from tau_bench.envs.data_hash import data_tree  # noqa: E402
+from tau_bench.envs.evaluate import load_env  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def env():
+    return load_env("finance", 1)
+
+
+def run_episode(env, task_index, actions=None):
+    env.reset(task_index)
+    terminate_tools, env.terminate_tools = env.terminate_tools, []
+    for action in env.task.actions if actions is None else actions:
+        env.step(action)
+    env.terminate_tools = terminate_tools
+
+
+def outcome(env, task_index, actions=None):
+    """Reward of an episode and the Env's state after calculate_reward()"""
+    run_episode(env, task_index, actions)
+    reward = env.calculate_reward()
+    return (
+        reward.reward,
+        vars(reward.info),
+        env.get_data_hash(),
+        [(action.name, action.kwargs) for action in env.actions],
+    )
+
+
+def test_reset_gives_every_episode_its_own_pristine_data(env):
+    env.reset(0)
+    pristine_hash = env.get_data_hash()
+    run_episode(env, 0)
+    first_data = env.data
+    first_hash = data_tree(first_data).hash
+    assert first_hash != pristine_hash
+
+    env.reset(0)
+    assert env.data is not first_data
+    assert env.get_data_hash() == pristine_hash
+    run_episode(env, 0, env.task.actions[:2])
+    assert data_tree(first_data).hash == first_hash
+    env.reset(1)
+    assert env.get_data_hash() == pristine_hash
+
+
+@pytest.mark.parametrize("actions", [None, slice(0, 2)], ids=["full", "partial"])
+def test_reward_and_state_do_not_depend_on_the_cache(env, tmp_path, monkeypatch, actions):
+    env.reset(0)
+    episode_actions = None if actions is None else env.task.actions[actions]
+
+    monkeypatch.setenv("GROUND_TRUTH_CACHE", "")
+    uncached = outcome(env, 0, episode_actions)
+    monkeypatch.setenv("GROUND_TRUTH_CACHE", str(tmp_path / "hashes.json"))
+    cold = outcome(env, 0, episode_actions)
+
+    def no_replay():
+        raise AssertionError("the ground truth should come from the cache")
+    monkeypatch.setattr(env, "replay_ground_truth", no_replay)
+    warm = outcome(env, 0, episode_actions)
+
+    assert uncached == cold == warm
+    assert uncached[0] == (1.0 if actions is None else 0.0)
+
+
+def test_ground_truths_that_do_not_reproduce_are_not_cached(env, tmp_path, monkeypatch):
+    monkeypatch.setenv("GROUND_TRUTH_CACHE", str(tmp_path / "hashes.json"))
+    env.reset(0)
+    name = next(action.name for action in env.task.actions if action.name in env.tools_map)
+    tool = env.tools_map[name]
+    replays = itertools.count()
+
+    class DriftingTool(tool):
+        """Writes a different record on every call, through nothing the source scan recognizes"""
+        @staticmethod
+        def invoke(data, **kwargs):
+            data["funds"][f"drift-{next(replays)}"] = {}
+            return tool.invoke(data=data, **kwargs)
+
+    monkeypatch.setitem(env.tools_map, name, DriftingTool)
+    # Imported here: the scan also reads the envs modules the test module imports from
+    ground_truth_cache = importlib.import_module("tau_bench.envs.ground_truth_cache")
+    assert name not in ground_truth_cache.tools_digest(env.tools_map.values())[1]
+    env.calculate_reward()
+    assert ground_truth_cache.get_cache().get(env.ground_truth_key()) is None
@@ -0,0 +1,61 @@
+import pytest
+
+# evaluate imports the Env and the environments as tau_bench.envs.*
+pytest.importorskip("tau_bench")
+
+from tau_bench.envs.evaluate import action_error, evaluate_task, load_env, parse_task_indexes, summarize  # noqa: E402
+
+
+def action(name, seconds, error=None):
+    return {"name": name, "seconds": seconds, "error": error}
+
+
+def test_summarize():
+    results = [
+        {"task_index": 0, "reward": 1.0, "actions": [action("compute_nav", 0.5), action("respond", 0.0)]},
+        {"task_index": 1, "reward": 0.0, "actions": [action("compute_nav", 1.5, "Error: fund not found")]},
+        {"task_index": 2, "error": "Traceback ...", "actions": [action("list_funds", 2.5)]},
+    ]
+    summary = summarize(results)
+    assert summary == {
+        "tasks": 3,
+        "mean_reward": 0.5,
+        "passed": 1,
+        "failed": [1],
+        "crashed": [2],
+        "action_errors": 1,
+        "tools": {
+            "list_funds": {"calls": 1, "errors": 0, "total_seconds": 2.5, "max_seconds": 2.5},
+            "compute_nav": {"calls": 2, "errors": 1, "total_seconds": 2.0, "max_seconds": 1.5},
+            "respond": {"calls": 1, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0},
+        },
+    }
+    assert list(summary["tools"]) == ["list_funds", "compute_nav", "respond"]
+    assert summarize([])["mean_reward"] is None
+
+
+def test_action_error():
+    assert action_error("Error: boom") == "Error: boom"
+    assert action_error("Unknown action nope") == "Unknown action nope"
+    assert action_error('{"error": "fund not found"}') == "fund not found"
+    assert action_error('{"success": false}') == "success: false"
+    assert action_error('{"success": true, "nav_value": 1.5}') is None
+    assert action_error("plain text") is None
+    assert action_error(None) is None
+
+
+def test_parse_task_indexes():
+    assert parse_task_indexes("0-3,7,9-10") == [0, 1, 2, 3, 7, 9, 10]
+
+
+def test_evaluate_task():
+    env = load_env("finance", 1)
+    result = evaluate_task(env, 0)
+    assert "error" not in result, result.get("error")
+    assert result["reward"] == 1
+    assert result["data_hash"] == result["gt_data_hash"] and "differences" not in result
+    assert [entry["name"] for entry in result["actions"]] == [task_action.name for task_action in env.tasks[0].actions]
+    # The recorded trajectory passes a trade_type the execute_trade tool does not take; the ground truth does too
+    assert [entry["name"] for entry in result["actions"] if entry["error"]] == ["execute_trade"]
+    assert env.terminate_tools == load_env("finance", 1).terminate_tools
+    assert summarize([result])["passed"] == 1
@@ -0,0 +1,44 @@
+from conftest import choose_interface
+
+
+def execute(client, api_name, **parameters):
+    return client.post("/execute_api", json={"environment": "hr_experts", "api_name": api_name, "parameters": parameters})
+
+
+def recorded_actions(client):
+    with client.session_transaction() as session:
+        return [action["api_name"] for action in session.get("actions", [])]
+
+
+def test_execute_api_records_the_successful_calls(client):
+    choose_interface(client, "hr_experts", "2")
+    response = execute(client, "handle_department", action="create", department_name="Api A", manager_id="1")
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["output"]["department_id"] == "101"
+    assert body["session_index"] == 0
+    assert body["changes"]
+    response = execute(client, "handle_department", action="create", department_name="Api B", manager_id="1", floor=3)
+    assert response.status_code == 500
+    assert "unexpected keyword argument 'floor'" in response.get_json()["message"]
+    assert recorded_actions(client) == ["handle_department_invoke"]
+
+
+def test_unknown_api_is_an_error_and_not_recorded(client):
+    choose_interface(client, "hr_experts", "2")
+    assert execute(client, "handle_department", action="create", department_name="Api A", manager_id="1").status_code == 200
+    response = execute(client, "no_such_tool", department_name="Api B")
+    assert response.status_code == 500
+    assert response.get_json() == {"status": "error", "message": "API no_such_tool not found"}
+    assert recorded_actions(client) == ["handle_department_invoke"]
+    # The history still runs: the next call sees the first department only
+    response = execute(client, "handle_department", action="create", department_name="Api C", manager_id="1")
+    assert response.get_json()["output"]["department_id"] == "102"
+    assert response.get_json()["session_index"] == 1
+
+
+def test_api_name_is_required(client):
+    choose_interface(client, "hr_experts", "2")
+    response = client.post("/execute_api", json={"environment": "hr_experts", "parameters": {}})
+    assert response.status_code == 400
+    assert client.get("/execute_api").status_code == 405
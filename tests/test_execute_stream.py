@@ -0,0 +1,90 @@
+import json
+from uuid import uuid4
+
+from flask.sessions import SessionInterface, SessionMixin
+
+from conftest import choose_interface
+
+
+def create_department(name, **parameters):
+    return {"api_name": "handle_department",
+            "parameters": {"action": "create", "department_name": name, "manager_id": "1", **parameters}}
+
+
+ACTIONS = [
+    create_department("Stream A"),
+    # Unexpected argument: the call raises, nothing is recorded
+    create_department("Stream B", floor=3),
+    create_department("Stream C"),
+]
+
+
+def stream_lines(client, actions):
+    response = client.post("/execute_stream", json={"environment": "hr_experts", "actions": actions})
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def check_lines(lines):
+    assert [line.get("index") for line in lines] == [0, 1, 2, None]
+    assert [line.get("status") for line in lines[:3]] == ["success", "error", "success"]
+    assert lines[0]["output"]["department_id"] == "101"
+    assert "unexpected keyword argument 'floor'" in lines[1]["message"]
+    assert "session_index" not in lines[1]
+    assert lines[2]["output"]["department_id"] == "102"
+    assert [lines[0]["session_index"], lines[2]["session_index"]] == [0, 1]
+    assert lines[3]["done"] is True
+
+
+def recorded_departments(client):
+    with client.session_transaction() as session:
+        return [action["arguments"]["department_name"] for action in session["actions"]]
+
+
+def test_cookie_sessions_get_every_line_and_record_the_actions(client):
+    choose_interface(client, "hr_experts", "2")
+    check_lines(stream_lines(client, ACTIONS))
+    assert recorded_departments(client) == ["Stream A", "Stream C"]
+
+
+def test_failures_before_the_first_action_give_one_error_line(client):
+    # No interface chosen: there is no Tools class to run the actions with
+    lines = stream_lines(client, ACTIONS)
+    assert len(lines) == 2
+    assert lines[0] == {"status": "error", "message": "Failed to execute API: Click on GO to reload the session"}
+    assert lines[1]["done"] is True
+
+
+class ServerSession(dict, SessionMixin):
+    def __init__(self, sid, values):
+        super().__init__(values)
+        self.sid = sid
+
+
+class MemorySessionInterface(SessionInterface):
+    """ Server-side sessions kept in memory, saved whenever save_session is called """
+
+    def __init__(self):
+        self.sessions = {}
+
+    def open_session(self, app, request):
+        sid = request.cookies.get("sid") or uuid4().hex
+        return ServerSession(sid, self.sessions.get(sid, {}))
+
+    def save_session(self, app, session, response):
+        self.sessions[session.sid] = json.loads(json.dumps(dict(session)))
+        response.set_cookie("sid", session.sid)
+
+
+def test_server_side_sessions_stream_and_record_the_actions(app, client):
+    app.session_interface = MemorySessionInterface()
+    choose_interface(client, "hr_experts", "2")
+    response = client.post("/execute_stream", json={"environment": "hr_experts", "actions": ACTIONS}, buffered=False)
+    chunks = list(response.response)
+    # One chunk per line, sent as each action finishes
+    assert len(chunks) == 4
+    check_lines([json.loads(chunk) for chunk in chunks])
+    response.close()
+    (stored,) = app.session_interface.sessions.values()
+    assert [action["arguments"]["department_name"] for action in stored["actions"]] == ["Stream A", "Stream C"]
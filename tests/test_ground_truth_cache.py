@@ -0,0 +1,101 @@
+import importlib.util
+import os
+import shutil
+import sys
+
+import pytest
+
+from modules.env_snapshots import load_envs_module
+
+ground_truth_cache = load_envs_module("ground_truth_cache")
+
+
+class CreateOrder:
+    @staticmethod
+    def get_info():
+        return {"function": {"name": "create_order"}}
+
+
+def key(tools):
+    digest, _ = ground_truth_cache.tools_digest(tools)
+    return ground_truth_cache.cache_key("data", digest, 0, "actions", 2)
+
+
+def test_editing_a_shared_helper_invalidates_the_cached_hashes(tmp_path, monkeypatch):
+    for name in os.listdir(ground_truth_cache.PACKAGE_PATH):
+        if name.endswith(".py"):
+            shutil.copy(os.path.join(ground_truth_cache.PACKAGE_PATH, name), tmp_path / name)
+    monkeypatch.setattr(ground_truth_cache, "PACKAGE_PATH", str(tmp_path))
+    cache = ground_truth_cache.GroundTruthCache(str(tmp_path / "hashes.json"))
+    cache.put(key([CreateOrder]), "ground-truth-hash")
+    assert cache.get(key([CreateOrder])) == "ground-truth-hash"
+
+    helper = tmp_path / "id_allocator.py"
+    helper.write_text(helper.read_text() + "\n# IDs now start at 1000\n")
+    assert cache.get(key([CreateOrder])) is None
+
+    edited_key = key([CreateOrder])
+    (tmp_path / "new_helper.py").write_text("")
+    assert key([CreateOrder]) != edited_key
+
+
+TOOL_SOURCE = """
+from tool_helpers import record_id
+
+
+class CreateOrder:
+    @staticmethod
+    def invoke(data, order_id):
+        data.setdefault("orders", {})[record_id(order_id)] = {}
+
+    @staticmethod
+    def get_info():
+        return {"function": {"name": "create_order"}}
+"""
+
+
+def import_file(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def edit(path, text):
+    path.write_text(text)
+    # Same size within the same mtime tick would look unchanged
+    os.utime(path, ns=(path.stat().st_mtime_ns + 1, path.stat().st_mtime_ns + 1))
+
+
+@pytest.fixture
+def tool_package(tmp_path, monkeypatch):
+    """A create_order tool of an environment, importing from a helper module of that environment"""
+    monkeypatch.setattr(ground_truth_cache, "PACKAGE_PATH", str(tmp_path))
+    monkeypatch.setattr(sys, "modules", dict(sys.modules))
+    folder = tmp_path / "shop"
+    folder.mkdir()
+    (folder / "tool_helpers.py").write_text("def record_id(order_id):\n    return str(order_id)\n")
+    import_file("tool_helpers", folder / "tool_helpers.py")
+    (folder / "create_order.py").write_text(TOOL_SOURCE)
+    return folder, import_file("create_order", folder / "create_order.py").CreateOrder
+
+
+def test_editing_a_tool_or_a_helper_it_imports_changes_the_key(tool_package):
+    folder, tool = tool_package
+    original_key = key([tool])
+    assert key([tool]) == original_key
+    assert ground_truth_cache.tools_digest([tool])[1] == frozenset()
+
+    edit(folder / "create_order.py", TOOL_SOURCE + "\n# Orders now get their ID from the helper\n")
+    tool_edited_key = key([tool])
+    assert tool_edited_key != original_key
+
+    edit(folder / "tool_helpers.py", "def record_id(order_id):\n    return 'order-' + str(order_id)\n")
+    assert key([tool]) not in (original_key, tool_edited_key)
+
+
+def test_tools_reading_the_clock_through_a_helper_are_volatile(tool_package):
+    folder, tool = tool_package
+    edit(folder / "tool_helpers.py", "import time\n\ndef record_id(order_id):\n    return str(time.time())\n")
+    assert ground_truth_cache.tools_digest([tool])[1] == frozenset({"create_order"})
@@ -0,0 +1,95 @@
+import json
+import random
+
+from modules.env_snapshots import get_environment_data, load_envs_module
+from modules.task_framework import create_tools_class, load_interface, tools_class_code
+
+id_allocator = load_envs_module("id_allocator")
+next_id = id_allocator.next_id
+
+
+def max_scan(table):
+    """The tools' original generate_id()"""
+    if not table:
+        return 1
+    return max(int(k) for k in table.keys()) + 1
+
+
+def test_ids_follow_the_largest_key():
+    table = {"1": {}, "7": {}, "3": {}}
+    assert next_id(table) == 8
+    table["8"] = {}
+    table["12"] = {}
+    assert next_id(table) == 13
+    assert next_id({}) == 1
+
+
+def test_an_id_handed_out_without_insert_is_handed_out_again():
+    table = {str(i): {} for i in range(1, 11)}
+    # A tool that fails after generating its ID inserts nothing
+    assert next_id(table) == max_scan(table) == 11
+    assert next_id(table) == max_scan(table) == 11
+    table["11"] = {}
+    assert next_id(table) == max_scan(table) == 12
+
+
+def test_deleting_the_largest_key_lowers_the_next_id():
+    table = {str(i): {} for i in range(1, 11)}
+    assert next_id(table) == 11
+    table["11"] = {}
+    del table["11"]
+    assert next_id(table) == max_scan(table) == 11
+    del table["10"]
+    assert next_id(table) == max_scan(table) == 10
+    table["10"] = {}
+    assert next_id(table) == max_scan(table) == 11
+    table.clear()
+    assert next_id(table) == max_scan(table) == 1
+
+
+def test_random_operations_match_the_max_scan():
+    rng = random.Random(3)
+    table = {str(i): {} for i in range(1, 50)}
+    for _ in range(3000):
+        operation = rng.random()
+        if table and operation < 0.3:
+            del table[rng.choice(list(table))]
+        elif operation < 0.5:
+            # Handed out, never inserted
+            assert next_id(table) == max_scan(table)
+        else:
+            new_id = next_id(table)
+            assert new_id == max_scan(table)
+            table[str(new_id)] = {}
+
+
+def test_forgotten_tables_still_get_the_scan_id():
+    allocator = id_allocator.IdAllocator(capacity=2)
+    tables = [{"1": {}} for _ in range(5)]
+    for table in tables:
+        table["2"] = {}
+        assert allocator.next_id(table) == 3
+        del table["2"]
+    for _ in range(10):
+        allocator.next_id({"5": {}})
+    assert [allocator.next_id(table) for table in tables] == [2] * 5
+
+
+def test_failed_tool_call_does_not_shift_the_next_id():
+    functions_info, imports_set, invoke_methods = load_interface("hr_experts", "2")
+    tools = create_tools_class(tools_class_code(imports_set, invoke_methods))
+    data = get_environment_data("hr_experts")
+    departments = data["departments"]
+    manager_id = next(iter(data["users"]))
+    expected_id = str(max_scan(departments))
+
+    failed = json.loads(tools.handle_department_invoke(
+        data, action="create", department_name="Rejected", manager_id=manager_id, budget=-5
+    ))
+    assert "error" in failed and expected_id not in departments
+    created = json.loads(tools.handle_department_invoke(
+        data, action="create", department_name="Created", manager_id=manager_id, budget=5
+    ))
+    assert expected_id in departments
+    assert departments[expected_id]["department_name"] == "Created"
+    assert expected_id in json.dumps(created)
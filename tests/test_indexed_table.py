@@ -0,0 +1,87 @@
+import random
+
+from modules.env_snapshots import load_envs_module
+
+indexed_table = load_envs_module("indexed_table")
+IndexedTable = indexed_table.IndexedTable
+
+
+def scan(table, column, value):
+    return [(key, record) for key, record in table.items() if isinstance(record, dict) and record.get(column) == value]
+
+
+def assert_consistent(table, columns, values):
+    for column in columns:
+        for value in values:
+            assert table.find(column, value) == scan(table, column, value), (column, value)
+
+
+def make_table():
+    return IndexedTable(
+        {str(i): {"order_id": str(i), "user_id": str(i % 3), "status": "open"} for i in range(1, 10)},
+        ["order_id", "user_id"],
+    )
+
+
+def test_assigned_record_stays_the_callers_object():
+    table = make_table()
+    record = {"order_id": "10", "user_id": "1", "status": "open"}
+    table["10"] = record
+    record["status"] = "shipped"
+    record["user_id"] = "2"
+
+    assert table["10"] is record
+    assert table["10"]["status"] == "shipped"
+    assert ("10", record) in table.find("user_id", "2")
+    assert ("10", record) not in table.find("user_id", "1")
+    assert table.find("status", "shipped") == [("10", record)]
+
+
+def test_indexes_follow_updates_through_the_records():
+    table = make_table()
+    table["1"]["user_id"] = "2"
+    table["2"].update(user_id="0", status="closed")
+    del table["3"]["user_id"]
+    table["4"].pop("user_id")
+    table["5"] = dict(table["5"], user_id="9")
+    assert_consistent(table, ["order_id", "user_id", "status"], ["0", "1", "2", "9", None, "open", "closed"])
+
+
+def test_indexes_forget_deleted_records():
+    table = make_table()
+    removed = table.pop("1")
+    del table["4"]
+    table.popitem()
+    removed["user_id"] = "0"
+    assert all(key not in ("1", "4", "9") for key, _ in table.find("user_id", "1") + table.find("user_id", "0"))
+    assert_consistent(table, ["order_id", "user_id"], ["0", "1", "2"])
+
+    # A removed record assigned again reports its changes to the table again
+    table["1"] = removed
+    removed["user_id"] = "2"
+    assert ("1", removed) in table.find("user_id", "2")
+    assert_consistent(table, ["order_id", "user_id"], ["0", "1", "2"])
+
+
+def test_random_operations_match_a_scan():
+    rng = random.Random(7)
+    table = make_table()
+    kept = {}
+    for step in range(2000):
+        key = str(rng.randrange(1, 30))
+        operation = rng.randrange(5)
+        if operation == 0:
+            record = {"order_id": key, "user_id": str(rng.randrange(4))}
+            table[key] = record
+            kept[key] = record
+        elif operation == 1 and key in table:
+            table[key]["user_id"] = str(rng.randrange(4))
+        elif operation == 2 and key in kept:
+            kept[key]["user_id"] = str(rng.randrange(4))
+        elif operation == 3 and key in table:
+            del table[key]
+        elif operation == 4 and key in table:
+            table[key].pop("user_id", None)
+        if step % 50 == 0:
+            assert_consistent(table, ["user_id", "order_id"], [str(value) for value in range(30)] + [None])
+    assert_consistent(table, ["user_id", "order_id"], [str(value) for value in range(30)] + [None])
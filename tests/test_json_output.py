@@ -0,0 +1,48 @@
+import json
+from datetime import date
+
+import pytest
+from flask import Flask
+
+from modules import task_framework
+from modules.json_output import RawJSON, dumps
+
+
+@pytest.fixture
+def counted_loads(monkeypatch):
+    calls = []
+
+    def loads(text):
+        calls.append(text)
+        return json.loads(text)
+    monkeypatch.setattr(task_framework, "json_loads", loads)
+    return calls
+
+
+def test_float_free_outputs_are_not_parsed(counted_loads):
+    for text in ['{"id": "12", "items": [1, 2, {"ok": true}]}', '[]', '"done"', '42', 'null']:
+        output, float_fields = task_framework.parse_output(text)
+        assert isinstance(output, RawJSON) and output.text == text
+        assert float_fields == []
+    assert counted_loads == []
+
+
+def test_outputs_with_floats_are_parsed_once(counted_loads):
+    output, float_fields = task_framework.parse_output('{"amount": 10.0, "lines": [{"price": 2.5}]}')
+    assert isinstance(output, RawJSON)
+    assert sorted(float_fields) == ["amount", "price"]
+    assert len(counted_loads) == 1
+
+
+def test_plain_text_outputs_still_fail(counted_loads):
+    with pytest.raises(ValueError):
+        task_framework.parse_output("Department not found")
+    assert counted_loads == ["Department not found"]
+
+
+def test_dumps_splices_raw_json_and_encodes_other_values():
+    app = Flask(__name__)
+    with app.app_context():
+        text = dumps({"output": RawJSON('{"b": 1, "a": [true]}'), "day": date(2025, 1, 2)})
+    assert json.loads(text) == {"output": {"b": 1, "a": [True]}, "day": "Thu, 02 Jan 2025 00:00:00 GMT"}
+    assert '{"b": 1, "a": [true]}' in text
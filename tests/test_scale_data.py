@@ -0,0 +1,67 @@
+from modules.env_snapshots import load_envs_module
+
+scale_data = load_envs_module("scale_data")
+
+
+def fixture_tables():
+    return {
+        "users": {
+            "1": {"user_id": "1", "email": "ana@example.com", "name": "Ana", "joined": "2024-01-02"},
+            "2": {"user_id": "2", "email": "bo@example.com", "name": "Bo", "joined": "2024-01-02"},
+            "3": {"user_id": "3", "email": "cy@example.com", "name": "Cy", "joined": "2024-03-04"},
+        },
+        "projects": {
+            "10": {"project_id": "10", "code": "PRJ-A", "owner_id": "1", "created_by": "2"},
+            "11": {"project_id": "11", "code": "PRJ-B", "owner_id": "3", "created_by": "2"},
+        },
+        "comments": {
+            "1": {"comment_id": "1", "target_type": "projects", "target_id": "10", "author_id": "2", "status": "open"},
+            "2": {"comment_id": "2", "target_type": "users", "target_id": "3", "author_id": "1", "status": "open"},
+            "3": {"comment_id": "3", "target_type": "projects", "target_id": "11", "author_id": None, "status": "closed"},
+        },
+        "settings": ["not", "records"],
+    }
+
+
+def test_schema_inference():
+    schema = scale_data.Schema(fixture_tables())
+    assert schema.primary_keys == {"users": "user_id", "projects": "project_id", "comments": "comment_id"}
+    assert schema.foreign_keys == {
+        "projects": {"owner_id": "users", "created_by": "users"},
+        "comments": {"author_id": "users"},
+    }
+    assert schema.polymorphic_keys == {"comments": {"target_id": "target_type"}}
+    assert schema.unique_columns == {"users": ["email", "name"], "projects": ["code"]}
+
+
+def test_scaled_references_resolve():
+    tables = fixture_tables()
+    scaled = scale_data.scale_tables(tables, 3)
+    assert scale_data.check_references(scaled) == []
+    assert scaled["settings"] is tables["settings"]
+    assert {name: len(table) for name, table in scaled.items() if isinstance(table, dict)} == {
+        "users": 9, "projects": 6, "comments": 9,
+    }
+    # Copy 0 is the original data, the replicas point to the replicated records
+    for name in ("users", "projects", "comments"):
+        for key, record in tables[name].items():
+            assert scaled[name][key] == record
+    assert scaled["projects"]["21"] == {"project_id": "21", "code": "PRJ-A-1", "owner_id": "4", "created_by": "5"}
+    assert scaled["comments"]["5"]["target_id"] == "6"
+    assert scaled["comments"]["4"]["target_id"] == "21"
+    assert scaled["comments"]["9"]["author_id"] is None
+    emails = [user["email"] for user in scaled["users"].values()]
+    assert len(set(emails)) == len(emails) and scaled["users"]["7"]["email"] == "ana+2@example.com"
+    assert {user["joined"] for user in scaled["users"].values()} == {"2024-01-02", "2024-03-04"}
+
+
+def test_check_references_reports_broken_keys():
+    schema = scale_data.Schema(fixture_tables())
+    tables = scale_data.scale_tables(fixture_tables(), 2)
+    assert scale_data.check_references(tables, schema) == []
+    tables["users"].pop("6")
+    tables["projects"]["21"]["created_by"] = "99"
+    expected = [("comments", "target_id", "6"), ("projects", "created_by", "99"), ("projects", "owner_id", "6")]
+    assert sorted(scale_data.check_references(tables, schema)) == expected
+    # Inferred from the broken tables, owner_id and created_by no longer look like references
+    assert scale_data.check_references(tables) == [("comments", "target_id", "6")]
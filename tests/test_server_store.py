@@ -0,0 +1,15 @@
+from unittest import mock
+
+from modules import server_store
+
+
+def test_local_entries_expire_after_their_ttl():
+    with mock.patch.object(server_store.time, "monotonic", return_value=1000.0):
+        server_store.store_set("ttl-test:short", b"short", ttl=10)
+        server_store.store_set("ttl-test:forever", b"forever")
+    with mock.patch.object(server_store.time, "monotonic", return_value=1009.0):
+        assert server_store.store_get("ttl-test:short") == b"short"
+    with mock.patch.object(server_store.time, "monotonic", return_value=1010.0):
+        assert server_store.store_get("ttl-test:short") is None
+        assert server_store.store_get("ttl-test:forever") == b"forever"
+    assert "ttl-test:short" not in server_store._local_store
@@ -0,0 +1,93 @@
+import os
+import time
+
+import pytest
+
+from modules import tool_workers
+
+
+def count_to(n):
+    for i in range(n):
+        yield i
+
+
+def sleep_after_first(seconds):
+    yield "started"
+    time.sleep(seconds)
+    yield "finished"
+
+
+def allocate(megabytes):
+    yield len(bytearray(megabytes * 1024 * 1024))
+
+
+def crash():
+    yield "started"
+    os._exit(1)
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    monkeypatch.setattr(tool_workers, "WORKER_POOL_SIZE", 1)
+    monkeypatch.setattr(tool_workers, "TIMEOUT_SECONDS", 5.0)
+    monkeypatch.setattr(tool_workers, "QUEUE_TIMEOUT_SECONDS", 0.5)
+    yield tool_workers
+    while not tool_workers._idle_workers.empty():
+        tool_workers._discard_worker(tool_workers._idle_workers.get_nowait())
+    assert tool_workers._started_workers == 0
+
+
+def idle_worker(pool):
+    worker = pool._idle_workers.get_nowait()
+    pool._idle_workers.put(worker)
+    return worker
+
+
+def test_workers_are_reused(pool):
+    assert list(pool.run_in_worker(count_to, 3)) == [0, 1, 2]
+    worker = idle_worker(pool)
+    assert list(pool.run_in_worker(count_to, 2)) == [0, 1]
+    assert idle_worker(pool) is worker
+
+
+def test_a_call_over_the_timeout_is_killed_and_replaced(pool, monkeypatch):
+    monkeypatch.setattr(pool, "TIMEOUT_SECONDS", 0.5)
+    items = pool.run_in_worker(sleep_after_first, 30)
+    assert next(items) == "started"
+    with pytest.raises(TimeoutError):
+        next(items)
+    assert pool._started_workers == 0
+    assert list(pool.run_in_worker(count_to, 1)) == [0]
+
+
+def test_waiting_for_a_busy_pool_times_out(pool):
+    busy = pool.run_in_worker(sleep_after_first, 2)
+    assert next(busy) == "started"
+    start = time.monotonic()
+    with pytest.raises(TimeoutError, match="busy"):
+        next(pool.run_in_worker(count_to, 1))
+    assert time.monotonic() - start < 2
+    assert list(busy) == ["finished"]
+
+
+@pytest.mark.skipif(tool_workers.resource is None, reason="RLIMIT_AS needs the resource module")
+def test_memory_limit_fails_the_call_not_the_server(pool, monkeypatch):
+    monkeypatch.setattr(pool, "MEMORY_LIMIT_MB", 512)
+    with pytest.raises(RuntimeError):
+        list(pool.run_in_worker(allocate, 1024))
+    assert list(pool.run_in_worker(allocate, 16)) == [16 * 1024 * 1024]
+
+
+def test_crashed_and_dead_workers_are_replaced(pool):
+    items = pool.run_in_worker(crash)
+    assert next(items) == "started"
+    with pytest.raises(RuntimeError, match="crashed"):
+        next(items)
+    assert pool._started_workers == 0
+
+    assert list(pool.run_in_worker(count_to, 1)) == [0]
+    worker = idle_worker(pool)
+    worker.process.kill()
+    worker.process.join()
+    assert list(pool.run_in_worker(count_to, 1)) == [0]
+    assert idle_worker(pool) is not worker